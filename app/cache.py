@@ -0,0 +1,50 @@
+"""
+Small in-process TTL + LRU cache.
+Used for rendered pages that are expensive to build but cheap to validate
+(see the lead detail route). Entries are keyed by a version (e.g. the row's
+updated_at), so a stale entry is simply never asked for again; invalidate()
+drops them eagerly when a route knows it changed something.
+Per process only: every worker/server process keeps its own cache.
+"""
+
+import time
+from collections import OrderedDict
+from app import metrics
+
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            metrics.CACHE_MISSES.inc(cache=self.name)
+            return None
+        self._entries.move_to_end(key)
+        metrics.CACHE_HITS.inc(cache=self.name)
+        return entry[1]
+
+    def set(self, key: tuple, value):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, prefix):
+        """Drop every entry whose key starts with `prefix` (e.g. a lead id)."""
+        for key in [k for k in self._entries if k[0] == prefix]:
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
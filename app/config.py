@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -28,13 +30,94 @@ class Settings(BaseSettings):
     default_location: str = "Amsterdam, Netherlands"
     batch_size: int = 50
     min_score_threshold: int = 50
+    niche_values: str = ""  # JSON priority multipliers, e.g. {"dentist": 1.5, "florist": 1.2}; others 1.0
+
+    # Pre-filter — cheap HTTP check before screenshot + Claude analysis
+    prefilter_enabled: bool = True
+    prefilter_concurrency: int = 20
+    prefilter_timeout: float = 10.0
+    prefilter_max_page_bytes: int = 1_500_000
+
+    # Analyze the site and draft the email in one Claude call instead of two
+    fused_analysis_email: bool = False
+
+    # Email drafts — "full" (Claude writes each email) or "hybrid" (a cached
+    # per-niche template; Claude only writes the personalized opening sentence)
+    email_mode: str = "full"
+    email_opener_max_tokens: int = 150
+
+    # Preview generation — "lovable" (submitted async, then polled) or "local" (Jinja templates)
+    preview_provider: str = "lovable"
+    preview_poll_interval: int = 15  # seconds
+    preview_timeout: int = 900  # seconds before a generating preview is marked failed
+
+    # Estimated API prices in EUR — used for cost metrics and per-lead/campaign spend
+    price_claude_input_per_mtok: float = 2.80
+    price_claude_cached_input_per_mtok: float = 0.28
+    price_claude_cache_write_per_mtok: float = 3.50
+    price_claude_output_per_mtok: float = 14.00
+    price_outscraper_call: float = 0.05
+    price_screenshot: float = 0.009
+    price_lovable_preview: float = 0.50
+    price_instantly_email: float = 0.0
+    price_claude_call_estimate: float = 0.03  # reserved before a Claude call, settled to its token cost after
+
+    # Spend budgets in estimated EUR (0 = unlimited), enforced before every paid API call
+    campaign_budget_eur: float = 0.0  # default for new campaigns; exhausting it pauses the campaign
+    daily_budget_eur: float = 0.0  # all campaigns together, per UTC day
+    send_cap_per_campaign: int = 0  # most drafts one "Send All" sends per campaign (0 = unlimited)
+
+    # Recurring campaigns — runs due at the same time are spread over this many hours
+    recurring_stagger_hours: float = 6.0
+
+    # Website change sweep — re-queues analyzed leads whose site changed (0 minutes = off)
+    site_sweep_minutes: int = 60  # how often the scheduler sweeps
+    site_recheck_days: float = 7.0  # a site is checked again once its last check is this old
+    site_sweep_limit: int = 100_000  # most sites checked per sweep
+    site_sweep_concurrency: int = 50
+
+    # Scale-out workers (scripts/worker.py) — leads are claimed in batches with expiring leases
+    worker_batch_size: int = 10
+    worker_lease_seconds: int = 300  # heartbeats extend held leases every third of this
+    worker_idle_sleep: float = 5.0  # seconds between claims when the queue is empty
+    drain_timeout: float = 30.0  # seconds in-flight leads may finish after a shutdown starts
+    queue_process_seconds: int = 60  # how often the web process works off queued leads (0 = leave it to workers)
+
+    # Tracing — "none", "console" or "file" (OTLP/JSON lines); sampled per lead
+    trace_exporter: str = "none"
+    trace_sample_rate: float = 1.0
+    trace_file: str = "traces.jsonl"
+
+    # Provider API base URLs — point these at app.fake_providers for offline load tests
+    outscraper_base_url: str = "https://api.app.outscraper.com"
+    screenshotone_base_url: str = "https://api.screenshotone.com"
+    anthropic_base_url: str = ""  # empty = SDK default
+    lovable_base_url: str = "https://api.lovable.dev/v1"
+    instantly_base_url: str = "https://api.instantly.ai/api/v2"
 
     # Database
     database_url: str = "sqlite:///./leadpilot.db"
+    migrate_on_startup: bool = True  # apply pending migrations when the app starts (else scripts/migrate.py)
+    migration_batch_size: int = 2000  # rows per transaction in data backfills
+    migration_batch_pause: float = 0.0  # seconds to sleep between backfill batches
+
+    # Lead detail page cache (per process; rendered pages keyed by lead id + updated_at)
+    detail_cache_size: int = 500  # 0 disables it
+    detail_cache_ttl: float = 300.0  # seconds
+
+    # Bulk lead import / export (rows per transaction / per streamed chunk)
+    import_chunk_size: int = 5000
+    export_chunk_size: int = 5000
 
     # Mock mode — use mock services instead of real APIs
     mock_mode: bool = True
 
+    # Load simulation (mock mode only) — seeded latency, errors and 429s per provider
+    simulate: bool = False
+    simulate_seed: int = 1234
+    simulate_time_scale: float = 1.0  # multiplies simulated latencies (0.01 = 100x faster)
+    simulate_profiles: str = ""  # JSON overrides, e.g. {"anthropic": {"error_rate": 0.05}}
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
     def api_status(self) -> dict[str, bool]:
@@ -48,6 +131,50 @@ class Settings(BaseSettings):
         }
 
 
+# Settings that can be changed at runtime from /settings (versioned in the
+# runtime_config table, see services/runtime_config.py). The rest are read
+# once at startup (database URL, scheduler intervals, caches) and need a restart.
+RUNTIME_FIELDS = (
+    "outscraper_api_key", "screenshotone_access_key", "screenshotone_secret_key", "anthropic_api_key",
+    "lovable_api_key", "instantly_api_key", "instantly_sending_email",
+    "mock_mode", "default_niche", "default_location", "preview_domain", "batch_size", "min_score_threshold",
+    "niche_values", "prefilter_enabled", "fused_analysis_email", "email_mode", "preview_provider",
+    "campaign_budget_eur", "daily_budget_eur", "send_cap_per_campaign", "site_recheck_days", "worker_batch_size", "worker_idle_sleep",
+)
+
+_current: Settings | None = None
+# Settings pinned for the running lead, so a new version never applies mid-lead
+_pinned: ContextVar[Settings | None] = ContextVar("pinned_settings", default=None)
+
+
 @lru_cache
-def get_settings() -> Settings:
+def env_settings() -> Settings:
+    """Settings from the environment / .env file, without runtime overrides."""
     return Settings()
+
+
+def get_settings() -> Settings:
+    """The settings in effect: the lead's pinned settings, else the latest applied version."""
+    return _pinned.get() or _current or env_settings()
+
+
+def apply_overrides(overrides: dict) -> Settings:
+    """
+    Make the environment settings updated with `overrides` current; raises
+    pydantic.ValidationError if a value doesn't fit its setting. Readers
+    see either the old or the new settings object, never a mix.
+    """
+    global _current
+    base = env_settings()
+    _current = Settings.model_validate({**base.model_dump(), **overrides}) if overrides else None
+    return get_settings()
+
+
+@contextmanager
+def pinned_settings():
+    """Keep the current settings for the block (one lead), whatever is applied meanwhile."""
+    token = _pinned.set(get_settings())
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
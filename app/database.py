@@ -1,5 +1,8 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
+import time
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+from app import metrics
 from app.config import get_settings
 
 
@@ -7,27 +10,65 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    get_settings().database_url,
-    connect_args={"check_same_thread": False},  # SQLite needs this for FastAPI
-    echo=False,
-)
+def async_url(url: str) -> str:
+    """Map a plain sqlite:// or postgresql:// URL to its async driver (aiosqlite / asyncpg)."""
+    for plain, driver in (("sqlite://", "sqlite+aiosqlite://"), ("postgresql://", "postgresql+asyncpg://"),
+                          ("postgres://", "postgresql+asyncpg://")):
+        if url.startswith(plain):
+            return driver + url[len(plain):]
+    return url
 
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+def make_engine(url: str):
+    """Async engine for `url`; SQLite files get WAL and a long busy timeout."""
+    url = async_url(url)
+    sqlite = url.startswith("sqlite")
+    engine = create_async_engine(
+        url,
+        # The longer timeout lets worker processes queue for the SQLite write lock
+        connect_args={"timeout": 30} if sqlite else {},
+        echo=False,
+    )
+    if sqlite:
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_wal(dbapi_connection, connection_record):
+            # WAL: readers don't block the writer, so several workers can share the file
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.close()
+    return engine
 
-def get_db() -> Session:
+
+database_url = get_settings().database_url
+is_sqlite = database_url.startswith("sqlite")
+
+engine = make_engine(database_url)
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) refresh
+AsyncSessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+
+
+# AsyncSession wraps a sync Session, so the commit timing hooks still fire
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session):
+    session.info["commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session):
+    started = session.info.pop("commit_started", None)
+    if started is not None:
+        metrics.DB_COMMIT_SECONDS.observe(time.perf_counter() - started)
+
+
+async def get_db() -> AsyncSession:
     """FastAPI dependency that yields a database session."""
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
-    """Create all tables. Called on app startup."""
-    # Import models so they register with Base.metadata
-    from app.models import lead, campaign  # noqa: F401
+async def init_db(bind=None):
+    """Create or upgrade the schema by applying pending migrations (app/migrations)."""
+    from app import migrations
 
-    Base.metadata.create_all(bind=engine)
+    await migrations.upgrade(bind or engine)
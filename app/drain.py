@@ -0,0 +1,100 @@
+"""
+Graceful drain for restarts and rolling deploys.
+Once a drain is requested (SIGTERM / SIGINT in a worker, app shutdown in the
+web process) no new work starts: workers and inline runs claim nothing more
+and release the leads they claimed but did not start, and scheduler jobs
+don't begin. Work in progress may finish until DRAIN_TIMEOUT; after that it is
+cancelled, and pipeline.process_claimed_lead commits what the lead already
+has and marks it "interrupted", so it is claimed again and resumes after its
+analysis instead of paying for it twice.
+"""
+
+import asyncio
+import functools
+import signal
+import time
+from app.config import get_settings
+
+# How long cancelled work gets to record its leads as resumable
+CANCEL_GRACE_SECONDS = 5.0
+
+_deadline: float | None = None  # monotonic time in-flight work must be done by
+_tasks: set[asyncio.Task] = set()
+
+
+def request(timeout: float | None = None):
+    """Start draining: no new work; in-flight work has `timeout` seconds (default DRAIN_TIMEOUT)."""
+    global _deadline
+    if _deadline is None:
+        timeout = get_settings().drain_timeout if timeout is None else timeout
+        _deadline = time.monotonic() + timeout
+        print(f"Draining: no new work, {timeout:.0f}s for work in progress")
+
+
+def requested() -> bool:
+    return _deadline is not None
+
+
+def remaining() -> float:
+    """Seconds left until the drain deadline (infinite when not draining)."""
+    return max(0.0, _deadline - time.monotonic()) if _deadline is not None else float("inf")
+
+
+def reset():
+    global _deadline
+    _deadline = None
+    _tasks.clear()
+
+
+def tracked(func):
+    """Decorate a background job: it doesn't start once draining, and wait() waits for it."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if requested():
+            return None
+        task = asyncio.current_task()
+        _tasks.add(task)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _tasks.discard(task)
+    return wrapper
+
+
+async def wait() -> int:
+    """
+    Wait for tracked jobs to finish until the drain deadline (starting the
+    drain if needed), then cancel the rest and give them CANCEL_GRACE_SECONDS
+    to unwind. Returns how many were cancelled.
+    """
+    request()
+    running = {task for task in _tasks if not task.done()}
+    if not running:
+        return 0
+    _, late = await asyncio.wait(running, timeout=remaining())
+    for task in late:
+        task.cancel()
+    if late:
+        await asyncio.wait(late, timeout=CANCEL_GRACE_SECONDS)
+        print(f"Drain deadline passed: cancelled {len(late)} job(s), their leads will resume")
+    return len(late)
+
+
+def install_signal_handlers(task: asyncio.Task | None = None):
+    """
+    SIGTERM / SIGINT start a drain of this process; `task` (default: the
+    current one) is cancelled if it is still running at the deadline, and at
+    once on a second signal.
+    """
+    loop = asyncio.get_running_loop()
+    task = task or asyncio.current_task()
+
+    def on_signal():
+        if requested():
+            task.cancel()
+            return
+        request()
+        loop.call_later(remaining(), task.cancel)
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, on_signal)
@@ -0,0 +1,369 @@
+"""
+Local HTTP stand-ins for the external providers.
+One ASGI app emulating the endpoints the real-mode services call, so the
+real httpx / Anthropic SDK paths (timeouts, pooling, retries, streaming) can
+be load-tested offline:
+
+  Outscraper     GET  /maps/search-v3
+  ScreenshotOne  GET  /take
+  Anthropic      POST /v1/messages            (JSON or SSE stream)
+  Lovable        POST /v1/projects, POST /v1/projects/{id}/remix, GET /v1/projects/{id}
+  Instantly      POST /api/v2/emails/send, GET /api/v2/emails/{id}
+  Scraped sites  GET  /sites/{slug}          (pages for the pre-filter to fetch)
+
+Latency and 5xx/429 failures follow the simulator profiles, scaled by
+SIMULATE_TIME_SCALE. A remix of a project this server didn't build ends in
+a failed build. Claude replies fit the request (analysis, email, niche
+template or opener), stop at max_tokens, and stream at
+CLAUDE_OUTPUT_TOKENS_PER_SECOND after a first-token delay, so shorter
+replies finish sooner. Run it with `python -m scripts.fake_providers`, or
+in-process with serve_in_thread() + use_fake_providers().
+"""
+
+import asyncio
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from functools import lru_cache
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from PIL import Image
+from app.config import get_settings, Settings
+from app.services import simulator
+from app.services.analyzer import _mock_analyze
+from app.services import email_writer
+from app.services.email_writer import _mock_email
+from app.services.fused_writer import PREVIEW_PLACEHOLDER
+from app.services.scraper import _mock_scrape
+
+# Seconds (before time scaling) until a Lovable build is ready
+LOVABLE_BUILD_SECONDS = 60
+LOVABLE_REMIX_SECONDS = 15
+# Claude output speed (before time scaling), after the first token
+CLAUDE_OUTPUT_TOKENS_PER_SECOND = 80
+
+LEAD_RE = re.compile(r"(?:screenshot of|Target:) (.+?)(?: \(|, a )(.+?) in ([^)\n]+)")
+
+
+def create_app(time_scale: float | None = None, inject_failures: bool = True) -> FastAPI:
+    """Build the fake provider app. `time_scale` defaults to SIMULATE_TIME_SCALE."""
+    app = FastAPI(title="LeadPilot fake providers")
+    projects = {}  # Lovable project id -> (ready_at, url); url None for a failed build
+    seen_systems = set()  # system prompts already "cached" by Anthropic
+
+    def scale() -> float:
+        return get_settings().simulate_time_scale if time_scale is None else time_scale
+
+    async def delay(provider: str) -> int | None:
+        """Wait the provider's simulated latency; returns an injected error status."""
+        latency, status = simulator.draw(provider)
+        await asyncio.sleep(latency * scale())
+        return status if inject_failures else None
+
+    def failure(provider: str, status: int) -> JSONResponse:
+        headers = {"retry-after": "1"} if status == 429 else {}
+        if provider == "anthropic":
+            kind = "rate_limit_error" if status == 429 else "overloaded_error"
+            body = {"type": "error", "error": {"type": kind, "message": f"Simulated {status}"}}
+        else:
+            body = {"error": f"Simulated {status}"}
+        return JSONResponse(body, status_code=status, headers=headers)
+
+    def unauthorized() -> JSONResponse:
+        return JSONResponse({"error": "missing API key"}, status_code=401)
+
+    # ── Outscraper ──
+
+    @app.get("/maps/search-v3")
+    async def outscraper_search(request: Request, query: str, limit: int = 20):
+        if not request.headers.get("x-api-key"):
+            return unauthorized()
+        if status := await delay("outscraper"):
+            return failure("outscraper", status)
+
+        city = query.split(" ", 1)[1] if " " in query else query
+        base = str(request.base_url).rstrip("/")
+        places = []
+        for i, biz in enumerate(_mock_scrape(query.split(" ", 1)[0], city, limit)):
+            site = None
+            if biz["website_url"]:
+                site = f"{base}/sites/{i}-{re.sub(r'[^a-z0-9]+', '-', biz['business_name'].lower())}"
+            places.append({
+                "name": biz["business_name"],
+                "full_address": biz["address"],
+                "phone": biz["phone"],
+                "email": biz["email"],
+                "site": site,
+                "google_maps_url": biz["google_maps_url"],
+                "rating": biz["rating"],
+                "reviews": biz["reviews_count"],
+            })
+        return {"id": uuid.uuid4().hex, "status": "Success", "data": [places]}
+
+    @app.get("/sites/{slug}")
+    async def scraped_site(slug: str):
+        if status := await delay("prefilter"):
+            return Response(status_code=status)
+        return Response(_site_html(slug), media_type="text/html")
+
+    # ── ScreenshotOne ──
+
+    @app.get("/take")
+    async def screenshotone_take(access_key: str = "", url: str = ""):
+        if not access_key:
+            return unauthorized()
+        if status := await delay("screenshotone"):
+            return failure("screenshotone", status)
+        return Response(_placeholder_png(), media_type="image/png")
+
+    # ── Anthropic ──
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        if not request.headers.get("x-api-key"):
+            return unauthorized()
+        payload = await request.json()
+        latency, status = simulator.draw("anthropic")
+        if status and inject_failures:
+            await asyncio.sleep(latency * scale() * 0.1)
+            return failure("anthropic", status)
+
+        text = json.dumps(_claude_reply(payload), ensure_ascii=False)
+        stop_reason = "end_turn"
+        if len(text) // 4 > payload.get("max_tokens", 1024):
+            text, stop_reason = text[:payload["max_tokens"] * 4], "max_tokens"
+        usage = _claude_usage(payload, text, seen_systems)
+        # A third of the latency before the first token, then the reply at the output speed
+        first_token = latency * scale() / 3
+        generating = usage["output_tokens"] / CLAUDE_OUTPUT_TOKENS_PER_SECOND * scale()
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": payload.get("model", "claude"),
+            "stop_sequence": None,
+        }
+
+        if not payload.get("stream"):
+            await asyncio.sleep(first_token + generating)
+            return {
+                **message,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": stop_reason,
+                "usage": usage,
+            }
+
+        async def events():
+            await asyncio.sleep(first_token)
+            start = {**message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 1}}
+            yield _sse("message_start", {"type": "message_start", "message": start})
+            yield _sse("content_block_start", {
+                "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+            })
+            chunks = [text[i:i + 24] for i in range(0, len(text), 24)]
+            for chunk in chunks:
+                await asyncio.sleep(generating / len(chunks))
+                yield _sse("content_block_delta", {
+                    "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk},
+                })
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield _sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                "usage": {"output_tokens": usage["output_tokens"]},
+            })
+            yield _sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    # ── Lovable ──
+
+    @app.post("/v1/projects")
+    async def lovable_create(request: Request):
+        return await _lovable_start(request, LOVABLE_BUILD_SECONDS)
+
+    @app.post("/v1/projects/{template_id}/remix")
+    async def lovable_remix(request: Request, template_id: str):
+        return await _lovable_start(request, LOVABLE_REMIX_SECONDS, builds=template_id in projects)
+
+    async def _lovable_start(request: Request, build_seconds: float, builds: bool = True):
+        if not request.headers.get("authorization"):
+            return unauthorized()
+        if status := await delay("lovable"):
+            return failure("lovable", status)
+        project_id = f"proj_{uuid.uuid4().hex[:12]}"
+        url = f"https://{project_id}.lovable.app" if builds else None
+        projects[project_id] = (time.monotonic() + build_seconds * scale(), url)
+        return {"id": project_id, "status": "building", "url": None}
+
+    @app.get("/v1/projects/{project_id}")
+    async def lovable_project(request: Request, project_id: str):
+        if not request.headers.get("authorization"):
+            return unauthorized()
+        if project_id not in projects:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        if status := await delay("lovable"):
+            return failure("lovable", status)
+        ready_at, url = projects[project_id]
+        if time.monotonic() < ready_at:
+            return {"id": project_id, "status": "building", "url": None}
+        if url is None:
+            return {"id": project_id, "status": "error", "url": None}
+        return {"id": project_id, "status": "ready", "url": url}
+
+    # ── Instantly ──
+
+    @app.post("/api/v2/emails/send")
+    async def instantly_send(request: Request):
+        if not request.headers.get("authorization"):
+            return unauthorized()
+        if status := await delay("instantly"):
+            return failure("instantly", status)
+        return {"id": uuid.uuid4().hex, "status": "queued"}
+
+    @app.get("/api/v2/emails/{email_id}")
+    async def instantly_status(request: Request, email_id: str):
+        if not request.headers.get("authorization"):
+            return unauthorized()
+        if status := await delay("instantly"):
+            return failure("instantly", status)
+        return {"id": email_id, "status": "sent"}
+
+    return app
+
+
+def _claude_reply(payload: dict) -> dict:
+    """
+    The reply for the request's system prompt: an email draft, a niche
+    template or an opener for the email writer, and otherwise one object that
+    validates as an analysis and a fused result alike (pydantic ignores the
+    extra keys).
+    """
+    system = "".join(block.get("text", "") for block in payload.get("system") or [] if isinstance(block, dict))
+    prompt = _prompt_text(payload.get("messages", []))
+    match = LEAD_RE.search(prompt)
+    name, business_type, city = match.groups() if match else ("uw bedrijf", "bedrijf", "Nederland")
+
+    preview = PREVIEW_PLACEHOLDER if PREVIEW_PLACEHOLDER in system else None
+    if preview is None:
+        found = re.search(r"Preview redesign URL: (\S+)", prompt)
+        preview = found.group(1) if found else None
+
+    if email_writer.OPENER_SYSTEM in system:
+        return {"opener": random.choice(email_writer.MOCK_OPENERS).format(name=name, type=business_type, city=city)}
+    if email_writer.TEMPLATE_SYSTEM in system:
+        return dict(email_writer.DEFAULT_TEMPLATE)
+    email = _mock_email(name, business_type, city, preview)
+    if email_writer.EMAIL_SYSTEM in system:
+        return email
+    reply = _mock_analyze(name, business_type, city)
+    return {**reply, **email, "email": email}
+
+
+def _claude_usage(payload: dict, text: str, seen_systems: set) -> dict:
+    """Token usage estimated at ~4 characters per token, with prompt-cache accounting."""
+    system = json.dumps(payload.get("system") or "")
+    prompt = json.dumps(payload.get("messages", []))
+    system_tokens = len(system) // 4
+    cached = "cache_control" in system
+    hit = cached and system in seen_systems
+    if cached:
+        seen_systems.add(system)
+    return {
+        "input_tokens": len(prompt) // 4 + (0 if cached else system_tokens),
+        "cache_read_input_tokens": system_tokens if hit else 0,
+        "cache_creation_input_tokens": system_tokens if cached and not hit else 0,
+        "output_tokens": max(1, len(text) // 4),
+    }
+
+
+def _prompt_text(messages: list[dict]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(block.get("text", "") for block in content or [] if block.get("type") == "text")
+    return "\n".join(parts)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _site_html(slug: str) -> str:
+    """A scraped business site; the slug's leading number picks which signals it has."""
+    variant = int(slug.split("-", 1)[0]) if slug[:1].isdigit() else 0
+    viewport = '<meta name="viewport" content="width=device-width">' if variant % 3 == 0 else ""
+    tel = '<a href="tel:+31201234567">Bel ons</a>' if variant % 2 == 0 else ""
+    year = 2013 + variant % 12
+    return (
+        f"<html><head><title>{slug}</title>{viewport}</head>"
+        f"<body><h1>{slug}</h1>{tel}<footer>&copy; {year}</footer></body></html>"
+    )
+
+
+@lru_cache
+def _placeholder_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (1280, 800), color=(240, 240, 245)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# ── Running in-process ───────────────────────────────────────────────
+
+def serve_in_thread(app: FastAPI | None = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Start the fake providers on a background thread.
+    Returns (base_url, stop); call stop() to shut the server down.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app or create_app(), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("fake provider server failed to start")
+        time.sleep(0.01)
+
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    return f"http://{host}:{bound_port}", stop
+
+
+def fake_provider_settings(base_url: str) -> dict:
+    """Settings values that send every real-mode call to the fake providers at base_url."""
+    return {
+        "mock_mode": False,
+        "outscraper_api_key": "fake",
+        "screenshotone_access_key": "fake",
+        "anthropic_api_key": "fake",
+        "lovable_api_key": "fake",
+        "instantly_api_key": "fake",
+        "instantly_sending_email": "bench@example.com",
+        "outscraper_base_url": base_url,
+        "screenshotone_base_url": base_url,
+        "anthropic_base_url": base_url,
+        "lovable_base_url": f"{base_url}/v1",
+        "instantly_base_url": f"{base_url}/api/v2",
+    }
+
+
+def use_fake_providers(base_url: str, settings: Settings | None = None):
+    """Point the settings (default: the app settings) at the fake providers."""
+    from app.services import claude
+
+    settings = settings or get_settings()
+    for key, value in fake_provider_settings(base_url).items():
+        setattr(settings, key, value)
+    claude.get_client.cache_clear()
@@ -2,35 +2,102 @@
 LeadPilot — FastAPI application with routes and template rendering.
 """
 
+import asyncio
 import json
+import math
+from collections import Counter
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from pathlib import Path
-from fastapi import FastAPI, Request, Depends, Form, Query
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Request, Depends, Form, Query, UploadFile
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, Response, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
-from app.config import get_settings
-from app.database import get_db, init_db
-from app.models.lead import Lead
-from app.models.campaign import Campaign
-from app.services import pipeline, email_sender
-from app.scheduler import init_scheduler, shutdown_scheduler
+from app import drain, metrics, migrations
+from app.cache import TTLCache
+from pydantic import ValidationError
+from app.config import RUNTIME_FIELDS, get_settings
+from app.database import AsyncSessionLocal, engine, get_db, init_db
+from app.models.lead import LEAD_DETAILS, Lead, LeadEmail
+from app.models.campaign import Campaign, RecurringCampaign
+from app.services import pipeline, email_sender, preview_renderer, search, lead_io, budgets, queue, recurring, runtime_config
+from app.scheduler import drain_scheduler, init_scheduler
+
+
+# Routes that need the migrated database; they wait for startup (see below)
+DB_ROUTE_PREFIXES = ("/dashboard", "/leads", "/api", "/settings")
+# How long such a request waits for startup before answering 503
+STARTUP_WAIT_SECONDS = 2.0
+
+# Dashboard-triggered pipeline runs in progress (the event loop only keeps weak references)
+pipeline_runs: set[asyncio.Task] = set()
+
+# Rendered lead detail pages, keyed by (lead id, updated_at)
+detail_cache = TTLCache("lead_detail", get_settings().detail_cache_size, get_settings().detail_cache_ttl)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup and shutdown events."""
-    init_db()
-    init_scheduler()
+    """
+    Startup and shutdown events.
+    Migrations and the scheduler start in the background, so the server
+    accepts requests at once, however long a migration of a big database takes.
+    """
+    drain.reset()
+    app.state.startup = asyncio.create_task(_startup())
     yield
-    shutdown_scheduler()
+    app.state.startup.cancel()
+    # Scheduled jobs and pipeline runs stop claiming work; the leads they hold finish or become resumable
+    await drain_scheduler()
+    await engine.dispose()
+
+
+async def _startup():
+    try:
+        pending = []
+        if get_settings().migrate_on_startup:
+            await init_db()
+        elif pending := await migrations.pending(engine):
+            print(f"Warning: {len(pending)} pending migration(s) — run python -m scripts.migrate")
+        if not pending:
+            await _load_runtime_config()
+        init_scheduler()
+    except Exception as e:
+        print(f"Startup failed: {e}")
+        raise
+
+
+async def _load_runtime_config():
+    # Not fatal: the app still runs on the .env settings
+    try:
+        async with AsyncSessionLocal() as db:
+            await runtime_config.refresh(db)
+    except Exception as e:
+        print(f"Runtime config not loaded, using .env settings: {e}")
 
 
 app = FastAPI(title="LeadPilot", lifespan=lifespan)
 
+
+@app.middleware("http")
+async def wait_for_startup(request: Request, call_next):
+    """Hold database routes until startup is done; 503 if it takes longer than STARTUP_WAIT_SECONDS."""
+    startup = getattr(request.app.state, "startup", None)
+    if startup is not None and not startup.done() and request.url.path.startswith(DB_ROUTE_PREFIXES):
+        try:
+            await asyncio.wait_for(asyncio.shield(startup), STARTUP_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            return PlainTextResponse(
+                "LeadPilot is starting (applying database migrations), try again shortly.",
+                status_code=503, headers={"Retry-After": "5"},
+            )
+    return await call_next(request)
+
 # Mount static files
 static_dir = Path(__file__).parent / "static"
 static_dir.mkdir(exist_ok=True)
@@ -43,9 +110,11 @@ templates = Jinja2Templates(directory=str(templates_dir))
 
 # ── Jinja2 filters ──────────────────────────────────────────────────
 def json_loads_filter(value):
-    """Parse JSON string in templates."""
+    """Parse JSON string in templates (values from JSON columns are already parsed)."""
     if not value:
         return []
+    if isinstance(value, (list, dict)):
+        return value
     try:
         return json.loads(value)
     except (json.JSONDecodeError, TypeError):
@@ -53,6 +122,7 @@ def json_loads_filter(value):
 
 
 templates.env.filters["from_json"] = json_loads_filter
+templates.env.filters["mark"] = search.mark
 
 
 # ── Landing Page ─────────────────────────────────────────────────────
@@ -60,7 +130,7 @@ templates.env.filters["from_json"] = json_loads_filter
 @app.get("/", response_class=HTMLResponse)
 async def landing(request: Request):
     """Public landing page."""
-    return templates.TemplateResponse("landing.html", {"request": request})
+    return templates.TemplateResponse(request, "landing.html")
 
 
 # ── Dashboard ────────────────────────────────────────────────────────
@@ -68,7 +138,7 @@ async def landing(request: Request):
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     campaign_id: int | None = None,
     status: str | None = None,
     score_max: int | None = None,
@@ -77,24 +147,30 @@ async def dashboard(
     settings = get_settings()
 
     # Query leads with optional filters
-    query = db.query(Lead)
+    query = select(Lead)
     if campaign_id:
-        query = query.filter(Lead.campaign_id == campaign_id)
+        query = query.where(Lead.campaign_id == campaign_id)
     if status:
-        query = query.filter(Lead.status == status)
+        query = query.where(Lead.status == status)
     if score_max is not None:
-        query = query.filter(Lead.site_score <= score_max)
+        query = query.where(Lead.site_score <= score_max)
 
-    leads = query.order_by(Lead.created_at.desc()).all()
-    campaigns = db.query(Campaign).order_by(Campaign.created_at.desc()).all()
+    leads = (await db.scalars(query.order_by(Lead.created_at.desc()))).all()
+    campaigns = (await db.scalars(select(Campaign).order_by(Campaign.created_at.desc()))).all()
+    recurring_campaigns = (await db.scalars(select(RecurringCampaign).order_by(RecurringCampaign.id))).all()
 
     # Compute stats
-    total_leads = db.query(func.count(Lead.id)).scalar()
-    total_analyzed = db.query(func.count(Lead.id)).filter(Lead.site_score.isnot(None)).scalar()
-    total_previews = db.query(func.count(Lead.id)).filter(Lead.preview_status == "ready").scalar()
-    total_sent = db.query(func.count(Lead.id)).filter(Lead.email_status == "sent").scalar()
-    total_replied = db.query(func.count(Lead.id)).filter(Lead.email_status == "replied").scalar()
-    total_closed = db.query(func.count(Lead.id)).filter(Lead.status == "closed").scalar()
+    count = select(func.count(Lead.id))
+    total_leads = await db.scalar(count)
+    total_analyzed = await db.scalar(count.where(Lead.site_score.isnot(None)))
+    total_previews = await db.scalar(count.where(Lead.preview_status == "ready"))
+    total_sent = await db.scalar(count.where(Lead.email_status == "sent"))
+    total_replied = await db.scalar(count.where(Lead.email_status == "replied"))
+    total_closed = await db.scalar(count.where(Lead.status == "closed"))
+    input_tokens, cached_input_tokens = (await db.execute(select(
+        func.coalesce(func.sum(Campaign.input_tokens), 0),
+        func.coalesce(func.sum(Campaign.cached_input_tokens), 0),
+    ))).one()
 
     stats = {
         "total_leads": total_leads,
@@ -103,12 +179,15 @@ async def dashboard(
         "total_sent": total_sent,
         "total_replied": total_replied,
         "total_closed": total_closed,
+        "input_tokens": input_tokens,
+        "cached_input_tokens": cached_input_tokens,
+        "spent_today": await budgets.spent_today(db),
     }
 
-    return templates.TemplateResponse("dashboard.html", {
-        "request": request,
+    return templates.TemplateResponse(request, "dashboard.html", {
         "leads": leads,
         "campaigns": campaigns,
+        "recurring_campaigns": recurring_campaigns,
         "stats": stats,
         "settings": settings,
         "filters": {
@@ -119,42 +198,180 @@ async def dashboard(
     })
 
 
+# ── Search ───────────────────────────────────────────────────────────
+
+@app.get("/leads/search", response_class=HTMLResponse)
+async def search_leads(
+    request: Request,
+    q: str = "",
+    page: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full-text lead search; returns table rows for the dashboard (HTMX fragment)."""
+    hits, more = await search.search_leads(db, q, page)
+    return templates.TemplateResponse(request, "search_results.html", {
+        "hits": hits,
+        "more": more,
+        "q": q,
+        "page": page,
+    })
+
+
 # ── Lead Detail ──────────────────────────────────────────────────────
 
 @app.get("/leads/{lead_id}", response_class=HTMLResponse)
-async def lead_detail(request: Request, lead_id: int, db: Session = Depends(get_db)):
-    """Single lead detail view."""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead:
+async def lead_detail(request: Request, lead_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Single lead detail view.
+    Versioned by Lead.updated_at: a one-column lookup answers conditional
+    requests with 304, and rendered pages are cached per version, so only
+    a changed lead is loaded with its details and rendered again.
+    """
+    row = (await db.execute(select(Lead.updated_at, Lead.created_at).where(Lead.id == lead_id))).first()
+    if not row:
         return HTMLResponse("<h1>Lead not found</h1>", status_code=404)
 
-    issues = []
-    if lead.site_issues:
+    version = row.updated_at or row.created_at or datetime(1970, 1, 1)
+    headers = {
+        "ETag": f'W/"lead-{lead_id}-{version.timestamp():.6f}"',
+        "Last-Modified": format_datetime(version.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if _not_modified(request, headers["ETag"], version):
+        return Response(status_code=304, headers=headers)
+
+    key = (lead_id, version)
+    body = detail_cache.get(key)
+    if body is None:
+        lead = await db.get(Lead, lead_id, options=LEAD_DETAILS)
+        if not lead:
+            return HTMLResponse("<h1>Lead not found</h1>", status_code=404)
+        body = templates.TemplateResponse(request, "lead_detail.html", {
+            "lead": lead,
+            "issues": lead.site_issues or [],
+        }).body
+        detail_cache.set(key, body)
+
+    return HTMLResponse(body, headers=headers)
+
+
+def _not_modified(request: Request, etag: str, version: datetime) -> bool:
+    """Whether the client's If-None-Match / If-Modified-Since still matches `version`."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
         try:
-            issues = json.loads(lead.site_issues)
-        except json.JSONDecodeError:
-            issues = []
-
-    return templates.TemplateResponse("lead_detail.html", {
-        "request": request,
-        "lead": lead,
-        "issues": issues,
-    })
+            since = parsedate_to_datetime(if_modified_since).replace(tzinfo=None)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return version.replace(microsecond=0) <= since
+    return False
 
 
 # ── Settings ─────────────────────────────────────────────────────────
 
 @app.get("/settings", response_class=HTMLResponse)
-async def settings_page(request: Request):
-    """Settings page with API key status and config."""
+async def settings_page(request: Request, db: AsyncSession = Depends(get_db)):
+    """Settings page with API key status and the runtime config editor."""
+    await runtime_config.refresh(db)
     settings = get_settings()
-    return templates.TemplateResponse("settings.html", {
-        "request": request,
+    return templates.TemplateResponse(request, "settings.html", {
         "settings": settings,
         "api_status": settings.api_status(),
+        "fields": runtime_config.form_fields(),
+        "version": runtime_config.applied_version(),
+        "history": await runtime_config.history(db),
     })
 
 
+@app.post("/settings")
+async def save_settings(request: Request, db: AsyncSession = Depends(get_db)):
+    """Save the runtime settings as a new version; workers pick it up before their next lead."""
+    form = await request.form()
+    values = {name: form[name] for name in RUNTIME_FIELDS if name in form}
+    # Blank key fields keep the current key (keys are never sent to the page)
+    values = {name: value for name, value in values.items() if value or name not in runtime_config.SECRET_FIELDS}
+    try:
+        await runtime_config.save(db, values)
+    except (ValueError, ValidationError) as e:
+        return PlainTextResponse(f"Invalid settings: {e}", status_code=400)
+    return RedirectResponse(url="/settings", status_code=303)
+
+
+# ── Preview Sites ────────────────────────────────────────────────────
+
+@app.get("/p/{slug}")
+async def preview_site(request: Request, slug: str):
+    """Serve a locally rendered preview site, precompressed when the client accepts it."""
+    site = preview_renderer.site_dir(slug)
+    if not site:
+        return HTMLResponse("<h1>Preview not found</h1>", status_code=404)
+
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    path, encoding = site / "index.html", None
+    for enc, suffix in (("br", ".br"), ("gzip", ".gz")):
+        candidate = site / f"index.html{suffix}"
+        if enc in accepted and candidate.exists():
+            path, encoding = candidate, enc
+            break
+
+    stat = path.stat()
+    headers = {
+        "ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        "Cache-Control": "public, max-age=3600",
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type="text/html", headers=headers)
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    """Content codings an Accept-Encoding header allows (q > 0); "*" stands for any not listed."""
+    accepted, refused = set(), set()
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        (accepted if q > 0 else refused).add(coding)
+    if "*" in accepted:
+        accepted |= {"br", "gzip"} - refused
+    return accepted
+
+
+# ── Metrics ──────────────────────────────────────────────────────────
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text exposition of pipeline and provider metrics."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/healthz")
+async def healthz(request: Request):
+    """Liveness plus readiness: 503 until migrations and the scheduler have started."""
+    startup = getattr(request.app.state, "startup", None)
+    if startup is not None and not startup.done():
+        return PlainTextResponse("starting", status_code=503)
+    if startup is not None and not startup.cancelled() and startup.exception():
+        return PlainTextResponse("startup failed", status_code=503)
+    return PlainTextResponse("ok")
+
+
 # ── API Routes ───────────────────────────────────────────────────────
 
 @app.post("/api/pipeline/run")
@@ -162,30 +379,109 @@ async def run_pipeline_route(
     niche: str = Form(None),
     location: str = Form(None),
     limit: int = Form(20),
-    db: Session = Depends(get_db),
 ):
-    """Trigger the pipeline via dashboard button."""
+    """
+    Trigger the pipeline via dashboard button. The run continues in the
+    background: a request would hold up server shutdown until the whole
+    campaign is done, while a background run is drained like scheduled jobs.
+    """
+    if drain.requested():
+        return PlainTextResponse("LeadPilot is shutting down, try again shortly.", status_code=503,
+                                 headers={"Retry-After": "5"})
     settings = get_settings()
     niche = niche or settings.default_niche
     location = location or settings.default_location
 
-    stats = await pipeline.run_pipeline(db, niche, location, limit)
+    run = asyncio.create_task(_run_pipeline(niche, location, limit))
+    pipeline_runs.add(run)
+    run.add_done_callback(pipeline_runs.discard)
+    return RedirectResponse(url="/dashboard", status_code=303)
+
+
+@drain.tracked
+async def _run_pipeline(niche: str, location: str, limit: int):
+    async with AsyncSessionLocal() as db:
+        try:
+            stats = await pipeline.run_pipeline(db, niche, location, limit)
+        except Exception as e:
+            print(f"Pipeline run for {niche} in {location} failed: {e}")
+            return
+    print(f"Pipeline run for {niche} in {location}: {stats['analyzed']} analyzed, "
+          f"{stats['emails_drafted']} drafts, {len(stats['errors'])} errors")
+
+
+@app.post("/api/recurring")
+async def create_recurring_campaign(
+    name: str = Form(...),
+    niche: str = Form(...),
+    locations: str = Form(...),
+    cron: str = Form(...),
+    lead_limit: int = Form(20),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add a recurring campaign; the scheduler picks it up within a minute."""
+    try:
+        cron = recurring.validate_cron(cron)
+    except ValueError as e:
+        return PlainTextResponse(f"Invalid cron expression: {e}", status_code=400)
+    definition = RecurringCampaign(name=name, niche=niche, locations=locations, cron=cron, lead_limit=lead_limit)
+    if not definition.location_list:
+        return PlainTextResponse("At least one location is required", status_code=400)
+    db.add(definition)
+    await db.commit()
+    return RedirectResponse(url="/dashboard", status_code=303)
+
+
+@app.post("/api/recurring/{recurring_id}/toggle")
+async def toggle_recurring_campaign(recurring_id: int, db: AsyncSession = Depends(get_db)):
+    """Enable or disable a recurring campaign."""
+    definition = await db.get(RecurringCampaign, recurring_id)
+    if definition:
+        definition.enabled = not definition.enabled
+        await db.commit()
+    return RedirectResponse(url="/dashboard", status_code=303)
+
+
+@app.post("/api/campaigns/{campaign_id}/budget")
+async def update_campaign_budget(
+    campaign_id: int,
+    budget_eur: str = Form(""),
+    db: AsyncSession = Depends(get_db),
+):
+    """Set a campaign's spend budget (blank or 0 = unlimited); a campaign paused by its budget resumes if it now fits."""
+    campaign = await db.get(Campaign, campaign_id)
+    if not campaign:
+        return RedirectResponse(url="/dashboard", status_code=303)
+    try:
+        budget = float(budget_eur) if budget_eur.strip() else 0.0
+    except ValueError:
+        return PlainTextResponse("Budget must be a number", status_code=400)
+    if not math.isfinite(budget) or budget < 0:
+        return PlainTextResponse("Budget must be a positive number", status_code=400)
+    campaign.budget_eur = budget or None
+    if campaign.status == "paused" and (campaign.budget_eur is None or (campaign.cost_eur or 0) < campaign.budget_eur):
+        campaign.status = "active"
+    await db.commit()
     return RedirectResponse(url="/dashboard", status_code=303)
 
 
 @app.post("/api/leads/{lead_id}/reprocess")
-async def reprocess_lead(lead_id: int, db: Session = Depends(get_db)):
+async def reprocess_lead(lead_id: int, db: AsyncSession = Depends(get_db)):
     """Re-run pipeline on a single lead."""
     result = await pipeline.process_single_lead(db, lead_id)
+    detail_cache.invalidate(lead_id)
     return RedirectResponse(url=f"/leads/{lead_id}", status_code=303)
 
 
 @app.post("/api/leads/{lead_id}/send")
-async def send_lead_email(lead_id: int, db: Session = Depends(get_db)):
+async def send_lead_email(lead_id: int, db: AsyncSession = Depends(get_db)):
     """Send the drafted email for a lead."""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead or not lead.email_body:
+    lead = await db.get(Lead, lead_id, options=LEAD_DETAILS)
+    if not lead:
         return RedirectResponse(url=f"/leads/{lead_id}", status_code=303)
+    # Same rule as batch_send: pending drafts are unfinished or parked as outdated
+    if not lead.email_body or lead.email_status != "draft" or lead.status != "email_drafted":
+        return PlainTextResponse("This lead has no finished draft to send", status_code=400)
 
     to_email = lead.email or "test@example.com"  # fallback for mock mode
     result = await email_sender.send_email(to_email, lead.email_subject, lead.email_body, lead.id)
@@ -195,7 +491,8 @@ async def send_lead_email(lead_id: int, db: Session = Depends(get_db)):
         from datetime import datetime
         lead.email_sent_at = datetime.utcnow()
         lead.status = "sent"
-        db.commit()
+        await db.commit()
+        detail_cache.invalidate(lead_id)
 
     return RedirectResponse(url=f"/leads/{lead_id}", status_code=303)
 
@@ -205,24 +502,37 @@ async def update_lead_email(
     lead_id: int,
     subject: str = Form(...),
     body: str = Form(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update the email draft for a lead."""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    lead = await db.get(Lead, lead_id, options=LEAD_DETAILS)
     if lead:
         lead.email_subject = subject
         lead.email_body = body
-        db.commit()
+        await db.commit()
+        detail_cache.invalidate(lead_id)
     return RedirectResponse(url=f"/leads/{lead_id}", status_code=303)
 
 
 @app.post("/api/batch/send")
-async def batch_send(db: Session = Depends(get_db)):
-    """Send all approved/drafted emails."""
-    leads = db.query(Lead).filter(
+async def batch_send(per_campaign: int | None = Form(None), db: AsyncSession = Depends(get_db)):
+    """
+    Send the drafted emails of active campaigns, highest-priority leads first,
+    at most `per_campaign` per campaign (default SEND_CAP_PER_CAMPAIGN, 0 = all).
+    """
+    cap = get_settings().send_cap_per_campaign if per_campaign is None else per_campaign
+    drafts = (await db.scalars(select(Lead).join(Lead.email_draft).where(
+        Lead.status == "email_drafted",
         Lead.email_status == "draft",
-        Lead.email_body.isnot(None),
-    ).all()
+        LeadEmail.body.isnot(None),
+        queue.ACTIVE_CAMPAIGN,
+    ).options(contains_eager(Lead.email_draft)).order_by(Lead.priority.desc(), Lead.id))).all()
+    per_campaign_count = Counter()
+    leads = []
+    for lead in drafts:
+        per_campaign_count[lead.campaign_id] += 1
+        if cap <= 0 or per_campaign_count[lead.campaign_id] <= cap:
+            leads.append(lead)
 
     sent_count = 0
     for lead in leads:
@@ -235,5 +545,48 @@ async def batch_send(db: Session = Depends(get_db)):
             lead.status = "sent"
             sent_count += 1
 
-    db.commit()
+    await db.commit()
+    for lead in leads:
+        detail_cache.invalidate(lead.id)
     return RedirectResponse(url="/dashboard", status_code=303)
+
+
+@app.get("/api/leads/export")
+async def export_leads(format: str = Query("csv", pattern="^(csv|parquet)$"), campaign_id: int | None = None):
+    """Stream all leads (or one campaign's) as CSV or Parquet."""
+    if format == "parquet":
+        try:
+            lead_io.parquet_schema()
+        except RuntimeError as e:
+            return PlainTextResponse(str(e), status_code=501)
+
+    async def body():
+        # Own session: the response outlives the request's dependencies
+        async with AsyncSessionLocal() as db:
+            async for chunk in lead_io.encode(lead_io.export_batches(db, campaign_id), format):
+                yield chunk
+
+    filename = lead_io.export_filename(format, campaign_id)
+    return StreamingResponse(body(), media_type=lead_io.MEDIA_TYPES[format], headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    })
+
+
+@app.post("/api/leads/import")
+async def import_leads(
+    file: UploadFile,
+    niche: str = Form("import"),
+    location: str = Form(""),
+    db: AsyncSession = Depends(get_db),
+):
+    """Import a CSV or Parquet lead list into a new campaign (known businesses are skipped)."""
+    fmt = lead_io.format_for(file.filename)
+    try:
+        campaign, counts = await lead_io.import_file(
+            db, file.file, fmt, f"Import {file.filename or fmt}", niche or "import", location,
+        )
+    except RuntimeError as e:
+        return PlainTextResponse(str(e), status_code=501)
+    print(f"Imported {file.filename}: {counts}")
+    return RedirectResponse(url=f"/dashboard?campaign_id={campaign.id}", status_code=303)
+
@@ -0,0 +1,209 @@
+"""
+In-process metrics with Prometheus text exposition.
+Counters and histograms are plain dicts keyed by label values, so recording
+is a dict update plus (for histograms) a bisect — cheap enough for the hot path.
+Exposed at /metrics and summarized by the CLI runner.
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from app import tracing
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REGISTRY = []
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(tuple(labels[n] for n in self.labelnames), 0)
+
+    def total(self) -> float:
+        return sum(self.values.values())
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_num(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self.series = {}  # label key -> [bucket counts..., +Inf count, sum]
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, **labels) -> int:
+        series = self.series.get(tuple(labels[n] for n in self.labelnames))
+        return sum(series[:-1]) if series else 0
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """Approximate quantile from bucket counts (linear within a bucket)."""
+        series = self.series.get(tuple(labels[n] for n in self.labelnames))
+        if not series:
+            return None
+        counts = series[:-1]
+        target = q * sum(counts)
+        seen = 0
+        for i, n in enumerate(counts):
+            if n and seen + n >= target:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (target - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def expose(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                labels = _labels(self.labelnames + ("le",), key + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+# ── Metrics ──────────────────────────────────────────────────────────
+
+STAGE_SECONDS = Histogram("leadpilot_stage_seconds", "Pipeline stage latency", ("stage",))
+STAGE_ERRORS = Counter("leadpilot_stage_errors_total", "Pipeline stage failures", ("stage",))
+PROVIDER_SECONDS = Histogram("leadpilot_provider_seconds", "External API call latency", ("provider",))
+PROVIDER_CALLS = Counter("leadpilot_provider_calls_total", "External API calls", ("provider",))
+PROVIDER_ERRORS = Counter("leadpilot_provider_errors_total", "Failed external API calls", ("provider",))
+RETRIES = Counter("leadpilot_retries_total", "Retried external API calls", ("provider",))
+CACHE_HITS = Counter("leadpilot_cache_hits_total", "Cache hits", ("cache",))
+CACHE_MISSES = Counter("leadpilot_cache_misses_total", "Cache misses", ("cache",))
+CLAUDE_TOKENS = Counter("leadpilot_claude_tokens_total", "Claude tokens by kind", ("kind",))
+CLAUDE_PARSES = Counter("leadpilot_claude_parses_total", "Structured Claude replies by parse result", ("result",))
+COST_EUR = Counter("leadpilot_cost_eur_total", "Estimated API spend in EUR", ("provider",))
+BUDGET_REFUSALS = Counter("leadpilot_budget_refusals_total", "Paid API calls refused by a spend budget", ("budget",))
+DB_COMMIT_SECONDS = Histogram("leadpilot_db_commit_seconds", "Database session commit (flush + commit) latency")
+LEAD_COST_EUR = Histogram(
+    "leadpilot_lead_cost_eur", "Estimated API spend per processed lead in EUR", (),
+    buckets=(0.001, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage (and trace it); failures are counted and re-raised."""
+    start = time.perf_counter()
+    try:
+        with tracing.span(f"stage.{name}"):
+            yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+@contextmanager
+def provider_call(provider: str):
+    """Time an external API call (and trace it); failures are counted and re-raised."""
+    PROVIDER_CALLS.inc(provider=provider)
+    start = time.perf_counter()
+    try:
+        with tracing.span(f"call.{provider}", provider=provider):
+            yield
+    except BaseException:
+        PROVIDER_ERRORS.inc(provider=provider)
+        raise
+    finally:
+        PROVIDER_SECONDS.observe(time.perf_counter() - start, provider=provider)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> list[str]:
+    """Human-readable per-stage and per-provider summary lines."""
+    lines = []
+    for title, hist, errors, label in (
+        ("Stage", STAGE_SECONDS, STAGE_ERRORS, "stage"),
+        ("Provider", PROVIDER_SECONDS, PROVIDER_ERRORS, "provider"),
+    ):
+        for (name,) in sorted(hist.series):
+            labels = {label: name}
+            lines.append(
+                f"{title} {name:<14} n={hist.count(**labels):<6} "
+                f"p50={hist.quantile(0.5, **labels) * 1000:8.1f}ms "
+                f"p95={hist.quantile(0.95, **labels) * 1000:8.1f}ms "
+                f"errors={_num(errors.get(**labels))}"
+            )
+    if DB_COMMIT_SECONDS.series:
+        lines.append(
+            f"DB commit{'':<10} n={DB_COMMIT_SECONDS.count():<6} "
+            f"p50={DB_COMMIT_SECONDS.quantile(0.5) * 1000:8.1f}ms "
+            f"p95={DB_COMMIT_SECONDS.quantile(0.95) * 1000:8.1f}ms "
+            f"total={DB_COMMIT_SECONDS.series[()][-1]:.2f}s"
+        )
+    if CLAUDE_TOKENS.values:
+        tokens = ", ".join(f"{k[0]}={_num(v)}" for k, v in sorted(CLAUDE_TOKENS.values.items()))
+        lines.append(f"Claude tokens: {tokens}")
+    if COST_EUR.values:
+        lines.append(f"Estimated cost: EUR {COST_EUR.total():.4f}")
+    return lines
+
+
+def reset():
+    """Clear all recorded values (tests and benchmarks)."""
+    for metric in REGISTRY:
+        if isinstance(metric, Counter):
+            metric.values.clear()
+        else:
+            metric.series.clear()
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
@@ -0,0 +1,92 @@
+"""
+Versioned schema migrations.
+Each module in this package named mNNNN_<name>.py is one migration: its
+docstring describes it and `async def upgrade(bind)` applies it. Applied
+versions are recorded in the schema_migrations table. Run them with
+`python -m scripts.migrate` or on startup (MIGRATE_ON_STARTUP).
+
+Migration 0001 creates any missing tables from the current models, so on a
+fresh database every later migration must find nothing to do: write them to
+be idempotent (see helpers.py). Large data changes go through
+helpers.backfill, which commits in small batches so readers and the pipeline
+keep working while a big database is migrated.
+"""
+
+import importlib
+import pkgutil
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, insert, select, text
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Serializes concurrent upgrades of one Postgres database (any constant works)
+ADVISORY_LOCK_ID = 4_170_391
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    description: str
+    upgrade: Callable[..., Awaitable[None]]
+
+
+def discover() -> list[Migration]:
+    """All migrations in this package, in version order."""
+    found = []
+    for module in pkgutil.iter_modules(__path__):
+        prefix, _, name = module.name.partition("_")
+        if not (prefix.startswith("m") and prefix[1:].isdigit()):
+            continue
+        mod = importlib.import_module(f"{__name__}.{module.name}")
+        description = (mod.__doc__ or name).strip().splitlines()[0]
+        found.append(Migration(int(prefix[1:]), name, description, mod.upgrade))
+    return sorted(found, key=lambda m: m.version)
+
+
+async def applied_versions(bind) -> set[int]:
+    async with bind.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        return set((await conn.execute(select(schema_migrations.c.version))).scalars())
+
+
+async def pending(bind) -> list[Migration]:
+    done = await applied_versions(bind)
+    return [m for m in discover() if m.version not in done]
+
+
+async def upgrade(bind, target: int | None = None) -> list[Migration]:
+    """Apply pending migrations up to `target` (default: all). Returns those applied."""
+    async with bind.connect() as lock:
+        if bind.dialect.name == "postgresql":
+            # Session-level lock on an autocommit connection, so no transaction stays open
+            lock = await lock.execution_options(isolation_level="AUTOCOMMIT")
+            await lock.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        try:
+            applied = []
+            for migration in await pending(bind):
+                if target is not None and migration.version > target:
+                    break
+                start = time.perf_counter()
+                print(f"Migration {migration.version:04d} {migration.name}: {migration.description}")
+                await migration.upgrade(bind)
+                async with bind.begin() as conn:
+                    await conn.execute(insert(schema_migrations).values(
+                        version=migration.version, name=migration.name, applied_at=datetime.utcnow(),
+                    ))
+                print(f"Migration {migration.version:04d} done in {time.perf_counter() - start:.1f}s")
+                applied.append(migration)
+            return applied
+        finally:
+            if bind.dialect.name == "postgresql":
+                await lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
@@ -0,0 +1,103 @@
+"""
+Building blocks for idempotent migrations on SQLite and Postgres.
+"""
+
+import asyncio
+from sqlalchemy import Column, inspect, text
+from app.config import get_settings
+
+
+async def columns(bind, table: str) -> set[str]:
+    """Column names of `table` (empty if the table does not exist)."""
+    async with bind.connect() as conn:
+        return await conn.run_sync(_columns, table)
+
+
+def _columns(sync_conn, table: str) -> set[str]:
+    inspector = inspect(sync_conn)
+    if not inspector.has_table(table):
+        return set()
+    return {c["name"] for c in inspector.get_columns(table)}
+
+
+async def add_column(bind, table: str, column: Column) -> bool:
+    """ALTER TABLE ... ADD COLUMN unless it exists. Returns whether it was added."""
+    if column.name in await columns(bind, table):
+        return False
+    async with bind.begin() as conn:
+        ddl = column.type.compile(dialect=conn.dialect)
+        await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {ddl}"))
+    return True
+
+
+async def drop_column(bind, table: str, name: str) -> bool:
+    if name not in await columns(bind, table):
+        return False
+    async with bind.begin() as conn:
+        await conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {name}"))
+    return True
+
+
+async def create_index(bind, name: str, table: str, *cols: str, unique: bool = False):
+    """
+    CREATE [UNIQUE] INDEX IF NOT EXISTS. On Postgres the index is built
+    CONCURRENTLY, so writes to the table carry on during the build.
+    """
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    async with bind.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} ({', '.join(cols)})"))
+        else:
+            await conn.execute(text(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(cols)})"))
+            await conn.commit()
+
+
+async def _batches(bind, table: str, key: str, batch_size: int | None):
+    """Key ranges (lo, hi) covering `table`, with a pause after each one."""
+    settings = get_settings()
+    batch_size = batch_size or settings.migration_batch_size
+    async with bind.connect() as conn:
+        lo, hi = (await conn.execute(text(f"SELECT min({key}), max({key}) FROM {table}"))).one()
+    if lo is None:
+        return
+    for start in range(lo, hi + 1, batch_size):
+        yield start, start + batch_size
+        # Give other writers a turn at the lock between batches
+        await asyncio.sleep(settings.migration_batch_pause)
+
+
+async def backfill(bind, statement: str, table: str = "leads", key: str = "id", batch_size: int | None = None) -> int:
+    """
+    Run `statement` over `table` in key ranges of `batch_size`, one short
+    transaction per range, so a large backfill never holds the write lock for
+    long. The statement selects its batch with `:lo <= key < :hi`.
+    Statements must skip rows they already handled, so an interrupted
+    backfill can simply run again. Returns the total rowcount.
+    """
+    total = 0
+    async for lo, hi in _batches(bind, table, key, batch_size):
+        async with bind.begin() as conn:
+            result = await conn.execute(text(statement), {"lo": lo, "hi": hi})
+            total += max(result.rowcount, 0)
+    return total
+
+
+async def backfill_rows(
+    bind, query: str, statement: str, transform, table: str = "leads", key: str = "id", batch_size: int | None = None,
+) -> int:
+    """
+    Like backfill(), for values computed in Python: `query` reads a batch
+    (`:lo <= key < :hi`), `transform` turns each row into parameters for
+    `statement` (or None to skip it), and `statement` runs once per row in
+    the same transaction. Returns the number of statements run.
+    """
+    total = 0
+    async for lo, hi in _batches(bind, table, key, batch_size):
+        async with bind.begin() as conn:
+            rows = (await conn.execute(text(query), {"lo": lo, "hi": hi})).all()
+            params = [p for p in map(transform, rows) if p is not None]
+            if params:
+                await conn.execute(text(statement), params)
+                total += len(params)
+    return total
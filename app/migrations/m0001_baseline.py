@@ -0,0 +1,11 @@
+"""Create missing tables from the models."""
+
+from app.database import Base
+
+
+async def upgrade(bind):
+    # Import models so they register with Base.metadata
+    from app.models import lead, campaign, preview_template, email_template, runtime_config  # noqa: F401
+
+    async with bind.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
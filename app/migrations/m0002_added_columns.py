@@ -0,0 +1,36 @@
+"""Add the columns introduced before migrations existed (token usage, cost, preview jobs, leases)."""
+
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from app.migrations.helpers import add_column, backfill
+
+LEAD_COLUMNS = [
+    Column("preview_job_id", String),
+    Column("cost_eur", Float),
+    Column("lease_owner", String),
+    Column("lease_expires_at", DateTime),
+]
+CAMPAIGN_COLUMNS = [
+    Column("input_tokens", Integer),
+    Column("cached_input_tokens", Integer),
+    Column("cache_write_tokens", Integer),
+    Column("output_tokens", Integer),
+    Column("cost_eur", Float),
+]
+
+
+async def upgrade(bind):
+    for column in LEAD_COLUMNS:
+        await add_column(bind, "leads", column)
+    for column in CAMPAIGN_COLUMNS:
+        await add_column(bind, "campaigns", column)
+
+    # Existing rows get the defaults new rows are created with
+    await backfill(bind, "UPDATE leads SET cost_eur = 0 WHERE cost_eur IS NULL AND id >= :lo AND id < :hi")
+    await backfill(
+        bind,
+        "UPDATE campaigns SET input_tokens = coalesce(input_tokens, 0), "
+        "cached_input_tokens = coalesce(cached_input_tokens, 0), "
+        "cache_write_tokens = coalesce(cache_write_tokens, 0), output_tokens = coalesce(output_tokens, 0), "
+        "cost_eur = coalesce(cost_eur, 0) WHERE id >= :lo AND id < :hi",
+        table="campaigns",
+    )
@@ -0,0 +1,38 @@
+"""Move analysis, email draft and preview prompt text from leads into their side tables."""
+
+from app.migrations.helpers import backfill, columns, drop_column
+
+LEGACY_COLUMNS = ("site_issues", "analysis_summary", "preview_prompt", "email_subject", "email_body")
+
+
+async def upgrade(bind):
+    legacy = await columns(bind, "leads") & set(LEGACY_COLUMNS)
+    if not legacy:
+        return
+
+    # site_issues was a JSON string; Postgres needs it cast to the native type
+    issues = "CAST(site_issues AS JSONB)" if bind.dialect.name == "postgresql" else "site_issues"
+    batch = "leads.id >= :lo AND leads.id < :hi"
+    moved = await backfill(bind, f"""
+        INSERT INTO lead_analysis (lead_id, issues, summary)
+        SELECT id, {issues}, analysis_summary FROM leads
+        WHERE {batch} AND (site_issues IS NOT NULL OR analysis_summary IS NOT NULL)
+          AND NOT EXISTS (SELECT 1 FROM lead_analysis WHERE lead_analysis.lead_id = leads.id)
+    """)
+    await backfill(bind, f"""
+        INSERT INTO lead_email (lead_id, subject, body)
+        SELECT id, email_subject, email_body FROM leads
+        WHERE {batch} AND (email_subject IS NOT NULL OR email_body IS NOT NULL)
+          AND NOT EXISTS (SELECT 1 FROM lead_email WHERE lead_email.lead_id = leads.id)
+    """)
+    await backfill(bind, f"""
+        INSERT INTO lead_preview (lead_id, prompt)
+        SELECT id, preview_prompt FROM leads
+        WHERE {batch} AND preview_prompt IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM lead_preview WHERE lead_preview.lead_id = leads.id)
+    """)
+    print(f"  moved details of {moved} analyzed leads")
+
+    # SQLite gives the space back to the file only after VACUUM (scripts/migrate.py --vacuum)
+    for column in LEGACY_COLUMNS:
+        await drop_column(bind, "leads", column)
@@ -0,0 +1,10 @@
+"""Index the lead columns that queue claims and dashboard filters scan (status, campaign, preview status)."""
+
+from app.migrations.helpers import create_index
+
+
+async def upgrade(bind):
+    # Same names as the model's index=True columns, so fresh databases already have them
+    await create_index(bind, "ix_leads_status", "leads", "status")
+    await create_index(bind, "ix_leads_campaign_id", "leads", "campaign_id")
+    await create_index(bind, "ix_leads_preview_status", "leads", "preview_status")
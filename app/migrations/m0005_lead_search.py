@@ -0,0 +1,138 @@
+"""Full-text search index over lead names, addresses, analysis and email drafts."""
+
+from sqlalchemy import text
+from app.migrations.helpers import backfill
+
+# SQLite: an FTS5 table with rowid = leads.id. It stores its own copy of the
+# text, so highlight() and snippet() work without joins.
+SQLITE_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS lead_search USING fts5(
+        business_name, address, city, summary, issues, email_body,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+"""
+
+SQLITE_ROW = """
+    SELECT l.id, l.business_name, l.address, l.city, a.summary,
+           CASE WHEN json_valid(a.issues)
+                THEN (SELECT group_concat(value, '; ') FROM json_each(a.issues)) ELSE a.issues END,
+           e.body
+    FROM leads l
+    LEFT JOIN lead_analysis a ON a.lead_id = l.id
+    LEFT JOIN lead_email e ON e.lead_id = l.id
+"""
+
+SQLITE_COLUMNS = "rowid, business_name, address, city, summary, issues, email_body"
+
+
+def _sqlite_refresh(lead_id: str) -> str:
+    return (
+        f"DELETE FROM lead_search WHERE rowid = {lead_id}; "
+        f"INSERT INTO lead_search ({SQLITE_COLUMNS}) {SQLITE_ROW} WHERE l.id = {lead_id};"
+    )
+
+
+# Triggers keep the index in sync with every writer (app, workers, scripts).
+# Lead updates only reindex when a searched column changes, so queue claims
+# and status changes stay cheap.
+SQLITE_TRIGGERS = {
+    "lead_search_leads_insert": f"AFTER INSERT ON leads BEGIN {_sqlite_refresh('NEW.id')} END",
+    "lead_search_leads_update": (
+        f"AFTER UPDATE OF business_name, address, city ON leads BEGIN {_sqlite_refresh('NEW.id')} END"
+    ),
+    "lead_search_leads_delete": "AFTER DELETE ON leads BEGIN DELETE FROM lead_search WHERE rowid = OLD.id; END",
+    "lead_search_analysis_insert": f"AFTER INSERT ON lead_analysis BEGIN {_sqlite_refresh('NEW.lead_id')} END",
+    "lead_search_analysis_update": (
+        f"AFTER UPDATE OF issues, summary ON lead_analysis BEGIN {_sqlite_refresh('NEW.lead_id')} END"
+    ),
+    "lead_search_analysis_delete": f"AFTER DELETE ON lead_analysis BEGIN {_sqlite_refresh('OLD.lead_id')} END",
+    "lead_search_email_insert": f"AFTER INSERT ON lead_email BEGIN {_sqlite_refresh('NEW.lead_id')} END",
+    "lead_search_email_update": f"AFTER UPDATE OF body ON lead_email BEGIN {_sqlite_refresh('NEW.lead_id')} END",
+    "lead_search_email_delete": f"AFTER DELETE ON lead_email BEGIN {_sqlite_refresh('OLD.lead_id')} END",
+}
+
+# Postgres: one tsvector per lead in a side table with a GIN index, refreshed
+# by the same triggers. Name and address rank above the analysis and draft text.
+POSTGRES_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(l.business_name, '')), 'A')
+    || setweight(to_tsvector('simple', concat_ws(' ', l.address, l.city)), 'B')
+    || setweight(to_tsvector('simple', concat_ws(' ', a.summary, (
+        SELECT string_agg(value, '; ') FROM jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(a.issues) = 'array' THEN a.issues ELSE '[]'::jsonb END)
+    ), e.body)), 'C')
+"""
+
+POSTGRES_ROW = f"""
+    SELECT l.id, {POSTGRES_DOCUMENT}
+    FROM leads l
+    LEFT JOIN lead_analysis a ON a.lead_id = l.id
+    LEFT JOIN lead_email e ON e.lead_id = l.id
+"""
+
+POSTGRES_DDL = [
+    "CREATE TABLE IF NOT EXISTS lead_search (lead_id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_lead_search_document ON lead_search USING GIN (document)",
+    f"""
+    CREATE OR REPLACE FUNCTION lead_search_refresh(target_id INTEGER) RETURNS void AS $$
+        DELETE FROM lead_search WHERE lead_id = target_id;
+        INSERT INTO lead_search (lead_id, document) {POSTGRES_ROW} WHERE l.id = target_id;
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lead_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_TABLE_NAME = 'leads' THEN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM lead_search WHERE lead_id = OLD.id;
+            ELSE
+                PERFORM lead_search_refresh(NEW.id);
+            END IF;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM lead_search_refresh(OLD.lead_id);
+        ELSE
+            PERFORM lead_search_refresh(NEW.lead_id);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+POSTGRES_TRIGGERS = {
+    "lead_search_leads": "AFTER INSERT OR DELETE OR UPDATE OF business_name, address, city ON leads",
+    "lead_search_analysis": "AFTER INSERT OR DELETE OR UPDATE OF issues, summary ON lead_analysis",
+    "lead_search_email": "AFTER INSERT OR DELETE OR UPDATE OF body ON lead_email",
+}
+
+
+async def upgrade(bind):
+    postgres = bind.dialect.name == "postgresql"
+    async with bind.begin() as conn:
+        if postgres:
+            for ddl in POSTGRES_DDL:
+                await conn.execute(text(ddl))
+            for name, when in POSTGRES_TRIGGERS.items():
+                table = when.rsplit(" ON ", 1)[1]
+                await conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+                await conn.execute(text(
+                    f"CREATE TRIGGER {name} {when} FOR EACH ROW EXECUTE FUNCTION lead_search_trigger()"
+                ))
+        else:
+            await conn.execute(text(SQLITE_TABLE))
+            for name, body in SQLITE_TRIGGERS.items():
+                await conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+
+    # Index the leads that already exist
+    batch = "l.id >= :lo AND l.id < :hi"
+    if postgres:
+        indexed = await backfill(bind, f"""
+            INSERT INTO lead_search (lead_id, document) {POSTGRES_ROW}
+            WHERE {batch} AND NOT EXISTS (SELECT 1 FROM lead_search s WHERE s.lead_id = l.id)
+        """)
+    else:
+        indexed = await backfill(bind, f"""
+            INSERT INTO lead_search ({SQLITE_COLUMNS}) {SQLITE_ROW}
+            WHERE {batch} AND NOT EXISTS (SELECT 1 FROM lead_search s WHERE s.rowid = l.id)
+        """)
+    if indexed:
+        print(f"  indexed {indexed} leads for search")
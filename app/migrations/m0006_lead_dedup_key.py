@@ -0,0 +1,40 @@
+"""Add leads.dedup_key so scrapes and imports skip businesses that are already stored."""
+
+import re
+from urllib.parse import urlsplit
+from sqlalchemy import Column, String
+from app.migrations.helpers import add_column, backfill_rows, create_index
+
+
+# Frozen copy of lead_io.dedup_key() as of this migration: later changes to
+# the live function must not change what this backfill computes.
+def _normalize(value: str | None) -> str:
+    return " ".join(re.findall(r"\w+", (value or "").lower()))
+
+
+def _dedup_key(business_name: str | None, city: str | None, website_url: str | None) -> str | None:
+    host = ""
+    if website_url and website_url.strip():
+        url = website_url.strip()
+        host = (urlsplit(url if "//" in url else f"//{url}").hostname or "").removeprefix("www.")
+    identity = f"web:{host}" if host else f"name:{_normalize(business_name)}" if _normalize(business_name) else ""
+    if not identity:
+        return None
+    return f"{identity}|{_normalize(city)}"
+
+
+async def upgrade(bind):
+    await add_column(bind, "leads", Column("dedup_key", String))
+    # Unique before the backfill: of existing duplicates the lowest id keeps the key
+    await create_index(bind, "ix_leads_dedup_key", "leads", "dedup_key", unique=True)
+
+    keyed = await backfill_rows(
+        bind,
+        """SELECT id, business_name, city, website_url FROM leads
+           WHERE id >= :lo AND id < :hi AND dedup_key IS NULL ORDER BY id""",
+        """UPDATE leads SET dedup_key = :key
+           WHERE id = :id AND NOT EXISTS (SELECT 1 FROM leads d WHERE d.dedup_key = :key)""",
+        lambda row: {"id": row.id, "key": key} if (key := _dedup_key(row.business_name, row.city, row.website_url)) else None,
+    )
+    if keyed:
+        print(f"  computed dedup keys for {keyed} leads")
@@ -0,0 +1,37 @@
+"""Add leads.priority and leads.seen_count, indexed for highest-priority-first claims."""
+
+import json
+import math
+from sqlalchemy import Column, Integer
+from app.config import get_settings
+from app.migrations.helpers import add_column, backfill, backfill_rows, create_index
+
+
+# Frozen copy of priority.score() for a lead seen once, as of this migration:
+# later changes to the live scoring must not change what this backfill computes.
+def _score(rating, reviews_count, website_url, business_type, niche_values: dict[str, float]) -> int:
+    need = 40 if not (website_url or "").strip() else 0
+    reputation = 25 * min(max(rating or 0.0, 0.0), 5.0) / 5
+    reach = 25 * min(1.0, math.log10(1 + max(reviews_count or 0, 0)) / math.log10(1 + 1000))
+    return round((need + reputation + reach) * niche_values.get((business_type or "").strip().lower(), 1.0))
+
+
+async def upgrade(bind):
+    await add_column(bind, "leads", Column("seen_count", Integer))
+    await add_column(bind, "leads", Column("priority", Integer))
+    await create_index(bind, "ix_leads_status_priority", "leads", "status", "priority")
+
+    await backfill(bind, "UPDATE leads SET seen_count = 1 WHERE id >= :lo AND id < :hi AND seen_count IS NULL")
+    raw = get_settings().niche_values
+    niche_values = {niche.strip().lower(): float(value) for niche, value in (json.loads(raw) if raw else {}).items()}
+    scored = await backfill_rows(
+        bind,
+        """SELECT id, rating, reviews_count, website_url, business_type FROM leads
+           WHERE id >= :lo AND id < :hi AND priority IS NULL""",
+        "UPDATE leads SET priority = :priority WHERE id = :id",
+        lambda row: {"id": row.id, "priority": _score(
+            row.rating, row.reviews_count, row.website_url, row.business_type, niche_values,
+        )},
+    )
+    if scored:
+        print(f"  scored {scored} leads")
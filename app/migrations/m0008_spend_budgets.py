@@ -0,0 +1,12 @@
+"""Add campaigns.budget_eur and the daily_spend table for spend budgets."""
+
+from sqlalchemy import Column, Float
+from app.migrations.helpers import add_column
+
+
+async def upgrade(bind):
+    from app.models.campaign import DailySpend
+
+    await add_column(bind, "campaigns", Column("budget_eur", Float))
+    async with bind.begin() as conn:
+        await conn.run_sync(DailySpend.__table__.create, checkfirst=True)
@@ -0,0 +1,15 @@
+"""Add recurring campaign definitions and the website fingerprint of leads."""
+
+from sqlalchemy import Column, Integer, String
+from app.migrations.helpers import add_column, create_index
+
+
+async def upgrade(bind):
+    from app.models.campaign import RecurringCampaign
+
+    async with bind.begin() as conn:
+        await conn.run_sync(RecurringCampaign.__table__.create, checkfirst=True)
+    await add_column(bind, "campaigns", Column("recurring_id", Integer))
+    await create_index(bind, "ix_campaigns_recurring_id", "campaigns", "recurring_id")
+    for name in ("site_etag", "site_last_modified", "site_hash"):
+        await add_column(bind, "leads", Column(name, String))
@@ -0,0 +1,9 @@
+"""Add leads.site_checked_at, indexed so the website change sweep takes the stalest sites first."""
+
+from sqlalchemy import Column, DateTime
+from app.migrations.helpers import add_column, create_index
+
+
+async def upgrade(bind):
+    await add_column(bind, "leads", Column("site_checked_at", DateTime))
+    await create_index(bind, "ix_leads_site_checked_at", "leads", "site_checked_at")
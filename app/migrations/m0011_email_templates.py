@@ -0,0 +1,8 @@
+"""Add the per-niche email body templates used by hybrid email drafting."""
+
+
+async def upgrade(bind):
+    from app.models.email_template import EmailTemplate
+
+    async with bind.begin() as conn:
+        await conn.run_sync(EmailTemplate.__table__.create, checkfirst=True)
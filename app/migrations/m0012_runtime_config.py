@@ -0,0 +1,8 @@
+"""Add the runtime_config table holding versioned settings overrides."""
+
+
+async def upgrade(bind):
+    from app.models.runtime_config import RuntimeConfig
+
+    async with bind.begin() as conn:
+        await conn.run_sync(RuntimeConfig.__table__.create, checkfirst=True)
@@ -1,9 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Float, ForeignKey, Text
 from sqlalchemy.orm import relationship
+from app.config import get_settings
 from app.database import Base
 
 
+def _default_budget():
+    budget = get_settings().campaign_budget_eur
+    return budget if budget > 0 else None
+
+
 class Campaign(Base):
     __tablename__ = "campaigns"
 
@@ -16,10 +22,53 @@ class Campaign(Base):
     total_emailed = Column(Integer, default=0)
     total_replied = Column(Integer, default=0)
     total_closed = Column(Integer, default=0)
+    # Claude token usage — input_tokens is uncached input only
+    input_tokens = Column(Integer, default=0)
+    cached_input_tokens = Column(Integer, default=0)
+    cache_write_tokens = Column(Integer, default=0)
+    output_tokens = Column(Integer, default=0)
+    cost_eur = Column(Float, default=0.0)  # estimated API spend
+    budget_eur = Column(Float, nullable=True, default=_default_budget)  # spend cap; None = unlimited
     status = Column(String, default="active")  # active | paused | completed
+    recurring_id = Column(Integer, ForeignKey("recurring_campaigns.id"), nullable=True, index=True)  # run of
     created_at = Column(DateTime, default=datetime.utcnow)
 
     leads = relationship("Lead", backref="campaign", lazy="dynamic")
 
     def __repr__(self):
         return f"<Campaign {self.id}: {self.name} ({self.status})>"
+
+
+class DailySpend(Base):
+    """Estimated API spend of all campaigns together on one (UTC) day."""
+
+    __tablename__ = "daily_spend"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    cost_eur = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<DailySpend {self.day}: {self.cost_eur:.2f}>"
+
+
+class RecurringCampaign(Base):
+    """A niche scraped in a set of locations on a cron schedule; each run creates a campaign per location."""
+
+    __tablename__ = "recurring_campaigns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    niche = Column(String, nullable=False)
+    locations = Column(Text, nullable=False)  # one per line
+    cron = Column(String, nullable=False)  # crontab expression, e.g. "0 9 * * mon"
+    lead_limit = Column(Integer, default=20)  # businesses scraped per location and run
+    enabled = Column(Boolean, default=True)
+    last_run_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def location_list(self) -> list[str]:
+        return [line.strip() for line in (self.locations or "").splitlines() if line.strip()]
+
+    def __repr__(self):
+        return f"<RecurringCampaign {self.id}: {self.name} ({self.cron})>"
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from app.database import Base
+
+
+class EmailTemplate(Base):
+    """A niche's cold email body, written once; hybrid drafts slot a per-lead opener into it."""
+
+    __tablename__ = "email_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    business_type = Column(String, nullable=False, unique=True, index=True)  # normalized: stripped, lower case
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)  # with {opener}, {business_name}, {city} and {preview_url} placeholders
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EmailTemplate {self.id}: {self.business_type}>"
@@ -1,13 +1,19 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import JSON, Column, Integer, String, Float, DateTime, ForeignKey, Index, Text, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import Session, relationship, selectinload
+from sqlalchemy.orm.util import identity_key
 from app.database import Base
 
 
 class Lead(Base):
     __tablename__ = "leads"
+    # Queue claims pick a stage's highest-priority leads
+    __table_args__ = (Index("ix_leads_status_priority", "status", "priority"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=True, index=True)
 
     # Business info (from Outscraper)
     business_name = Column(String, nullable=False)
@@ -20,28 +26,97 @@ class Lead(Base):
     google_maps_url = Column(String, default="")
     rating = Column(Float, nullable=True)
     reviews_count = Column(Integer, nullable=True)
+    # Website host (or name) plus city, normalized; ingestion skips businesses already stored (services/lead_io.py)
+    dedup_key = Column(String, nullable=True, unique=True, index=True)
+    seen_count = Column(Integer, default=1)  # times ingestion met this business
+    # Work order: higher first (services/priority.py), set at ingestion
+    priority = Column(Integer, default=0)
 
-    # Analysis (from Claude API)
+    # Website fingerprint from the pre-filter fetch; recurring scrapes re-analyze a site only when it changed
+    site_etag = Column(String, nullable=True)
+    site_last_modified = Column(String, nullable=True)
+    site_hash = Column(String, nullable=True)  # of the page text, scripts and whitespace stripped
+    site_checked_at = Column(DateTime, nullable=True, index=True)  # last change check (services/site_sweep.py)
+
+    # Analysis (from Claude API) — issues and summary live in lead_analysis
     screenshot_url = Column(String, nullable=True)
     site_score = Column(Integer, nullable=True)
-    site_issues = Column(Text, nullable=True)  # JSON string
-    analysis_summary = Column(Text, nullable=True)
 
-    # Preview (from Lovable API)
+    # Preview (from Lovable API) — the prompt lives in lead_preview
     preview_url = Column(String, nullable=True)
-    preview_prompt = Column(Text, nullable=True)
-    preview_status = Column(String, default="pending")  # pending | generating | ready | failed
+    preview_status = Column(String, default="pending", index=True)  # pending | generating | ready | failed
+    preview_job_id = Column(String, nullable=True)  # provider project id while generating
 
-    # Outreach (from Instantly.ai)
-    email_subject = Column(String, nullable=True)
-    email_body = Column(Text, nullable=True)
-    email_status = Column(String, default="draft")  # draft | sent | opened | clicked | replied | bounced
+    # Outreach (from Instantly.ai) — the draft lives in lead_email
+    email_status = Column(String, default="draft")  # pending | draft | sent | opened | clicked | replied | bounced
     email_sent_at = Column(DateTime, nullable=True)
 
+    # Estimated API spend for this lead (EUR)
+    cost_eur = Column(Float, default=0.0)
+
     # Pipeline status
-    status = Column(String, default="scraped")  # scraped | analyzed | preview_ready | email_drafted | sent | responded | closed
+    status = Column(String, default="scraped", index=True)  # scraped | interrupted | analyzed | preview_ready | email_drafted | sent | responded | closed | error
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Work-queue lease (see services/queue.py): which worker holds the lead, and until when
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    # Bulky text is kept out of the hot table and never lazy-loaded: load it
+    # with LEAD_DETAILS where it is read or written (pipeline, detail view, send)
+    analysis = relationship("LeadAnalysis", uselist=False, lazy="raise_on_sql", cascade="all, delete-orphan")
+    email_draft = relationship("LeadEmail", uselist=False, lazy="raise_on_sql", cascade="all, delete-orphan")
+    preview = relationship("LeadPreview", uselist=False, lazy="raise_on_sql", cascade="all, delete-orphan")
+
+    site_issues = association_proxy("analysis", "issues", creator=lambda issues: LeadAnalysis(issues=issues))
+    analysis_summary = association_proxy("analysis", "summary", creator=lambda summary: LeadAnalysis(summary=summary))
+    email_subject = association_proxy("email_draft", "subject", creator=lambda subject: LeadEmail(subject=subject))
+    email_body = association_proxy("email_draft", "body", creator=lambda body: LeadEmail(body=body))
+    preview_prompt = association_proxy("preview", "prompt", creator=lambda prompt: LeadPreview(prompt=prompt))
+
     def __repr__(self):
         return f"<Lead {self.id}: {self.business_name} ({self.status})>"
+
+
+class LeadAnalysis(Base):
+    __tablename__ = "lead_analysis"
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    issues = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)  # list of strings
+    summary = Column(Text, nullable=True)
+
+
+class LeadEmail(Base):
+    __tablename__ = "lead_email"
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    subject = Column(String, nullable=True)
+    body = Column(Text, nullable=True)
+
+
+class LeadPreview(Base):
+    __tablename__ = "lead_preview"
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    prompt = Column(Text, nullable=True)
+
+
+LEAD_DETAILS = (selectinload(Lead.analysis), selectinload(Lead.email_draft), selectinload(Lead.preview))
+
+
+@event.listens_for(Session, "before_flush")
+def _touch_leads(session: Session, flush_context, instances):
+    """
+    Bump Lead.updated_at when only its detail rows change (e.g. an edited email
+    draft): the leads row itself is not updated then, but the detail page and
+    its ETag (see main.lead_detail) are versioned by updated_at.
+    """
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Lead):
+            if obj.id is not None and obj not in session.new and session.is_modified(obj):
+                obj.updated_at = datetime.utcnow()
+        elif isinstance(obj, (LeadAnalysis, LeadEmail, LeadPreview)) and obj.lead_id is not None:
+            lead = session.identity_map.get(identity_key(Lead, obj.lead_id))
+            if lead is not None:
+                lead.updated_at = datetime.utcnow()
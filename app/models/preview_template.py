@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from app.database import Base
+
+
+class PreviewTemplate(Base):
+    """A generated preview site reused as a template for similar leads."""
+
+    __tablename__ = "preview_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String, nullable=False, unique=True, index=True)  # business_type + priorities
+    business_type = Column(String, nullable=False)
+    priorities = Column(Text, nullable=True)  # JSON string
+    project_id = Column(String, nullable=False)
+    preview_url = Column(String, nullable=True)
+    status = Column(String, default="generating")  # generating | ready | failed
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PreviewTemplate {self.id}: {self.cache_key} ({self.status})>"
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, Text
+from app.database import Base
+
+
+class RuntimeConfig(Base):
+    """One saved version of the settings edited on /settings; the highest version is in effect."""
+
+    __tablename__ = "runtime_config"
+
+    version = Column(Integer, primary_key=True)
+    values = Column(Text, nullable=False)  # JSON: overridden setting → value (config.RUNTIME_FIELDS only)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<RuntimeConfig v{self.version}>"
@@ -1,30 +1,188 @@
 """
 APScheduler setup for batch processing jobs.
-Runs pipeline on a schedule (e.g., every Monday at 9am).
+Polls asynchronous preview builds, works off queued leads (re-queued changed
+sites, interrupted and budget-stopped leads; scripts/worker.py does the same
+at scale), runs recurring campaigns on their cron schedules and sweeps
+analyzed leads' websites for changes. Recurring definitions live in the
+database; their jobs are synced from it every RECURRING_SYNC_SECONDS, so
+definitions added or changed elsewhere (dashboard, another process) are
+picked up. Runtime config versions saved by another web process are
+applied every RUNTIME_CONFIG_SYNC_SECONDS.
+Jobs are drain.tracked: none start once the app shuts down, and running ones
+get until DRAIN_TIMEOUT to finish (see drain_scheduler).
 """
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+import os
+from datetime import datetime
+from app import drain
 from app.config import get_settings
+from app.database import AsyncSessionLocal
 
-scheduler = AsyncIOScheduler()
+RECURRING_SYNC_SECONDS = 60
+RUNTIME_CONFIG_SYNC_SECONDS = 30
+
+scheduler = None  # created by init_scheduler, so importing the app doesn't load APScheduler
+
+
+@drain.tracked
+async def poll_previews_job():
+    """Check generating previews and draft emails for finished ones."""
+    from app.services.pipeline import poll_previews
+
+    async with AsyncSessionLocal() as db:
+        counts = await poll_previews(db)
+        if counts["ready"] or counts["failed"]:
+            print(f"Preview poll: {counts}")
+
+
+@drain.tracked
+async def process_queue_job():
+    """Process queued leads that no inline pipeline run is working on, until the queue is empty."""
+    from app.worker import run_worker
+
+    stats = await run_worker(
+        f"scheduler-{os.getpid()}", ("process",), stop_when_idle=True, session_factory=AsyncSessionLocal,
+    )
+    if stats["analyzed"] or stats["errors"] or stats["over_budget"]:
+        print(f"Queue run: {stats['analyzed']} analyzed, {stats['emails_drafted']} drafted, "
+              f"{stats['over_budget']} over budget, {len(stats['errors'])} errors")
+
+
+@drain.tracked
+async def site_sweep_job():
+    """Re-queue analyzed leads whose website changed since it was last checked."""
+    from app.services.site_sweep import sweep
+
+    async with AsyncSessionLocal() as db:
+        counts = await sweep(db)
+        if counts["checked"]:
+            print(f"Site sweep: {counts}")
+
+
+@drain.tracked
+async def runtime_config_job():
+    """Apply the newest runtime config version, if another process saved one."""
+    from app.services import runtime_config
+
+    async with AsyncSessionLocal() as db:
+        await runtime_config.refresh(db)
+
+
+@drain.tracked
+async def sync_recurring_job():
+    """Schedule every enabled recurring campaign at its cron; drop the others."""
+    from datetime import timedelta, timezone
+    from sqlalchemy import select
+    from apscheduler.triggers.cron import CronTrigger
+    from app.models.campaign import RecurringCampaign
+    from app.services import recurring
+    from app.triggers import OffsetTrigger
+
+    async with AsyncSessionLocal() as db:
+        definitions = (await db.scalars(select(RecurringCampaign).where(RecurringCampaign.enabled.is_(True)))).all()
+
+    now = datetime.now(timezone.utc)
+    wanted = {}
+    for definition in definitions:
+        try:
+            cron = CronTrigger.from_crontab(definition.cron)
+        except ValueError as e:
+            print(f"Recurring campaign {definition.id} has an invalid cron '{definition.cron}': {e}")
+            continue
+        # Stay within the cron interval, so a run never overlaps the next one
+        first = cron.get_next_fire_time(None, now)
+        interval = (cron.get_next_fire_time(first, first + timedelta(seconds=1)) - first).total_seconds()
+        wanted[f"recurring-{definition.id}"] = (
+            definition, OffsetTrigger(cron, recurring.stagger(definition.id, interval)),
+        )
+
+    for job in scheduler.get_jobs():
+        if job.id.startswith("recurring-") and job.id not in wanted:
+            job.remove()
+    for job_id, (definition, trigger) in wanted.items():
+        job = scheduler.get_job(job_id)
+        if job is None or str(job.trigger) != str(trigger):
+            scheduler.add_job(
+                run_recurring_job, trigger, args=[definition.id],
+                id=job_id, replace_existing=True, max_instances=1, coalesce=True,
+            )
+
+
+@drain.tracked
+async def run_recurring_job(definition_id: int):
+    """Run one recurring campaign; its stagger is part of the trigger."""
+    from app.models.campaign import RecurringCampaign
+    from app.services import recurring
+
+    async with AsyncSessionLocal() as db:
+        definition = await db.get(RecurringCampaign, definition_id)
+        if definition is None or not definition.enabled:
+            return
+        await recurring.run(db, definition)
 
 
 def init_scheduler():
     """Initialize and start the scheduler with default jobs."""
-    # Jobs will be added in Phase 5 when automation is implemented
-    # Example future job:
-    # scheduler.add_job(
-    #     run_scheduled_pipeline,
-    #     "cron",
-    #     day_of_week="mon",
-    #     hour=9,
-    #     minute=0,
-    #     id="weekly_pipeline",
-    # )
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    global scheduler
+    settings = get_settings()
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        poll_previews_job,
+        "interval",
+        seconds=settings.preview_poll_interval,
+        id="poll_previews",
+        max_instances=1,
+        coalesce=True,
+    )
+    if settings.queue_process_seconds > 0:
+        scheduler.add_job(
+            process_queue_job,
+            "interval",
+            seconds=settings.queue_process_seconds,
+            id="process_queue",
+            max_instances=1,
+            coalesce=True,
+        )
+
+    if settings.site_sweep_minutes > 0:
+        scheduler.add_job(
+            site_sweep_job,
+            "interval",
+            minutes=settings.site_sweep_minutes,
+            id="site_sweep",
+            max_instances=1,
+            coalesce=True,
+        )
+    scheduler.add_job(
+        sync_recurring_job,
+        "interval",
+        seconds=RECURRING_SYNC_SECONDS,
+        id="sync_recurring",
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(),
+    )
+    scheduler.add_job(
+        runtime_config_job,
+        "interval",
+        seconds=RUNTIME_CONFIG_SYNC_SECONDS,
+        id="runtime_config",
+        max_instances=1,
+        coalesce=True,
+    )
     scheduler.start()
 
 
 def shutdown_scheduler():
-    """Gracefully shutdown the scheduler."""
-    if scheduler.running:
+    """Stop starting jobs; running ones are left to drain_scheduler()."""
+    if scheduler is not None and scheduler.running:
         scheduler.shutdown(wait=False)
+
+
+async def drain_scheduler():
+    """Stop the scheduler and let running jobs finish until the drain deadline."""
+    drain.request()
+    shutdown_scheduler()
+    await drain.wait()
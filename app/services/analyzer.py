@@ -7,16 +7,16 @@ Mock mode: Returns realistic mock analysis data.
 """
 
 import base64
-import json
 import random
 from pathlib import Path
-import anthropic
 from app.config import get_settings
+from app.services import budgets, claude, simulator
+from app.services.schemas import AnalysisResult
 
 SCREENSHOTS_DIR = Path(__file__).parent.parent / "static" / "screenshots"
 
-ANALYSIS_PROMPT = """You are a web design expert analyzing a small business website.
-Look at this screenshot of {business_name} ({business_type} in {city}).
+# Invariant instructions — sent as a prompt-cached system block
+ANALYSIS_SYSTEM = """You are a web design expert analyzing small business websites.
 
 Score the website 1-100 on these criteria:
 - Mobile readiness (does it look like it would work on mobile?)
@@ -27,7 +27,7 @@ Score the website 1-100 on these criteria:
 - SEO basics (clear headings, readable text?)
 
 Return ONLY a JSON object (no markdown, no extra text):
-{{
+{
     "score": 35,
     "issues": [
         "Issue 1",
@@ -35,7 +35,12 @@ Return ONLY a JSON object (no markdown, no extra text):
     ],
     "summary": "Brief summary of the website quality",
     "redesign_priorities": ["priority 1", "priority 2"]
-}}"""
+}"""
+
+ANALYSIS_SYSTEM_BLOCKS = claude.cached_system(ANALYSIS_SYSTEM)
+
+# Per-lead variables — appended as the user message
+ANALYSIS_PROMPT = "Look at this screenshot of {business_name} ({business_type} in {city})."
 
 
 MOCK_ISSUES = [
@@ -77,14 +82,21 @@ async def analyze_website(
 ) -> dict:
     """
     Analyze a website screenshot with Claude AI.
-    Returns dict with score, issues, summary, redesign_priorities.
+    Returns dict with score, issues, summary, redesign_priorities
+    (plus token usage in real mode).
     """
     settings = get_settings()
 
-    if settings.mock_mode or not settings.anthropic_api_key:
-        return _mock_analyze(business_name, business_type, city)
+    async with budgets.spend("anthropic"):
+        if settings.mock_mode or not settings.anthropic_api_key:
+            try:
+                await simulator.call("anthropic")
+            except Exception as e:
+                print(f"Analysis failed for lead {lead_id}: {e}")
+                return _failed_analysis(f"Analysis failed: {e}")
+            return _mock_analyze(business_name, business_type, city)
 
-    return await _real_analyze(lead_id, business_name, business_type, city, screenshot_path)
+        return await _real_analyze(lead_id, business_name, business_type, city, screenshot_path)
 
 
 async def _real_analyze(
@@ -95,9 +107,6 @@ async def _real_analyze(
     screenshot_path: str | None,
 ) -> dict:
     """Analyze via Claude API with vision."""
-    settings = get_settings()
-    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
     prompt = ANALYSIS_PROMPT.format(
         business_name=business_name,
         business_type=business_type,
@@ -123,23 +132,31 @@ async def _real_analyze(
     messages_content.append({"type": "text", "text": prompt})
 
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": messages_content}],
+        result, usage = await claude.complete_json(
+            system=ANALYSIS_SYSTEM_BLOCKS,
+            content=messages_content,
+            schema=AnalysisResult,
         )
-
-        result_text = response.content[0].text
-        return json.loads(result_text)
-
     except Exception as e:
         print(f"Analysis failed for lead {lead_id}: {e}")
-        return {
-            "score": None,
-            "issues": [],
-            "summary": f"Analysis failed: {e}",
-            "redesign_priorities": [],
-        }
+        return _failed_analysis(f"Analysis failed: {e}")
+
+    if result is None:
+        print(f"Analysis returned invalid output for lead {lead_id}")
+        return _failed_analysis("Analysis failed: invalid response from Claude", usage)
+
+    result["usage"] = usage
+    return result
+
+
+def _failed_analysis(summary: str, usage: dict | None = None) -> dict:
+    return {
+        "score": None,
+        "issues": [],
+        "summary": summary,
+        "redesign_priorities": [],
+        "usage": usage,
+    }
 
 
 def _mock_analyze(business_name: str, business_type: str, city: str) -> dict:
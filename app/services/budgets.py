@@ -0,0 +1,161 @@
+"""
+Spend budgets: each campaign's own (Campaign.budget_eur) and a daily budget
+for all campaigns together (DAILY_BUDGET_EUR), both in estimated EUR.
+Every paid API call runs inside spend(). Before the call its estimated price
+is reserved with a conditional UPDATE per budget ("add it if it still
+fits"), which the database serializes, so concurrent workers can never
+jointly overshoot a budget; after the call the reservation is settled to
+what was actually charged (costs.charge). A campaign that cannot afford the
+next call is paused; when the daily budget runs out, claims of new work stop
+until the next UTC day.
+Campaign.cost_eur and the daily_spend table are kept current as calls settle.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import metrics
+from app.config import get_settings
+from app.models.campaign import Campaign, DailySpend
+from app.services import costs
+
+# (engine, campaign id) that spend() accounts to
+_scope: ContextVar[tuple | None] = ContextVar("budget_scope", default=None)
+
+
+class BudgetExceeded(Exception):
+    """A paid call was refused because its budget cannot cover it."""
+
+
+@contextmanager
+def scope(bind, campaign_id: int | None):
+    """
+    Account spend() calls inside the block to this campaign. Budget updates
+    run in their own short transactions on `bind`.
+    """
+    token = _scope.set((bind, campaign_id))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def today() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+@asynccontextmanager
+async def spend(provider: str):
+    """
+    Wrap one paid call: reserve its estimate (raising BudgetExceeded if a
+    budget cannot cover it), then settle to the actual charge, even on failure.
+    Outside a scope() calls are neither checked nor accounted.
+    """
+    current = _scope.get()
+    if current is None:
+        yield
+        return
+
+    bind, campaign_id = current
+    day = today()
+    reserved = await _reserve(bind, campaign_id, day, provider)
+    with costs.track_lead() as spent:
+        try:
+            yield
+        finally:
+            await _settle(bind, campaign_id, day, spent[0] - reserved)
+
+
+async def _reserve(bind, campaign_id: int | None, day: str, provider: str) -> float:
+    """Reserve the call's estimate; returns the amount reserved (0 when no budget applies)."""
+    amount = costs.estimate(provider)
+    daily = get_settings().daily_budget_eur
+    async with AsyncSession(bind=bind) as db:
+        budget = None
+        if campaign_id:
+            budget = await db.scalar(select(Campaign.budget_eur).where(Campaign.id == campaign_id))
+        if not amount or not (budget or daily > 0):
+            return 0.0
+
+        # A budget of 0 (or none) is unlimited: the reservation is booked unchecked
+        if campaign_id and not await _add_to_campaign(db, campaign_id, amount, checked=bool(budget)):
+            await db.rollback()
+            await db.execute(
+                update(Campaign).where(Campaign.id == campaign_id).values(status="paused")
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            metrics.BUDGET_REFUSALS.inc(budget="campaign")
+            print(f"Campaign {campaign_id} reached its budget of €{budget:.2f}; paused")
+            raise BudgetExceeded(f"Campaign {campaign_id} budget of €{budget:.2f} exhausted")
+        if not await _add_to_day(db, day, amount, limit=daily):
+            await db.rollback()
+            metrics.BUDGET_REFUSALS.inc(budget="daily")
+            raise BudgetExceeded(f"Daily budget of €{daily:.2f} exhausted")
+        await db.commit()
+    return amount
+
+
+async def _settle(bind, campaign_id: int | None, day: str, amount: float):
+    """Book the difference between the actual charge and the reservation."""
+    if not amount:
+        return
+    async with AsyncSession(bind=bind) as db:
+        if campaign_id:
+            await _add_to_campaign(db, campaign_id, amount)
+        await _add_to_day(db, day, amount)
+        await db.commit()
+
+
+async def _add_to_campaign(db: AsyncSession, campaign_id: int, amount: float, checked: bool = False) -> bool:
+    """Add to the campaign's spend; with `checked`, only if it stays within its budget."""
+    statement = update(Campaign).where(Campaign.id == campaign_id)
+    if checked:
+        statement = statement.where(or_(
+            Campaign.budget_eur.is_(None),
+            func.coalesce(Campaign.cost_eur, 0) + amount <= Campaign.budget_eur,
+        ))
+    result = await db.execute(
+        statement.values(cost_eur=func.coalesce(Campaign.cost_eur, 0) + amount)
+        .returning(Campaign.id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar() is not None
+
+
+async def _add_to_day(db: AsyncSession, day: str, amount: float, limit: float = 0.0) -> bool:
+    """Add to the day's spend (an upsert); with a `limit` > 0, only if it stays within it."""
+    if limit > 0 and amount > limit:
+        return False
+    table = DailySpend.__table__
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table).values(day=day, cost_eur=amount)
+    statement = statement.on_conflict_do_update(
+        index_elements=["day"],
+        set_={"cost_eur": table.c.cost_eur + statement.excluded.cost_eur},
+        where=table.c.cost_eur + statement.excluded.cost_eur <= limit if limit > 0 else None,
+    ).returning(table.c.day)
+    return (await db.execute(statement)).scalar() is not None
+
+
+def largest_call() -> float:
+    """Estimate of the dearest call a lead can need."""
+    providers = ["screenshotone", "anthropic"]
+    if get_settings().preview_provider == "lovable":
+        providers.append("lovable")
+    return max(costs.estimate(p) for p in providers)
+
+
+async def spent_today(db: AsyncSession) -> float:
+    return await db.scalar(select(DailySpend.cost_eur).where(DailySpend.day == today())) or 0.0
+
+
+async def daily_exhausted(db: AsyncSession) -> bool:
+    """Whether today's remaining budget can no longer cover every call of a lead."""
+    daily = get_settings().daily_budget_eur
+    if daily <= 0:
+        return False
+    return await spent_today(db) + largest_call() > daily
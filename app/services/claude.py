@@ -0,0 +1,211 @@
+"""
+Shared Anthropic Claude helpers.
+One pooled async client, prompt-cached system blocks, token usage accounting
+and structured JSON completion used by the analyzer and email writers.
+
+Prompt caching: the invariant instructions are sent as a system block marked
+with cache_control, and only the per-lead variables go in the user message.
+Anthropic only caches prefixes above a model-specific minimum length
+(1024 tokens for Sonnet); shorter blocks are simply billed as normal input.
+"""
+
+import json
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from pydantic import BaseModel, ValidationError
+from app import metrics
+from app.config import get_settings
+from app.services import costs
+
+if TYPE_CHECKING:
+    import anthropic
+
+MODEL = "claude-sonnet-4-20250514"
+
+USAGE_KEYS = ("input_tokens", "cached_input_tokens", "cache_write_tokens", "output_tokens")
+
+REPAIR_PROMPT = """Your previous reply could not be used: {error}
+Reply with ONLY the corrected JSON object — no markdown, no extra text."""
+
+
+@lru_cache
+def get_client() -> "anthropic.AsyncAnthropic":
+    """
+    Async client reused across calls so HTTP connections are pooled.
+    The SDK is imported here, on first real use: it is the slowest import in
+    the app and mock runs never need it.
+    """
+    import anthropic
+
+    settings = get_settings()
+    return anthropic.AsyncAnthropic(
+        api_key=settings.anthropic_api_key,
+        base_url=settings.anthropic_base_url or None,
+    )
+
+
+def cached_system(text: str) -> list[dict]:
+    """System prompt block marked for Anthropic prompt caching."""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+
+def usage_of(response) -> dict:
+    """
+    Token usage of a Messages API response.
+    input_tokens counts only uncached input; cached reads and cache writes are separate.
+    """
+    usage = response.usage
+    return {
+        "input_tokens": usage.input_tokens or 0,
+        "cached_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "output_tokens": usage.output_tokens or 0,
+    }
+
+
+def add_usage(total: dict | None, usage: dict | None) -> dict | None:
+    """Sum two usage dicts (either may be None)."""
+    if not usage:
+        return total
+    if not total:
+        return dict(usage)
+    return {k: total.get(k, 0) + usage.get(k, 0) for k in USAGE_KEYS}
+
+
+def parse_failure_rate() -> float:
+    """Share of structured responses that failed the first-pass parse."""
+    parses = metrics.CLAUDE_PARSES
+    total = parses.get(result="ok") + parses.get(result="repaired") + parses.get(result="unrecoverable")
+    if not total:
+        return 0.0
+    return (total - parses.get(result="ok")) / total
+
+
+class JsonObjectScanner:
+    """
+    Incremental brace matcher over streamed text.
+    feed() returns True once the first top-level JSON object has closed,
+    ignoring braces inside strings and any text before the object.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        for char in chunk:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"' and self.started:
+                self.in_string = True
+            elif char == "{":
+                self.depth += 1
+                self.started = True
+            elif char == "}" and self.started:
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+def extract_json(text: str) -> dict:
+    """
+    Pull the first JSON object out of a model reply.
+    Tolerates markdown fences, leading chatter and trailing prose.
+    Raises ValueError if no complete object is found.
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("no JSON object in response")
+
+    scanner = JsonObjectScanner()
+    for end in range(start, len(text)):
+        if scanner.feed(text[end]):
+            return json.loads(text[start:end + 1])
+    raise ValueError("unterminated JSON object in response")
+
+
+def validate(text: str, schema: type[BaseModel]) -> dict:
+    """Extract and validate a JSON reply. Raises ValueError/ValidationError."""
+    return schema.model_validate(extract_json(text)).model_dump()
+
+
+async def complete_json(
+    *,
+    system: list[dict],
+    content: list[dict] | str,
+    schema: type[BaseModel],
+    max_tokens: int = 1024,
+) -> tuple[dict | None, dict | None]:
+    """
+    Stream a completion and validate it against `schema`.
+
+    The stream is closed as soon as the JSON object is complete, so trailing
+    prose is never generated. If the reply does not validate, one repair call
+    re-prompts with the error as a last resort.
+    Returns (data or None, usage). API errors propagate to the caller.
+    """
+    messages = [{"role": "user", "content": content}]
+    text, usage = await _stream_json(system, messages, max_tokens)
+
+    try:
+        data = validate(text, schema)
+        metrics.CLAUDE_PARSES.inc(result="ok")
+        return data, usage
+    except (ValueError, ValidationError) as e:
+        error = e
+
+    # Last resort: ask the model to fix its own reply
+    metrics.RETRIES.inc(provider="anthropic")
+    messages += [
+        {"role": "assistant", "content": text.strip() or "{}"},
+        {"role": "user", "content": REPAIR_PROMPT.format(error=str(error)[:500])},
+    ]
+    repaired, repair_usage = await _stream_json(system, messages, max_tokens)
+    usage = add_usage(usage, repair_usage)
+    try:
+        data = validate(repaired, schema)
+        metrics.CLAUDE_PARSES.inc(result="repaired")
+        return data, usage
+    except (ValueError, ValidationError) as e:
+        metrics.CLAUDE_PARSES.inc(result="unrecoverable")
+        print(f"Structured output repair failed: {e}")
+        return None, usage
+
+
+async def _stream_json(system: list[dict], messages: list[dict], max_tokens: int) -> tuple[str, dict]:
+    """Stream text until the first JSON object closes. Returns (text, usage)."""
+    scanner = JsonObjectScanner()
+    chunks = []
+    stopped_early = False
+
+    with metrics.provider_call("anthropic"):
+        async with get_client().messages.stream(
+            model=MODEL,
+            max_tokens=max_tokens,
+            system=system,
+            messages=messages,
+        ) as stream:
+            async for chunk in stream.text_stream:
+                chunks.append(chunk)
+                if scanner.feed(chunk):
+                    stopped_early = True
+                    break
+            usage = usage_of(stream.current_message_snapshot)
+
+    text = "".join(chunks)
+    if stopped_early:
+        # The final usage event never arrives; estimate output at ~4 chars per token
+        usage["output_tokens"] = max(usage["output_tokens"], len(text) // 4)
+
+    for kind in USAGE_KEYS:
+        metrics.CLAUDE_TOKENS.inc(usage[kind], kind=kind)
+    costs.charge("anthropic", costs.claude_cost(usage))
+    return text, usage
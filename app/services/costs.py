@@ -0,0 +1,70 @@
+"""
+Estimated API cost accounting.
+Real provider calls charge their estimated price (from Settings) here; the
+pipeline collects the charges per lead with track_lead() and persists them
+on the lead, and budgets.spend() settles each call against its campaign.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from app.config import get_settings
+from app import metrics
+
+# Totals of the enclosing track_lead() blocks, innermost last
+_trackers: ContextVar[tuple[list[float], ...]] = ContextVar("cost_trackers", default=())
+
+
+def claude_cost(usage: dict | None) -> float:
+    """Estimated EUR cost of one Claude call from its token usage."""
+    if not usage:
+        return 0.0
+    settings = get_settings()
+    return (
+        usage.get("input_tokens", 0) * settings.price_claude_input_per_mtok
+        + usage.get("cached_input_tokens", 0) * settings.price_claude_cached_input_per_mtok
+        + usage.get("cache_write_tokens", 0) * settings.price_claude_cache_write_per_mtok
+        + usage.get("output_tokens", 0) * settings.price_claude_output_per_mtok
+    ) / 1_000_000
+
+
+def call_price(provider: str) -> float:
+    """Estimated EUR price of one call to a per-call priced provider."""
+    settings = get_settings()
+    return {
+        "outscraper": settings.price_outscraper_call,
+        "screenshotone": settings.price_screenshot,
+        "lovable": settings.price_lovable_preview,
+        "instantly": settings.price_instantly_email,
+    }.get(provider, 0.0)
+
+
+def estimate(provider: str) -> float:
+    """EUR to reserve before a call: its per-call price, or the Claude call estimate."""
+    if provider == "anthropic":
+        return get_settings().price_claude_call_estimate
+    return call_price(provider)
+
+
+def charge(provider: str, amount: float | None = None):
+    """Record spend for a completed call (defaults to the provider's per-call price)."""
+    if amount is None:
+        amount = call_price(provider)
+    if not amount:
+        return
+    metrics.COST_EUR.inc(amount, provider=provider)
+    for tracked in _trackers.get():
+        tracked[0] += amount
+
+
+@contextmanager
+def track_lead():
+    """
+    Collect charges made inside the block; yields a one-item list with the EUR
+    total. Blocks nest: a charge counts towards every enclosing block.
+    """
+    tracked = [0.0]
+    token = _trackers.set((*_trackers.get(), tracked))
+    try:
+        yield tracked
+    finally:
+        _trackers.reset(token)
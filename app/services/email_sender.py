@@ -7,10 +7,9 @@ Mock mode: Simulates email sending with random status updates.
 
 import random
 from datetime import datetime
-import httpx
+from app import metrics
 from app.config import get_settings
-
-INSTANTLY_BASE_URL = "https://api.instantly.ai/api/v2"
+from app.services import costs, simulator
 
 
 async def send_email(
@@ -26,6 +25,11 @@ async def send_email(
     settings = get_settings()
 
     if settings.mock_mode or not settings.instantly_api_key:
+        try:
+            await simulator.call("instantly")
+        except Exception as e:
+            print(f"Email send failed for lead {lead_id}: {e}")
+            return {"status": "failed", "error": str(e)}
         return _mock_send(to_email, subject, lead_id)
 
     return await _real_send(to_email, subject, body, lead_id)
@@ -38,25 +42,29 @@ async def _real_send(
     lead_id: int,
 ) -> dict:
     """Send via Instantly.ai API."""
+    import httpx
+
     settings = get_settings()
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                f"{INSTANTLY_BASE_URL}/emails/send",
-                headers={
-                    "Authorization": f"Bearer {settings.instantly_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "from": settings.instantly_sending_email,
-                    "to": to_email,
-                    "subject": subject,
-                    "body": body,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
+        with metrics.provider_call("instantly"):
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.post(
+                    f"{settings.instantly_base_url}/emails/send",
+                    headers={
+                        "Authorization": f"Bearer {settings.instantly_api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json={
+                        "from": settings.instantly_sending_email,
+                        "to": to_email,
+                        "subject": subject,
+                        "body": body,
+                    },
+                )
+                response.raise_for_status()
+                data = response.json()
+        costs.charge("instantly")
 
         return {
             "status": "sent",
@@ -79,14 +87,17 @@ async def check_email_status(email_id: str) -> dict:
     if settings.mock_mode or not settings.instantly_api_key:
         return _mock_status()
 
+    import httpx
+
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            response = await client.get(
-                f"{INSTANTLY_BASE_URL}/emails/{email_id}",
-                headers={"Authorization": f"Bearer {settings.instantly_api_key}"},
-            )
-            response.raise_for_status()
-            return response.json()
+        with metrics.provider_call("instantly"):
+            async with httpx.AsyncClient(timeout=15) as client:
+                response = await client.get(
+                    f"{settings.instantly_base_url}/emails/{email_id}",
+                    headers={"Authorization": f"Bearer {settings.instantly_api_key}"},
+                )
+                response.raise_for_status()
+                return response.json()
 
     except Exception as e:
         print(f"Status check failed for email {email_id}: {e}")
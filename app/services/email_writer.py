@@ -2,22 +2,28 @@
 Claude API email writer.
 Generates personalized cold emails in Dutch for each lead.
 
+Hybrid mode (EMAIL_MODE=hybrid): the body comes from a per-niche template
+that Claude writes once per business_type (stored in email_templates), and
+each email only asks Claude for a one or two sentence personalized opener,
+which is slotted into the template — a few dozen output tokens per email
+instead of a whole draft.
+
 Real mode: Uses Anthropic Claude API
 Mock mode: Returns realistic mock email content.
 """
 
-import json
 import random
-import anthropic
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import metrics
 from app.config import get_settings
+from app.models.email_template import EmailTemplate
+from app.services import budgets, claude, simulator
+from app.services.schemas import EmailDraft, EmailOpener
 
-EMAIL_PROMPT = """You are writing a cold outreach email in Dutch for a web design agency.
-
-Target: {business_name}, a {business_type} in {city}
-Their current website: {website_url}
-Website score: {site_score}/100
-Key issues: {issues}
-Preview redesign URL: {preview_url}
+# Invariant instructions — sent as a prompt-cached system block
+EMAIL_SYSTEM = """You are writing cold outreach emails in Dutch for a web design agency.
 
 Write a SHORT (max 150 words), personalized cold email in Dutch that:
 1. Opens with something specific about THEIR business (not generic)
@@ -26,14 +32,89 @@ Write a SHORT (max 150 words), personalized cold email in Dutch that:
 4. Ends with a soft CTA: "Wil je even kijken? Ik hoor graag wat je ervan vindt."
 5. Feels human, not salesy. Like a helpful neighbor, not a pushy vendor.
 
-Tone: Casual-professional Dutch. No "Geachte", use "Hoi {{business_name}}"
+Tone: Casual-professional Dutch. No "Geachte", use "Hoi {business_name}"
 Subject line: Short, curiosity-driven, personalized
 
 Return ONLY a JSON object (no markdown, no extra text):
-{{
+{
     "subject": "...",
     "body": "..."
-}}"""
+}"""
+
+EMAIL_SYSTEM_BLOCKS = claude.cached_system(EMAIL_SYSTEM)
+
+# Per-lead variables — appended as the user message
+EMAIL_PROMPT = """Target: {business_name}, a {business_type} in {city}
+Their current website: {website_url}
+Website score: {site_score}/100
+Key issues: {issues}
+Preview redesign URL: {preview_url}"""
+
+
+# Hybrid mode: the niche template, written once per business_type
+TEMPLATE_SYSTEM = """You are writing a reusable cold outreach email template in Dutch for a web design agency.
+It is sent to many small businesses of the same type, so nothing in it may be specific to one
+business. Use these placeholders, which are filled in for every email:
+  {opener} — one or two personalized sentences about the business and its website
+  {business_name} — the business's name
+  {city} — the city the business is in
+  {preview_url} — the link to the preview redesign we built for them
+
+Write a SHORT (max 150 words) email that:
+1. Starts with "Hoi {business_name}," and then {opener} as its own paragraph
+2. Explains in a sentence or two why a good website matters for this type of business
+3. Links to {preview_url}
+4. Ends with a soft CTA: "Wil je even kijken? Ik hoor graag wat je ervan vindt."
+5. Feels human, not salesy. Like a helpful neighbor, not a pushy vendor.
+
+Tone: Casual-professional Dutch. No "Geachte".
+Subject line: Short, curiosity-driven, may use {business_name}
+
+Return ONLY a JSON object (no markdown, no extra text):
+{
+    "subject": "...",
+    "body": "..."
+}"""
+
+TEMPLATE_SYSTEM_BLOCKS = claude.cached_system(TEMPLATE_SYSTEM)
+
+TEMPLATE_PROMPT = "Business type: {business_type}"
+
+# A template must place these, or the email loses its personalization / link
+TEMPLATE_PLACEHOLDERS = ("{opener}", "{preview_url}")
+
+# Hybrid mode: the only per-email Claude call
+OPENER_SYSTEM = """You write the opening of a cold outreach email in Dutch for a web design agency.
+The rest of the email is a fixed template, so write ONLY 1-2 short sentences (max 40 words) that:
+1. Mention something specific about THEIR business (not generic)
+2. Tactfully name the most important issue with their current website
+
+Tone: Casual-professional Dutch, address them as "jullie". No greeting, no sign-off, no link.
+
+Return ONLY a JSON object (no markdown, no extra text):
+{"opener": "..."}"""
+
+OPENER_SYSTEM_BLOCKS = claude.cached_system(OPENER_SYSTEM)
+
+OPENER_PROMPT = """Target: {business_name}, a {business_type} in {city}
+Their current website: {website_url}
+Website score: {site_score}/100
+Key issues: {issues}"""
+
+# Used when no niche template could be written
+DEFAULT_TEMPLATE = {
+    "subject": "Ik heb iets voor {business_name} gebouwd",
+    "body": "Hoi {business_name},\n\n{opener}\n\nUit nieuwsgierigheid heb ik een modern alternatief in elkaar gezet — speciaal voor jullie:\n{preview_url}\n\nGeen verplichtingen, gewoon even kijken. Wil je even kijken? Ik hoor graag wat je ervan vindt.\n\nGroet,\nLeadPilot Team",
+}
+
+# Used when the opener call fails, so the draft still goes out
+FALLBACK_OPENER = "Ik kwam de website van {business_name} tegen en zag een paar dingen die beter kunnen."
+
+MOCK_OPENERS = [
+    "Ik kwam jullie website tegen en het viel me op dat de contactgegevens op mobiel lastig te vinden zijn.",
+    "Als {type} in {city} doen jullie duidelijk goed werk, maar jullie website oogt wat gedateerd.",
+    "Toen ik de site van {name} op mijn telefoon bekeek, duurde het laden behoorlijk lang.",
+]
 
 
 MOCK_EMAILS = [
@@ -63,17 +144,23 @@ async def write_email(
 ) -> dict:
     """
     Generate a personalized cold email for the lead.
-    Returns dict with subject and body.
+    Returns dict with subject and body (plus token usage in real mode).
     """
     settings = get_settings()
 
-    if settings.mock_mode or not settings.anthropic_api_key:
-        return _mock_email(business_name, business_type, city, preview_url)
+    async with budgets.spend("anthropic"):
+        if settings.mock_mode or not settings.anthropic_api_key:
+            try:
+                await simulator.call("anthropic")
+            except Exception as e:
+                print(f"Email writing failed for {business_name}: {e}")
+                return _failed_email(business_name, f"Email generation failed: {e}")
+            return _mock_email(business_name, business_type, city, preview_url)
 
-    return await _real_email(
-        business_name, business_type, city,
-        website_url, site_score, issues, preview_url,
-    )
+        return await _real_email(
+            business_name, business_type, city,
+            website_url, site_score, issues, preview_url,
+        )
 
 
 async def _real_email(
@@ -86,9 +173,6 @@ async def _real_email(
     preview_url: str | None,
 ) -> dict:
     """Generate email via Claude API."""
-    settings = get_settings()
-    client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-
     prompt = EMAIL_PROMPT.format(
         business_name=business_name,
         business_type=business_type,
@@ -100,21 +184,29 @@ async def _real_email(
     )
 
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}],
+        result, usage = await claude.complete_json(
+            system=EMAIL_SYSTEM_BLOCKS,
+            content=prompt,
+            schema=EmailDraft,
         )
-
-        result_text = response.content[0].text
-        return json.loads(result_text)
-
     except Exception as e:
         print(f"Email writing failed for {business_name}: {e}")
-        return {
-            "subject": f"Re: {business_name}",
-            "body": f"Email generation failed: {e}",
-        }
+        return _failed_email(business_name, f"Email generation failed: {e}")
+
+    if result is None:
+        print(f"Email writing returned invalid output for {business_name}")
+        return _failed_email(business_name, "Email generation failed: invalid response from Claude", usage)
+
+    result["usage"] = usage
+    return result
+
+
+def _failed_email(business_name: str, body: str, usage: dict | None = None) -> dict:
+    return {
+        "subject": f"Re: {business_name}",
+        "body": body,
+        "usage": usage,
+    }
 
 
 def _mock_email(
@@ -136,3 +228,147 @@ def _mock_email(
             preview=preview,
         ),
     }
+
+
+def template_key(business_type: str | None) -> str:
+    """Templates are shared by every lead of the same business type."""
+    return (business_type or "").strip().lower()
+
+
+async def email_template(db: AsyncSession, business_type: str | None) -> tuple[EmailTemplate, dict | None]:
+    """
+    The niche's email template and the token usage spent writing it (None on a hit).
+    A missing template is written once and stored; if writing it fails,
+    DEFAULT_TEMPLATE is used without being stored, so a later draft retries.
+    """
+    key = template_key(business_type)
+    template = await db.scalar(select(EmailTemplate).where(EmailTemplate.business_type == key).limit(1))
+    if template:
+        metrics.CACHE_HITS.inc(cache="email_template")
+        return template, None
+    metrics.CACHE_MISSES.inc(cache="email_template")
+
+    written, usage = await _write_template(key)
+    template = EmailTemplate(business_type=key, **(written or DEFAULT_TEMPLATE))
+    if written:
+        # Own session: losing the race to another writer must not roll back the caller's
+        async with AsyncSession(bind=db.bind, expire_on_commit=False) as session:
+            session.add(template)
+            try:
+                await session.commit()
+            except IntegrityError:
+                pass  # stored by a concurrent draft; this one still uses its own copy
+    return template, usage
+
+
+async def _write_template(business_type: str) -> tuple[dict | None, dict | None]:
+    """Write the niche template. Returns (subject/body or None, usage)."""
+    settings = get_settings()
+
+    async with budgets.spend("anthropic"):
+        if settings.mock_mode or not settings.anthropic_api_key:
+            try:
+                await simulator.call("anthropic")
+            except Exception as e:
+                print(f"Email template writing failed for {business_type}: {e}")
+                return None, None
+            return dict(DEFAULT_TEMPLATE), None
+
+        try:
+            result, usage = await claude.complete_json(
+                system=TEMPLATE_SYSTEM_BLOCKS,
+                content=TEMPLATE_PROMPT.format(business_type=business_type or "local business"),
+                schema=EmailDraft,
+            )
+        except Exception as e:
+            print(f"Email template writing failed for {business_type}: {e}")
+            return None, None
+
+    if result is None or any(p not in result["body"] for p in TEMPLATE_PLACEHOLDERS):
+        print(f"Email template for {business_type} is unusable, using the default")
+        return None, usage
+    return {"subject": result["subject"], "body": result["body"]}, usage
+
+
+async def write_hybrid_email(
+    template: EmailTemplate,
+    business_name: str,
+    business_type: str,
+    city: str,
+    website_url: str | None,
+    site_score: int | None,
+    issues: list[str] | None,
+    preview_url: str | None,
+) -> dict:
+    """
+    Fill the niche template with a personalized opener.
+    Returns dict with subject and body plus the opener's token usage (None in mock mode).
+    Templates pitch the preview, so a lead without one gets a full draft (write_email).
+    """
+    if not preview_url:
+        return await write_email(business_name, business_type, city, website_url, site_score, issues, None)
+    opener, usage = await write_opener(business_name, business_type, city, website_url, site_score, issues)
+    values = {
+        "opener": opener or FALLBACK_OPENER,
+        "business_name": business_name,
+        "city": city or "",
+        "preview_url": preview_url,
+    }
+    return {
+        "subject": _fill(template.subject, values),
+        "body": _fill(template.body, values),
+        "usage": usage,
+    }
+
+
+async def write_opener(
+    business_name: str,
+    business_type: str,
+    city: str,
+    website_url: str | None,
+    site_score: int | None,
+    issues: list[str] | None,
+) -> tuple[str | None, dict | None]:
+    """Personalized opening sentence for the lead. Returns (opener or None on failure, usage)."""
+    settings = get_settings()
+
+    async with budgets.spend("anthropic"):
+        if settings.mock_mode or not settings.anthropic_api_key:
+            try:
+                await simulator.call("anthropic")
+            except Exception as e:
+                print(f"Opener writing failed for {business_name}: {e}")
+                return None, None
+            opener = random.choice(MOCK_OPENERS)
+            return opener.format(name=business_name, type=business_type, city=city), None
+
+        prompt = OPENER_PROMPT.format(
+            business_name=business_name,
+            business_type=business_type,
+            city=city,
+            website_url=website_url or "No website",
+            site_score=site_score or "N/A",
+            issues=", ".join(issues) if issues else "No analysis available",
+        )
+        try:
+            result, usage = await claude.complete_json(
+                system=OPENER_SYSTEM_BLOCKS,
+                content=prompt,
+                schema=EmailOpener,
+                max_tokens=settings.email_opener_max_tokens,
+            )
+        except Exception as e:
+            print(f"Opener writing failed for {business_name}: {e}")
+            return None, None
+
+    if result is None:
+        print(f"Opener writing returned invalid output for {business_name}")
+        return None, usage
+    return result["opener"].strip(), usage
+
+
+def _fill(text: str, values: dict) -> str:
+    """Substitute {placeholder}s; plain replace, so other braces in the text are left alone."""
+    for key, value in values.items():
+        text = text.replace("{" + key + "}", value)
+    return text
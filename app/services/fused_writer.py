@@ -0,0 +1,152 @@
+"""
+Single-call analysis + email writer.
+Asks Claude for the site score, issues, summary, redesign priorities and the
+Dutch cold email in one structured response, halving round trips per lead.
+
+The preview URL does not exist yet at that point, so the email body carries
+PREVIEW_PLACEHOLDER, which the pipeline substitutes once the preview is ready.
+Callers fall back to the two-call path (analyzer + email_writer) when the
+response is unusable or the placeholder cannot be filled.
+
+Real mode: Uses Anthropic Claude API with vision
+Mock mode: Combines the analyzer and email writer mocks.
+"""
+
+import base64
+from pathlib import Path
+from app.config import get_settings
+from app.services import budgets, claude, simulator
+from app.services.analyzer import _mock_analyze
+from app.services.email_writer import _mock_email
+from app.services.schemas import FusedResult
+
+SCREENSHOTS_DIR = Path(__file__).parent.parent / "static" / "screenshots"
+
+PREVIEW_PLACEHOLDER = "[[PREVIEW_URL]]"
+
+FUSED_SYSTEM = f"""You are a web design expert at a web design agency. For each small business
+website you analyze the site AND write a cold outreach email in Dutch.
+
+Score the website 1-100 on these criteria:
+- Mobile readiness (does it look like it would work on mobile?)
+- Visual design (modern vs outdated)
+- Clear call-to-action (phone number, contact form visible?)
+- Loading speed indicators (heavy images, cluttered layout?)
+- Trust signals (reviews, certifications, about section?)
+- SEO basics (clear headings, readable text?)
+
+Then write a SHORT (max 150 words), personalized cold email in Dutch that:
+1. Opens with something specific about THEIR business (not generic)
+2. Mentions 1-2 specific issues with their current site (be tactful, not insulting)
+3. Links to the preview redesign we built for them — write exactly {PREVIEW_PLACEHOLDER} where the link goes
+4. Ends with a soft CTA: "Wil je even kijken? Ik hoor graag wat je ervan vindt."
+5. Feels human, not salesy. Like a helpful neighbor, not a pushy vendor.
+
+Tone: Casual-professional Dutch. No "Geachte", use "Hoi {{business_name}}"
+Subject line: Short, curiosity-driven, personalized
+
+Return ONLY a JSON object (no markdown, no extra text):
+{{
+    "score": 35,
+    "issues": ["Issue 1", "Issue 2"],
+    "summary": "Brief summary of the website quality",
+    "redesign_priorities": ["priority 1", "priority 2"],
+    "email": {{"subject": "...", "body": "..."}}
+}}"""
+
+FUSED_SYSTEM_BLOCKS = claude.cached_system(FUSED_SYSTEM)
+
+FUSED_PROMPT = """Look at this screenshot of {business_name} ({business_type} in {city}).
+Their current website: {website_url}"""
+
+
+async def analyze_and_write(
+    lead_id: int,
+    business_name: str,
+    business_type: str,
+    city: str,
+    website_url: str | None,
+    screenshot_path: str | None,
+) -> dict:
+    """
+    Analyze the website and draft the email in one call.
+    Returns dict with score, issues, summary, redesign_priorities, email
+    (subject/body containing PREVIEW_PLACEHOLDER) and usage. When the response
+    is unusable only "usage" is set and the caller should use the two-call path.
+    """
+    settings = get_settings()
+
+    async with budgets.spend("anthropic"):
+        if settings.mock_mode or not settings.anthropic_api_key:
+            try:
+                await simulator.call("anthropic")
+            except Exception as e:
+                print(f"Fused analysis failed for lead {lead_id}: {e}")
+                return {"usage": None}
+            return _mock_analyze_and_write(business_name, business_type, city)
+
+        return await _real_analyze_and_write(
+            lead_id, business_name, business_type, city, website_url, screenshot_path,
+        )
+
+
+def fill_preview_url(email: dict, preview_url: str) -> dict:
+    """Substitute the real preview URL into a fused email draft."""
+    return {k: v.replace(PREVIEW_PLACEHOLDER, preview_url) for k, v in email.items()}
+
+
+async def _real_analyze_and_write(
+    lead_id: int,
+    business_name: str,
+    business_type: str,
+    city: str,
+    website_url: str | None,
+    screenshot_path: str | None,
+) -> dict:
+    """Analyze and write via one Claude API call with vision."""
+    prompt = FUSED_PROMPT.format(
+        business_name=business_name,
+        business_type=business_type,
+        city=city,
+        website_url=website_url or "No website",
+    )
+
+    messages_content = []
+    if screenshot_path:
+        img_path = SCREENSHOTS_DIR / f"{lead_id}.png"
+        if img_path.exists():
+            img_data = base64.b64encode(img_path.read_bytes()).decode("utf-8")
+            messages_content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": img_data,
+                },
+            })
+    messages_content.append({"type": "text", "text": prompt})
+
+    try:
+        result, usage = await claude.complete_json(
+            system=FUSED_SYSTEM_BLOCKS,
+            content=messages_content,
+            schema=FusedResult,
+            max_tokens=1536,
+        )
+    except Exception as e:
+        print(f"Fused analysis failed for lead {lead_id}: {e}")
+        return {"usage": None}
+
+    if result is None:
+        print(f"Fused analysis returned invalid output for lead {lead_id}")
+        return {"usage": usage}
+
+    result["usage"] = usage
+    return result
+
+
+def _mock_analyze_and_write(business_name: str, business_type: str, city: str) -> dict:
+    """Return mock analysis + email draft with the preview placeholder."""
+    result = _mock_analyze(business_name, business_type, city)
+    result["email"] = _mock_email(business_name, business_type, city, PREVIEW_PLACEHOLDER)
+    return result
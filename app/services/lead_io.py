@@ -0,0 +1,333 @@
+"""
+Bulk lead import and export (CSV, and Parquet with the optional pyarrow package).
+Every new lead, scraped or imported, goes through insert_leads(): rows get a
+dedup_key (website host or name, plus city) and a priority, and are inserted
+in chunked transactions with an upsert on dedup_key, so businesses that are
+already stored are skipped without a lookup per row (only their seen_count,
+and with it their priority, goes up).
+Exports read the leads table through a server-side cursor in chunks of
+EXPORT_CHUNK_SIZE rows and encode chunk by chunk, so memory stays flat
+however many leads there are.
+"""
+
+import csv
+import io
+import math
+import re
+from collections.abc import AsyncIterator, Iterable, Iterator
+from datetime import datetime
+from urllib.parse import urlsplit
+from sqlalchemy import DateTime, Float, Integer, case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.campaign import Campaign
+from app.models.lead import Lead, LeadAnalysis, LeadEmail
+from app.services import priority
+
+# Fields an import (or a scrape) may set; anything else in the file is ignored
+IMPORT_FIELDS = (
+    "business_name", "business_type", "address", "city", "phone", "email",
+    "website_url", "google_maps_url", "rating", "reviews_count",
+)
+
+EXPORT_COLUMNS = (
+    Lead.id, Lead.campaign_id, Lead.business_name, Lead.business_type, Lead.address, Lead.city,
+    Lead.phone, Lead.email, Lead.website_url, Lead.google_maps_url, Lead.rating, Lead.reviews_count,
+    Lead.priority, Lead.site_score, LeadAnalysis.issues.label("site_issues"),
+    LeadAnalysis.summary.label("analysis_summary"),
+    Lead.preview_url, Lead.preview_status, LeadEmail.subject.label("email_subject"),
+    LeadEmail.body.label("email_body"), Lead.email_status, Lead.email_sent_at, Lead.status,
+    Lead.cost_eur, Lead.created_at, Lead.updated_at,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+FORMATS = ("csv", "parquet")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+# ── Dedup ────────────────────────────────────────────────────────────
+
+def _normalize(value: str | None) -> str:
+    return " ".join(re.findall(r"\w+", (value or "").lower()))
+
+
+def dedup_key(business_name: str | None, city: str | None, website_url: str | None = None) -> str | None:
+    """
+    Identity of a business: its website host (without www.) or, lacking a
+    website, its name — plus the city, so branches of one chain stay apart.
+    """
+    host = ""
+    if website_url and website_url.strip():
+        url = website_url.strip()
+        host = (urlsplit(url if "//" in url else f"//{url}").hostname or "").removeprefix("www.")
+    identity = f"web:{host}" if host else f"name:{_normalize(business_name)}" if _normalize(business_name) else ""
+    if not identity:
+        return None
+    return f"{identity}|{_normalize(city)}"
+
+
+def _finite(value) -> float | None:
+    """`value` as a float; None when missing, NaN or infinite."""
+    if value is None:
+        return None
+    number = float(value)
+    return number if math.isfinite(number) else None
+
+
+def lead_row(record: dict, campaign_id: int, business_type: str = "unknown") -> dict | None:
+    """Insert parameters for one scraped or imported record; None if it has no business name."""
+    row = {}
+    for field in IMPORT_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        row[field] = value
+    if not row["business_name"]:
+        return None
+    try:
+        row["rating"] = _finite(row["rating"])
+        reviews = _finite(row["reviews_count"])
+        row["reviews_count"] = int(reviews) if reviews is not None else None
+    except (TypeError, ValueError, OverflowError):
+        row["rating"] = row["reviews_count"] = None
+    row["business_type"] = row["business_type"] or business_type
+    row["address"] = row["address"] or ""
+    row["city"] = row["city"] or ""
+    row["google_maps_url"] = row["google_maps_url"] or ""
+    row.update(
+        campaign_id=campaign_id,
+        status="scraped",
+        dedup_key=dedup_key(row["business_name"], row["city"], row["website_url"]),
+        seen_count=1,
+    )
+    return row
+
+
+async def insert_leads(
+    db: AsyncSession,
+    records: Iterable[dict],
+    campaign_id: int,
+    business_type: str = "unknown",
+    chunk_size: int | None = None,
+    known: list[str] | None = None,
+) -> dict:
+    """
+    Store records as "scraped" leads of the campaign, one transaction per
+    chunk. Returns counts of inserted, duplicate and invalid records; the
+    dedup keys of businesses that were already stored are appended to `known`.
+    """
+    chunk_size = chunk_size or get_settings().import_chunk_size
+    counts = {"inserted": 0, "duplicates": 0, "invalid": 0}
+    chunk: dict[str, dict] = {}
+    for record in records:
+        row = lead_row(record, campaign_id, business_type)
+        if row is None:
+            counts["invalid"] += 1
+            continue
+        if row["dedup_key"] in chunk:
+            # Repeated within the chunk: one row, seen more often
+            chunk[row["dedup_key"]]["seen_count"] += 1
+            counts["duplicates"] += 1
+            continue
+        chunk[row["dedup_key"]] = row
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(db, chunk, counts, known)
+            chunk = {}
+    if chunk:
+        await _insert_chunk(db, chunk, counts, known)
+    return counts
+
+
+def _seen_bonus(seen):
+    """priority.seen_bonus() as SQL."""
+    bonus = priority.SEEN_BONUS * (seen - 1)
+    return case((bonus > priority.MAX_SEEN_BONUS, priority.MAX_SEEN_BONUS), else_=bonus)
+
+
+async def _insert_chunk(db: AsyncSession, chunk: dict[str, dict], counts: dict, known: list[str] | None = None):
+    for row in chunk.values():
+        row["priority"] = priority.score(
+            row["rating"], row["reviews_count"], row["website_url"], row["business_type"], row["seen_count"],
+        )
+
+    table = Lead.__table__
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table)
+    seen = table.c.seen_count + statement.excluded.seen_count
+    # Known businesses keep their row; they were only seen once more
+    statement = statement.on_conflict_do_update(
+        index_elements=["dedup_key"],
+        set_={
+            "seen_count": seen,
+            "priority": table.c.priority - _seen_bonus(table.c.seen_count) + _seen_bonus(seen),
+        },
+    ).returning(table.c.dedup_key, table.c.seen_count)
+
+    returned = (await db.execute(statement, list(chunk.values()))).all()
+    await db.commit()
+    # A new row comes back with the chunk's own count; an existing one has more
+    inserted = sum(1 for key, seen_count in returned if seen_count == chunk[key]["seen_count"])
+    if known is not None:
+        known.extend(key for key, seen_count in returned if seen_count != chunk[key]["seen_count"])
+    counts["inserted"] += inserted
+    counts["duplicates"] += len(chunk) - inserted
+
+
+# ── Import ───────────────────────────────────────────────────────────
+
+def format_for(filename: str | None) -> str:
+    """csv or parquet, from the file name (CSV unless it ends in .parquet / .pq)."""
+    return "parquet" if (filename or "").lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def read_records(file, fmt: str, chunk_size: int | None = None) -> Iterator[dict]:
+    """Records of a binary file object, read incrementally."""
+    if fmt == "parquet":
+        pq = _pyarrow().parquet
+        parquet = pq.ParquetFile(file)
+        columns = [name for name in IMPORT_FIELDS if name in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunk_size or get_settings().import_chunk_size, columns=columns):
+            yield from batch.to_pylist()
+    else:
+        yield from csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+
+
+async def import_file(
+    db: AsyncSession,
+    file,
+    fmt: str,
+    name: str,
+    niche: str = "import",
+    location: str = "",
+) -> tuple[Campaign, dict]:
+    """Import a lead list into a new campaign; its leads are then picked up like scraped ones."""
+    campaign = Campaign(name=name, niche=niche, location=location)
+    db.add(campaign)
+    await db.commit()
+
+    counts = await insert_leads(db, read_records(file, fmt), campaign.id, business_type=niche)
+    campaign.total_scraped = counts["inserted"]
+    await db.commit()
+    return campaign, counts
+
+
+# ── Export ───────────────────────────────────────────────────────────
+
+async def export_batches(
+    db: AsyncSession,
+    campaign_id: int | None = None,
+    chunk_size: int | None = None,
+) -> AsyncIterator[list[dict]]:
+    """All leads (or one campaign's) in id order, as chunks of plain dicts."""
+    chunk_size = chunk_size or get_settings().export_chunk_size
+    query = (
+        select(*EXPORT_COLUMNS)
+        .outerjoin(LeadAnalysis, LeadAnalysis.lead_id == Lead.id)
+        .outerjoin(LeadEmail, LeadEmail.lead_id == Lead.id)
+        .order_by(Lead.id)
+    )
+    if campaign_id:
+        query = query.where(Lead.campaign_id == campaign_id)
+
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.mappings().partitions(chunk_size):
+        rows = [dict(row) for row in partition]
+        for row in rows:
+            if isinstance(row["site_issues"], list):
+                row["site_issues"] = "; ".join(map(str, row["site_issues"]))
+        yield rows
+
+
+async def encode(batches: AsyncIterator[list[dict]], fmt: str) -> AsyncIterator[bytes]:
+    """Encode exported chunks as they arrive: CSV text, or one Parquet row group per chunk."""
+    if fmt == "parquet":
+        async for data in _parquet_chunks(batches):
+            yield data
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _parquet_chunks(batches: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    pa = _pyarrow()
+    schema = parquet_schema()
+    sink = _Sink()
+    writer = pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    async for rows in batches:
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_schema():
+    pa = _pyarrow()
+    fields = []
+    for column in EXPORT_COLUMNS:
+        if isinstance(column.type, Integer):
+            kind = pa.int64()
+        elif isinstance(column.type, Float):
+            kind = pa.float64()
+        elif isinstance(column.type, DateTime):
+            kind = pa.timestamp("us")
+        else:
+            kind = pa.string()
+        fields.append(pa.field(column.key, kind))
+    return pa.schema(fields)
+
+
+class _Sink:
+    """
+    Write-only file for ParquetWriter that hands out what was written so far.
+    tell() keeps counting across drains: Parquet footers store absolute offsets.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+
+def _pyarrow():
+    """pyarrow (with its parquet module loaded), imported on first Parquet use."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("Parquet needs the optional pyarrow package: pip install 'leadpilot[parquet]'")
+    return pyarrow
+
+
+def export_filename(fmt: str, campaign_id: int | None = None) -> str:
+    scope = f"campaign-{campaign_id}" if campaign_id else "all"
+    return f"leads-{scope}-{datetime.utcnow():%Y%m%d-%H%M}.{fmt}"
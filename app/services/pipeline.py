@@ -1,18 +1,35 @@
 """
 Pipeline orchestrator.
 Runs the full lead processing pipeline: scrape → screenshot → analyze → preview → email.
+Preview builds are asynchronous: leads wait in "generating" and poll_previews()
+drafts their email once the build is ready.
 """
 
-import json
-from datetime import datetime
-from sqlalchemy.orm import Session
-from app.models.lead import Lead
+import asyncio
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import drain, metrics, tracing
+from app.models.lead import LEAD_DETAILS, Lead
 from app.models.campaign import Campaign
-from app.services import scraper, screenshotter, analyzer, preview_generator, email_writer
+from app.config import get_settings, pinned_settings
+from app.services import (
+    scraper, prefilter, screenshotter, analyzer, fused_writer, preview_generator, email_writer,
+    budgets, costs, queue, lead_io, runtime_config,
+)
+from app.services.claude import USAGE_KEYS, add_usage
+
+# Most generating leads one poll_previews() call checks
+POLL_BATCH_SIZE = 1000
+
+# Bulk drafting: opener calls in flight, and leads saved per commit
+DRAFT_CONCURRENCY = 10
+DRAFT_CHUNK_SIZE = 200
 
 
 async def run_pipeline(
-    db: Session,
+    db: AsyncSession,
     niche: str,
     location: str,
     limit: int = 20,
@@ -20,17 +37,66 @@ async def run_pipeline(
 ) -> dict:
     """
     Run the full pipeline for a given niche and location.
-    Returns summary stats.
+    The scraped leads are processed here through the lease queue, so running
+    workers (scripts/worker.py) can share the campaign.
+    Returns summary stats for the leads processed in this call.
     """
-    stats = {
-        "scraped": 0,
-        "analyzed": 0,
-        "previews_generated": 0,
-        "emails_drafted": 0,
-        "errors": [],
-    }
+    campaign = await ingest(db, niche, location, limit, campaign_name)
+    return await process_campaign(db, campaign)
 
-    # Create campaign
+
+async def process_campaign(db: AsyncSession, campaign: Campaign) -> dict:
+    """
+    Process the campaign's "scraped" leads here, through the lease queue.
+    Stops between leads once a drain is requested; unstarted leads go back to the queue.
+    """
+    settings = get_settings()
+    stats = new_stats()
+    stats["scraped"] = campaign.total_scraped
+
+    # Pre-filter all websites concurrently (one cheap GET each)
+    prechecks = {}
+    if settings.prefilter_enabled:
+        urls = (await db.scalars(
+            select(Lead.website_url).where(Lead.campaign_id == campaign.id, Lead.status == "scraped")
+        )).all()
+        with metrics.stage("prefilter"):
+            prechecks = await prefilter.check_sites(urls)
+
+    owner = f"inline-{os.getpid()}-{campaign.id}"
+    # BATCH_SIZE is read per claim: a new runtime config version applies from the next batch
+    while not drain.requested() and (
+        leads := await queue.claim(db, owner, "process", get_settings().batch_size, campaign_id=campaign.id)
+    ):
+        async with queue.Lease(db, owner, leads) as lease:
+            for lead in leads:
+                if drain.requested():
+                    break
+                await process_claimed_lead(db, lead, prechecks.get(lead.website_url), stats)
+                await lease.done(lead.id)
+
+    # Update campaign stats
+    campaign.total_qualified = stats["analyzed"]
+    await db.commit()
+    stats["campaign_id"] = campaign.id
+
+    return stats
+
+
+async def ingest(
+    db: AsyncSession,
+    niche: str,
+    location: str,
+    limit: int = 20,
+    campaign_name: str | None = None,
+    recurring_id: int | None = None,
+    known: list[str] | None = None,
+) -> Campaign:
+    """
+    Create a campaign and store its new scraped businesses as "scraped"
+    leads, ready to be claimed by run_pipeline or the workers. The dedup keys
+    of businesses that were already stored are appended to `known`.
+    """
     if not campaign_name:
         campaign_name = f"{niche.title()} {location} {datetime.utcnow().strftime('%b %Y')}"
 
@@ -38,63 +104,89 @@ async def run_pipeline(
         name=campaign_name,
         niche=niche,
         location=location,
+        recurring_id=recurring_id,
     )
     db.add(campaign)
-    db.commit()
-    db.refresh(campaign)
-
-    # Step 1: Scrape businesses
-    businesses = await scraper.scrape_businesses(niche, location, limit)
-    stats["scraped"] = len(businesses)
-
-    for biz in businesses:
-        lead = Lead(
-            campaign_id=campaign.id,
-            business_name=biz["business_name"],
-            business_type=biz["business_type"],
-            address=biz["address"],
-            city=biz["city"],
-            phone=biz["phone"],
-            email=biz["email"],
-            website_url=biz["website_url"],
-            google_maps_url=biz["google_maps_url"],
-            rating=biz["rating"],
-            reviews_count=biz["reviews_count"],
-            status="scraped",
-        )
-        db.add(lead)
-        db.commit()
-        db.refresh(lead)
+    await db.commit()
 
-        try:
-            await _process_lead(db, lead)
-
-            if lead.site_score is not None:
-                stats["analyzed"] += 1
-            if lead.preview_status == "ready":
-                stats["previews_generated"] += 1
-            if lead.email_body:
-                stats["emails_drafted"] += 1
-
-        except Exception as e:
-            error_msg = f"Lead {lead.id} ({lead.business_name}): {e}"
-            stats["errors"].append(error_msg)
-            lead.status = f"error"
-            db.commit()
-            print(f"Pipeline error: {error_msg}")
-            continue
+    try:
+        with tracing.span("scrape", campaign_id=campaign.id), budgets.scope(db.bind, campaign.id), \
+                metrics.stage("scrape"):
+            businesses = await scraper.scrape_businesses(niche, location, limit)
+    except budgets.BudgetExceeded as e:
+        print(f"Scrape skipped: {e}")
+        businesses = []
 
-    # Update campaign stats
-    campaign.total_scraped = stats["scraped"]
-    campaign.total_qualified = stats["analyzed"]
-    db.commit()
+    # Businesses already stored (by this or an earlier campaign) are skipped
+    counts = await lead_io.insert_leads(db, businesses, campaign.id, known=known)
+    if counts["duplicates"]:
+        print(f"Skipped {counts['duplicates']} already known businesses")
+    campaign.total_scraped = counts["inserted"]
+    await db.commit()
 
-    return stats
+    return campaign
 
 
-async def process_single_lead(db: Session, lead_id: int) -> dict:
+def new_stats() -> dict:
+    return {
+        "scraped": 0,
+        "analyzed": 0,
+        "previews_generated": 0,
+        "previews_pending": 0,
+        "emails_drafted": 0,
+        "over_budget": 0,
+        "errors": [],
+    }
+
+
+async def process_claimed_lead(db: AsyncSession, lead: Lead, precheck: dict | None, stats: dict):
+    """
+    Process one leased lead, counting the outcome in `stats`. Failures mark
+    the lead "error". A lead stopped by a spend budget, or cancelled by the
+    drain deadline, keeps what it already committed and is marked resumable
+    (see _interrupt); a budget-stopped one is processed again once its
+    campaign is resumed (or the day is over).
+    A newly saved runtime config version is applied before the lead starts.
+    """
+    lead_id, business_name = lead.id, lead.business_name
+    await runtime_config.refresh(db)
+    try:
+        await _process_lead(db, lead, precheck)
+
+        if lead.site_score is not None:
+            stats["analyzed"] += 1
+        if lead.preview_status == "ready":
+            stats["previews_generated"] += 1
+        elif lead.preview_status == "generating":
+            stats["previews_pending"] += 1
+        if lead.email_body and lead.email_status == "draft":
+            stats["emails_drafted"] += 1
+
+    except asyncio.CancelledError:
+        await asyncio.shield(_interrupt(db, lead_id))
+        print(f"Lead {lead_id} ({business_name}) interrupted by shutdown, it will resume")
+        raise
+
+    except budgets.BudgetExceeded as e:
+        # Raised before a paid call, when the lead's earlier steps are committed
+        # (no rollback: it would expire the other leads of the batch)
+        stats["over_budget"] += 1
+        await _interrupt(db, lead_id)
+        print(f"Lead {lead_id} ({business_name}) stopped: {e}")
+
+    except Exception as e:
+        # Rollback expires the lead, so only identifiers captured above are used
+        await db.rollback()
+        error_msg = f"Lead {lead_id} ({business_name}): {e}"
+        stats["errors"].append(error_msg)
+        lead.status = "error"
+        await db.commit()
+        print(f"Pipeline error: {error_msg}")
+
+
+async def process_single_lead(db: AsyncSession, lead_id: int) -> dict:
     """Process a single lead through the pipeline (for retry/manual trigger)."""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    lead = await db.get(Lead, lead_id, options=LEAD_DETAILS)
     if not lead:
         return {"error": "Lead not found"}
 
@@ -105,57 +197,393 @@ async def process_single_lead(db: Session, lead_id: int) -> dict:
         return {"error": str(e), "lead_id": lead.id}
 
 
-async def _process_lead(db: Session, lead: Lead):
-    """Process a single lead through all pipeline steps."""
-    min_score = 50  # from config, but kept simple here
+async def _process_lead(db: AsyncSession, lead: Lead, precheck: dict | None = None):
+    """
+    Process a single lead through all pipeline steps.
+    `precheck` is an already-fetched pre-filter result; it is fetched here if missing.
+    Paid calls are checked against the campaign and daily budgets (BudgetExceeded
+    stops the lead); estimated spend is recorded on the lead, even on failure.
+    The whole journey is one trace; stages and API calls are its child spans.
+    The lead runs on the settings current when it starts.
+    """
+    with pinned_settings(), tracing.span("lead", lead_id=lead.id, campaign_id=lead.campaign_id) as span, \
+            costs.track_lead() as spent, budgets.scope(db.bind, lead.campaign_id):
+        try:
+            await _run_stages(db, lead, precheck)
+        finally:
+            if asyncio.current_task().cancelling():
+                # Cancelled mid-statement by the drain deadline: the session needs this first
+                await _save_pending(db)
+            await _record_cost(db, lead.id, spent[0])
+            metrics.LEAD_COST_EUR.observe(spent[0])
+            if span is not None:
+                span.attributes["lead.status"] = lead.status
+                span.attributes["lead.cost_eur"] = round(spent[0], 6)
+
+
+async def _interrupt(db: AsyncSession, lead_id: int):
+    """
+    Record a lead cancelled (or stopped by a budget) mid-pipeline so it
+    resumes without paying again for its analysis. Stage results already
+    assigned are committed first (stages assign their results before their
+    commit, never across an await). An analyzed lead becomes "interrupted": it
+    is claimed again and resumes after its analysis. One cancelled earlier stays
+    "scraped" and starts over.
+    """
+    await _save_pending(db)
+    await db.execute(
+        update(Lead)
+        .where(
+            Lead.id == lead_id,
+            Lead.status.in_(("analyzed", "preview_ready")),
+            # Submitted previews are finished by the poll stage
+            or_(Lead.preview_status.is_(None), Lead.preview_status != "generating"),
+        )
+        .values(status="interrupted")
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def _save_pending(db: AsyncSession):
+    """Commit what a cancelled lead has assigned; roll back if the cancel broke the transaction."""
+    try:
+        await db.commit()
+    except Exception:
+        await db.rollback()
+
+
+async def _run_stages(db: AsyncSession, lead: Lead, precheck: dict | None):
+    settings = get_settings()
+    if lead.status == "interrupted":
+        return await _resume_stages(db, lead)
+    priorities = []
 
     # Step 2: Screenshot (only if they have a website)
     if lead.website_url:
-        screenshot_path = await screenshotter.capture_screenshot(lead.id, lead.website_url)
+        # Cheap pre-filter — clearly-modern sites skip screenshot + Claude
+        if settings.prefilter_enabled:
+            if precheck is None:
+                with metrics.stage("prefilter"):
+                    precheck = await prefilter.check_site(lead.website_url)
+            store_fingerprint(lead, precheck.get("fingerprint"))
+            score = precheck["score"]
+            if prefilter.clearly_modern(precheck, settings.min_score_threshold):
+                lead.site_score = score
+                lead.site_issues = precheck["issues"]
+                lead.analysis_summary = (
+                    f"Pre-filter scored this site {score}/100 — modern enough, "
+                    f"skipped screenshot and AI analysis."
+                )
+                lead.status = "analyzed"
+                await db.commit()
+                return
+
+        with metrics.stage("screenshot"):
+            screenshot_path = await screenshotter.capture_screenshot(lead.id, lead.website_url)
         lead.screenshot_url = screenshot_path
-        db.commit()
+        await db.commit()
 
-        # Step 3: Analyze
-        analysis = await analyzer.analyze_website(
-            lead.id, lead.business_name, lead.business_type, lead.city, screenshot_path,
-        )
+        # Step 3: Analyze (fused mode also drafts the email in the same call)
+        analysis = None
+        if settings.fused_analysis_email:
+            with metrics.stage("analyze_email"):
+                fused = await fused_writer.analyze_and_write(
+                    lead.id, lead.business_name, lead.business_type, lead.city,
+                    lead.website_url, screenshot_path,
+                )
+            await _record_usage(db, lead, fused.get("usage"))
+            if "email" in fused:
+                analysis = fused
+        if analysis is None:
+            with metrics.stage("analyze"):
+                analysis = await analyzer.analyze_website(
+                    lead.id, lead.business_name, lead.business_type, lead.city, screenshot_path,
+                )
+            await _record_usage(db, lead, analysis.get("usage"))
         lead.site_score = analysis.get("score")
-        lead.site_issues = json.dumps(analysis.get("issues", []))
+        lead.site_issues = analysis.get("issues", [])
         lead.analysis_summary = analysis.get("summary", "")
         lead.status = "analyzed"
-        db.commit()
+        await db.commit()
+        priorities = analysis.get("redesign_priorities", [])
 
         # Skip leads with good websites
-        if lead.site_score and lead.site_score >= min_score:
+        if lead.site_score and lead.site_score >= settings.min_score_threshold:
             return
+
+        # Fused draft waits for the preview URL (email_status "pending" is never sent)
+        if "email" in analysis:
+            lead.email_subject = analysis["email"]["subject"]
+            lead.email_body = analysis["email"]["body"]
+            lead.email_status = "pending"
+            await db.commit()
     else:
         # No website = hot lead, score 0
         lead.site_score = 0
-        lead.site_issues = json.dumps(["No website exists"])
+        lead.site_issues = ["No website exists"]
         lead.analysis_summary = "This business has no website at all — prime opportunity."
         lead.status = "analyzed"
-        db.commit()
+        await db.commit()
 
-    # Step 4: Generate preview
-    issues = json.loads(lead.site_issues) if lead.site_issues else []
-    preview = await preview_generator.generate_preview(
-        lead.id, lead.business_name, lead.business_type, lead.city, lead.phone,
-        issues=issues,
-    )
+    await _preview_and_email(db, lead, priorities)
+
+
+async def _resume_stages(db: AsyncSession, lead: Lead):
+    """Continue an interrupted lead after its committed analysis (redesign priorities aren't stored)."""
+    lead.status = "analyzed"
+    await db.commit()
+    if lead.site_score and lead.site_score >= get_settings().min_score_threshold:
+        return
+    if lead.preview_status in ("ready", "failed"):
+        await _write_email(db, lead)
+    else:
+        await _preview_and_email(db, lead, [])
+
+
+async def _preview_and_email(db: AsyncSession, lead: Lead, priorities: list[str]):
+    """Steps 4 and 5 for an analyzed lead."""
+    # Step 4: Submit preview generation (reusing a cached template when possible)
+    template = await preview_generator.find_template(db, lead.business_type, priorities)
+    with metrics.stage("preview"):
+        preview = await preview_generator.generate_preview(
+            lead.id, lead.business_name, lead.business_type, lead.city, lead.phone,
+            issues=lead.site_issues or [],
+            priorities=priorities,
+            template_project_id=template.project_id if template else None,
+        )
     lead.preview_url = preview["preview_url"]
     lead.preview_prompt = preview["preview_prompt"]
     lead.preview_status = preview["preview_status"]
+    lead.preview_job_id = preview["preview_job_id"]
+    await db.commit()
+
+    if not template and preview["preview_job_id"] and lead.preview_status != "failed":
+        await preview_generator.remember_template(
+            db, lead.business_type, priorities, preview["preview_job_id"],
+            lead.preview_status, lead.preview_url,
+        )
+
+    # Still building — poll_previews() writes the email once the preview is ready
+    if lead.preview_status == "generating":
+        return
+
+    await _write_email(db, lead)
+
+
+async def _write_email(db: AsyncSession, lead: Lead):
+    """Step 5: Write the email draft once the preview is settled."""
     if lead.preview_status == "ready":
         lead.status = "preview_ready"
-    db.commit()
+        await db.commit()
 
-    # Step 5: Write email
-    email = await email_writer.write_email(
-        lead.business_name, lead.business_type, lead.city,
-        lead.website_url, lead.site_score, issues, lead.preview_url,
+    fused_draft = (
+        lead.email_status == "pending"
+        and lead.preview_status == "ready"
+        and lead.preview_url
+        and fused_writer.PREVIEW_PLACEHOLDER in (lead.email_body or "")
     )
+    if fused_draft:
+        email = fused_writer.fill_preview_url(
+            {"subject": lead.email_subject, "body": lead.email_body}, lead.preview_url,
+        )
+    else:
+        # Two-call path: also the fallback when a fused draft can't be completed
+        issues = lead.site_issues or []
+        with metrics.stage("email"):
+            # Templates pitch the preview: without one the lead gets a full draft
+            if get_settings().email_mode == "hybrid" and _live_preview_url(lead):
+                template, template_usage = await email_writer.email_template(db, lead.business_type)
+                email = await email_writer.write_hybrid_email(
+                    template, lead.business_name, lead.business_type, lead.city,
+                    lead.website_url, lead.site_score, issues, _live_preview_url(lead),
+                )
+                await _record_usage(db, lead, template_usage)
+            else:
+                email = await email_writer.write_email(
+                    lead.business_name, lead.business_type, lead.city,
+                    lead.website_url, lead.site_score, issues, lead.preview_url,
+                )
+        await _record_usage(db, lead, email.get("usage"))
     lead.email_subject = email["subject"]
     lead.email_body = email["body"]
     lead.email_status = "draft"
     lead.status = "email_drafted"
-    db.commit()
+    await db.commit()
+
+
+async def draft_campaign(db: AsyncSession, campaign_id: int, redraft: bool = False) -> dict:
+    """
+    Draft hybrid emails for every lead of a campaign whose preview has settled
+    (a full draft when it failed); with `redraft`, unsent drafts are rewritten
+    too. The niche templates are written first, then the openers
+    DRAFT_CONCURRENCY at a time, saved per chunk. Returns counts of drafted
+    and over_budget leads.
+    """
+    statuses = ("analyzed", "preview_ready") + (("email_drafted",) if redraft else ())
+    leads = (await db.scalars(
+        select(Lead).options(*LEAD_DETAILS).where(
+            Lead.campaign_id == campaign_id,
+            Lead.status.in_(statuses),
+            Lead.preview_status.in_(("ready", "failed")),
+            Lead.lease_owner.is_(None),
+        ).order_by(Lead.id)
+    )).all()
+    counts = {"drafted": 0, "over_budget": 0}
+    semaphore = asyncio.Semaphore(DRAFT_CONCURRENCY)
+
+    async def draft(lead: Lead, template) -> tuple[dict, float]:
+        async with semaphore:
+            with costs.track_lead() as spent:
+                email = await email_writer.write_hybrid_email(
+                    template, lead.business_name, lead.business_type, lead.city,
+                    lead.website_url, lead.site_score, lead.site_issues or [], _live_preview_url(lead),
+                )
+        return email, spent[0]
+
+    with budgets.scope(db.bind, campaign_id):
+        templates = {}
+        try:
+            for lead in leads:
+                key = email_writer.template_key(lead.business_type)
+                if key not in templates and _live_preview_url(lead):
+                    with costs.track_lead() as spent:
+                        templates[key], usage = await email_writer.email_template(db, key)
+                    await _record_usage(db, lead, usage)
+                    await _record_cost(db, lead.id, spent[0])
+        except budgets.BudgetExceeded as e:
+            print(f"Drafting stopped: {e}")
+            counts["over_budget"] = len(leads)
+            return counts
+
+        for start in range(0, len(leads), DRAFT_CHUNK_SIZE):
+            chunk = leads[start:start + DRAFT_CHUNK_SIZE]
+            usage = None
+            results = await asyncio.gather(
+                *(draft(lead, templates.get(email_writer.template_key(lead.business_type))) for lead in chunk),
+                return_exceptions=True,
+            )
+            for lead, result in zip(chunk, results):
+                if isinstance(result, budgets.BudgetExceeded):
+                    counts["over_budget"] += 1
+                    continue
+                if isinstance(result, BaseException):
+                    print(f"Email step failed for lead {lead.id}: {result}")
+                    continue
+                email, spent = result
+                lead.email_subject = email["subject"]
+                lead.email_body = email["body"]
+                lead.email_status = "draft"
+                lead.status = "email_drafted"
+                usage = add_usage(usage, email.get("usage"))
+                await _record_cost(db, lead.id, spent)
+                counts["drafted"] += 1
+            await db.commit()
+            await _record_usage(db, chunk[0], usage)
+            if counts["over_budget"]:
+                counts["over_budget"] += len(leads) - start - len(chunk)
+                break
+    return counts
+
+
+def _live_preview_url(lead: Lead) -> str | None:
+    """The preview link a hybrid draft may pitch: only a finished preview's."""
+    return lead.preview_url if lead.preview_status == "ready" else None
+
+
+def store_fingerprint(lead: Lead, fingerprint: dict | None):
+    """Remember the site's ETag / Last-Modified / content hash for change checks."""
+    if fingerprint:
+        lead.site_etag = fingerprint["etag"]
+        lead.site_last_modified = fingerprint["last_modified"]
+        lead.site_hash = fingerprint["hash"]
+        lead.site_checked_at = datetime.utcnow()
+
+
+async def _record_usage(db: AsyncSession, lead: Lead, usage: dict | None):
+    """Add Claude token usage to the lead's campaign totals (atomic SQL increment)."""
+    if not usage or not lead.campaign_id:
+        return
+    await db.execute(
+        update(Campaign)
+        .where(Campaign.id == lead.campaign_id)
+        .values({getattr(Campaign, k): func.coalesce(getattr(Campaign, k), 0) + usage.get(k, 0) for k in USAGE_KEYS})
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def _record_cost(db: AsyncSession, lead_id: int, amount: float):
+    """
+    Add estimated spend to the lead's total (atomic SQL increment). Campaign
+    totals are kept by budgets.spend() as each call settles.
+    """
+    if not amount:
+        return
+    await db.execute(
+        update(Lead)
+        .where(Lead.id == lead_id)
+        .values(cost_eur=func.coalesce(Lead.cost_eur, 0) + amount)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def poll_previews(db: AsyncSession, leads: list[Lead] | None = None) -> dict:
+    """
+    Poll leads whose preview is still generating — by default every such lead
+    not leased by a worker (up to POLL_BATCH_SIZE), leased for the duration.
+    Finished previews get their email drafted; stale jobs are marked failed.
+    Returns counts of ready, failed and still-pending previews.
+    """
+    settings = get_settings()
+    counts = {"ready": 0, "failed": 0, "pending": 0}
+
+    if leads is None:
+        owner = f"poller-{os.getpid()}"
+        leads = await queue.claim(db, owner, "poll", POLL_BATCH_SIZE)
+        if not leads:
+            return counts
+        async with queue.Lease(db, owner, leads):
+            return await poll_previews(db, leads)
+    if not leads:
+        return counts
+
+    results = await asyncio.gather(
+        *(preview_generator.check_preview(lead.preview_job_id) for lead in leads)
+    )
+    deadline = datetime.utcnow() - timedelta(seconds=settings.preview_timeout)
+
+    for lead, result in zip(leads, results):
+        if drain.requested():
+            break  # still "generating": polled again after the restart
+        status = result["preview_status"]
+        if status == "generating" and lead.updated_at and lead.updated_at < deadline:
+            status = "failed"
+        if status == "generating":
+            counts["pending"] += 1
+            continue
+
+        lead.preview_status = status
+        lead.preview_url = result["preview_url"] or lead.preview_url
+        await db.commit()
+        await preview_generator.update_template(db, lead.preview_job_id, status, lead.preview_url)
+        counts[status] += 1
+
+        with pinned_settings(), tracing.span("lead.email", lead_id=lead.id, campaign_id=lead.campaign_id), \
+                costs.track_lead() as spent, budgets.scope(db.bind, lead.campaign_id):
+            try:
+                await _write_email(db, lead)
+            except asyncio.CancelledError:
+                # The preview is no longer "generating": the process stage drafts the email
+                await asyncio.shield(_interrupt(db, lead.id))
+                raise
+            except budgets.BudgetExceeded as e:
+                # Drafted by the process stage once the campaign can afford it
+                await _interrupt(db, lead.id)
+                print(f"Email step for lead {lead.id} stopped: {e}")
+            except Exception as e:
+                print(f"Email step failed for lead {lead.id}: {e}")
+            await _record_cost(db, lead.id, spent[0])
+
+    return counts
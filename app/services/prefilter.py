@@ -0,0 +1,237 @@
+"""
+Cheap website pre-filter.
+Fetches a site with one plain HTTP GET and scores it on basic signals, so
+clearly-modern sites can skip the screenshot + Claude analysis steps. A site
+without HTTPS or a mobile viewport is never clearly modern, whatever its score.
+
+Real mode: Fetches the page with httpx and inspects the HTML
+Mock mode: Derives signals from the URL plus random data.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING
+from app import metrics
+from app.config import get_settings
+from app.services import simulator
+
+if TYPE_CHECKING:
+    import httpx
+
+# Points deducted from 100 for each signal found
+PENALTIES = {
+    "no_https": 35,
+    "no_viewport": 35,
+    "heavy_page": 15,
+    "old_copyright": 15,
+    "no_tel_link": 10,
+}
+
+# Any one of these rules out skipping the analysis, whatever the score
+MAJOR_SIGNALS = ("no_https", "no_viewport")
+
+SIGNAL_ISSUES = {
+    "no_https": "Missing SSL certificate (no HTTPS)",
+    "no_viewport": "No mobile-responsive layout",
+    "heavy_page": "Slow-loading due to heavy page weight",
+    "old_copyright": "Outdated copyright year in footer",
+    "no_tel_link": "No click-to-call phone link",
+}
+
+VIEWPORT_RE = re.compile(rb"<meta[^>]+name=[\"']?viewport", re.IGNORECASE)
+TEL_LINK_RE = re.compile(rb"href=[\"']?tel:", re.IGNORECASE)
+# Left out of the content hash: scripts and styles (tokens, cache busters) and whitespace
+VOLATILE_RE = re.compile(rb"<(script|style)\b.*?</\1\s*>|\s+", re.IGNORECASE | re.DOTALL)
+COPYRIGHT_RE = re.compile(
+    rb"(?:\xc2\xa9|&copy;|&#169;|copyright)\s*(?:\d{4}\s*(?:-|\xe2\x80\x93|&ndash;)\s*)?(\d{4})",
+    re.IGNORECASE,
+)
+
+
+async def check_site(website_url: str, client: "httpx.AsyncClient | None" = None) -> dict:
+    """
+    Score a website on cheap HTML signals.
+    Returns dict with score (None if the site could not be fetched), signals, issues.
+    """
+    settings = get_settings()
+
+    if settings.mock_mode:
+        try:
+            await simulator.call("prefilter", key=website_url)
+        except Exception as e:
+            print(f"Pre-filter fetch failed for {website_url}: {e}")
+            return {"score": None, "signals": [], "issues": [], "error": str(e)}
+        # Checks run concurrently, so simulated runs draw per URL to stay reproducible
+        rng = simulator.rng("prefilter-signals", website_url) if settings.simulate else random
+        return _mock_check(website_url, rng)
+
+    if client is None:
+        import httpx
+
+        async with httpx.AsyncClient(
+            timeout=settings.prefilter_timeout, follow_redirects=True,
+        ) as client:
+            return await _real_check(client, website_url)
+
+    return await _real_check(client, website_url)
+
+
+async def check_sites(urls: list[str]) -> dict[str, dict]:
+    """Pre-filter many sites concurrently. Returns a dict keyed by URL."""
+    settings = get_settings()
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if settings.mock_mode and not settings.simulate:
+        return {u: _mock_check(u) for u in urls}
+
+    semaphore = asyncio.Semaphore(settings.prefilter_concurrency)
+
+    async def _bounded(url: str, client: "httpx.AsyncClient | None") -> dict:
+        async with semaphore:
+            return await check_site(url, client)
+
+    if settings.mock_mode:
+        # Simulated fetches need no client
+        results = await asyncio.gather(*(_bounded(u, None) for u in urls))
+    else:
+        import httpx
+
+        async with httpx.AsyncClient(
+            timeout=settings.prefilter_timeout, follow_redirects=True,
+        ) as client:
+            results = await asyncio.gather(*(_bounded(u, client) for u in urls))
+
+    return dict(zip(urls, results))
+
+
+async def _real_check(client: "httpx.AsyncClient", website_url: str) -> dict:
+    """Fetch the page once and score it."""
+    try:
+        with metrics.provider_call("prefilter"):
+            response = await client.get(website_url)
+            response.raise_for_status()
+    except Exception as e:
+        print(f"Pre-filter fetch failed for {website_url}: {e}")
+        return {"score": None, "signals": [], "issues": [], "error": str(e)}
+
+    return {**score_html(str(response.url), response.content), "fingerprint": fingerprint(response)}
+
+
+def fingerprint(response) -> dict:
+    """ETag, Last-Modified and content hash of a fetched page."""
+    return {
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "hash": content_hash(response.content),
+    }
+
+
+def content_hash(html: bytes) -> str:
+    return hashlib.sha256(VOLATILE_RE.sub(b"", html)).hexdigest()
+
+
+async def site_changed(
+    website_url: str,
+    known: dict | None,
+    client: "httpx.AsyncClient | None" = None,
+    quiet: bool = False,
+) -> tuple[bool | None, dict | None]:
+    """
+    Whether a site changed since its `known` fingerprint, with a conditional GET
+    (If-None-Match / If-Modified-Since) so unchanged sites usually answer 304.
+    Returns (changed, new fingerprint): the fingerprint is None when the site
+    answered 304, both are None when it could not be fetched, and a site
+    without a known fingerprint is fingerprinted but not reported as changed.
+    `quiet` leaves fetch failures to the caller to report.
+    """
+    known = known or {}
+    settings = get_settings()
+
+    if settings.mock_mode:
+        try:
+            await simulator.call("prefilter", key=website_url)
+        except Exception as e:
+            if not quiet:
+                print(f"Change check failed for {website_url}: {e}")
+            return None, None
+        # Mock sites never change
+        current = _mock_fingerprint(website_url)
+        return bool(known.get("hash")) and current["hash"] != known["hash"], current
+
+    if client is None:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=settings.prefilter_timeout, follow_redirects=True) as client:
+            return await site_changed(website_url, known, client, quiet)
+
+    headers = {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+    try:
+        with metrics.provider_call("prefilter"):
+            response = await client.get(website_url, headers=headers)
+            if response.status_code == 304:
+                return False, None
+            response.raise_for_status()
+    except Exception as e:
+        if not quiet:
+            print(f"Change check failed for {website_url}: {e}")
+        return None, None
+
+    current = fingerprint(response)
+    return bool(known.get("hash")) and current["hash"] != known["hash"], current
+
+
+def score_html(final_url: str, html: bytes) -> dict:
+    """Score a fetched page from its final URL and raw HTML."""
+    settings = get_settings()
+    signals = []
+
+    if not final_url.lower().startswith("https://"):
+        signals.append("no_https")
+    if not VIEWPORT_RE.search(html):
+        signals.append("no_viewport")
+    if len(html) > settings.prefilter_max_page_bytes:
+        signals.append("heavy_page")
+
+    years = [int(y) for y in COPYRIGHT_RE.findall(html)]
+    if years and max(years) < datetime.utcnow().year - 2:
+        signals.append("old_copyright")
+
+    if not TEL_LINK_RE.search(html):
+        signals.append("no_tel_link")
+
+    return _result(signals)
+
+
+def clearly_modern(result: dict, threshold: int) -> bool:
+    """Whether a pre-filter result lets the lead skip screenshot + analysis."""
+    score = result["score"]
+    return score is not None and score >= threshold and not set(result["signals"]) & set(MAJOR_SIGNALS)
+
+
+def _result(signals: list[str]) -> dict:
+    score = max(0, 100 - sum(PENALTIES[s] for s in signals))
+    return {
+        "score": score,
+        "signals": signals,
+        "issues": [SIGNAL_ISSUES[s] for s in signals],
+    }
+
+
+def _mock_check(website_url: str, rng=random) -> dict:
+    """Return mock pre-filter data for development."""
+    signals = []
+    if not website_url.startswith("https://"):
+        signals.append("no_https")
+    others = [s for s in PENALTIES if s != "no_https"]
+    signals += rng.sample(others, rng.randint(0, len(others)))
+    return {**_result(signals), "fingerprint": _mock_fingerprint(website_url)}
+
+
+def _mock_fingerprint(website_url: str) -> dict:
+    return {"etag": None, "last_modified": None, "hash": content_hash(website_url.encode())}
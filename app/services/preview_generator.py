@@ -2,17 +2,29 @@
 Lovable Build-with-URL API wrapper.
 Generates redesign preview websites for leads.
 
-Real mode: Uses Lovable API (endpoint TBD — needs research)
+Real mode: Submits to Lovable API and polls the project until the build is ready
 Mock mode: Returns a mock preview URL.
+Local provider (PREVIEW_PROVIDER=local): Renders a static site from niche templates,
+see preview_renderer.
+
+Generated projects are cached per business_type + redesign priorities, so similar
+leads get a parametrized copy of an existing project instead of a fresh build.
 
 NOTE: The Lovable API may have limitations. This service is built with a clean
 interface so it can be swapped for another provider (Framer, raw HTML by Claude, etc).
 """
 
+import json
 import random
 import string
-import httpx
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import metrics
 from app.config import get_settings
+from app.services import budgets, costs, simulator
+from app.models.preview_template import PreviewTemplate
 
 
 def _generate_slug(business_name: str) -> str:
@@ -62,62 +74,218 @@ async def generate_preview(
     phone: str | None,
     issues: list[str] | None = None,
     priorities: list[str] | None = None,
+    template_project_id: str | None = None,
 ) -> dict:
     """
-    Generate a preview website for the lead.
-    Returns dict with preview_url, preview_prompt, preview_status.
+    Submit preview generation for the lead without waiting for the build.
+    If `template_project_id` is given, a parametrized copy of that project is
+    requested instead of a fresh generation.
+    Returns dict with preview_url, preview_prompt, preview_status, preview_job_id.
+    A "generating" status means the job must be polled with check_preview().
     """
     settings = get_settings()
+
+    if settings.preview_provider == "local":
+        from app.services import preview_renderer
+
+        return preview_renderer.render_preview(
+            lead_id, business_name, business_type, city, phone, issues,
+        )
+
     prompt = _build_prompt(
         business_name, business_type, city, phone,
         issues or [], priorities or [],
     )
 
+    async with budgets.spend("lovable"):
+        if settings.mock_mode or not settings.lovable_api_key:
+            try:
+                await simulator.call("lovable")
+            except Exception as e:
+                print(f"Preview submission failed for lead {lead_id}: {e}")
+                return {
+                    "preview_url": None,
+                    "preview_prompt": prompt,
+                    "preview_status": "failed",
+                    "preview_job_id": None,
+                }
+            return _mock_generate(lead_id, business_name, prompt)
+
+        return await _real_submit(lead_id, business_name, city, phone, prompt, template_project_id)
+
+
+async def check_preview(job_id: str) -> dict:
+    """
+    Poll a submitted preview job.
+    Returns dict with preview_status (generating | ready | failed) and preview_url.
+    """
+    settings = get_settings()
+
     if settings.mock_mode or not settings.lovable_api_key:
-        return _mock_generate(lead_id, business_name, prompt)
+        return {"preview_status": "ready", "preview_url": None}
+
+    return await _real_poll(job_id)
+
+
+# ── Template cache ───────────────────────────────────────────────────
+
+def template_key(business_type: str, priorities: list[str] | None) -> str:
+    """Cache key for previews that can share a template."""
+    normalized = sorted({p.strip().lower() for p in priorities or [] if p.strip()})
+    return f"{business_type.strip().lower()}|{','.join(normalized)}"
+
+
+async def find_template(db: AsyncSession, business_type: str, priorities: list[str] | None) -> PreviewTemplate | None:
+    """Return a ready template for this business type + priorities, if any."""
+    template = await db.scalar(select(PreviewTemplate).where(
+        PreviewTemplate.cache_key == template_key(business_type, priorities),
+        PreviewTemplate.status == "ready",
+    ).limit(1))
+    if template:
+        metrics.CACHE_HITS.inc(cache="preview_template")
+    else:
+        metrics.CACHE_MISSES.inc(cache="preview_template")
+    return template
+
+
+async def remember_template(
+    db: AsyncSession,
+    business_type: str,
+    priorities: list[str] | None,
+    project_id: str,
+    status: str,
+    preview_url: str | None = None,
+):
+    """
+    Register a freshly generated project as the template for its cache key.
+    One upsert, so concurrent workers can't collide on the key: a template
+    that is generating or ready stays, a failed one is replaced.
+    """
+    table = PreviewTemplate.__table__
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(table).values(
+        cache_key=template_key(business_type, priorities),
+        business_type=business_type,
+        priorities=json.dumps(priorities or []),
+        project_id=project_id,
+        preview_url=preview_url,
+        status=status,
+        created_at=datetime.utcnow(),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["cache_key"],
+        set_={
+            column: statement.excluded[column]
+            for column in ("business_type", "priorities", "project_id", "preview_url", "status", "created_at")
+        },
+        where=table.c.status == "failed",
+    )
+    await db.execute(statement)
+    await db.commit()
+
+
+async def update_template(db: AsyncSession, project_id: str, status: str, preview_url: str | None):
+    """Mark the template backed by `project_id` as ready/failed."""
+    template = await db.scalar(select(PreviewTemplate).where(PreviewTemplate.project_id == project_id).limit(1))
+    if template and template.status == "generating":
+        template.status = status
+        template.preview_url = preview_url
+        await db.commit()
 
-    return await _real_generate(lead_id, business_name, prompt)
 
+# ── Providers ────────────────────────────────────────────────────────
 
-async def _real_generate(lead_id: int, business_name: str, prompt: str) -> dict:
+async def _real_submit(
+    lead_id: int,
+    business_name: str,
+    city: str,
+    phone: str | None,
+    prompt: str,
+    template_project_id: str | None,
+) -> dict:
     """
-    Generate via Lovable API.
+    Submit via Lovable API and return immediately.
     NOTE: This is a placeholder — actual API endpoints need to be verified.
     """
+    import httpx
+
     settings = get_settings()
-    slug = _generate_slug(business_name)
+
+    if template_project_id:
+        url = f"{settings.lovable_base_url}/projects/{template_project_id}/remix"
+        payload = {
+            "title": business_name,
+            "variables": {"business_name": business_name, "city": city, "phone": phone or ""},
+        }
+    else:
+        url = f"{settings.lovable_base_url}/projects"
+        payload = {"prompt": prompt, "title": business_name}
 
     try:
-        async with httpx.AsyncClient(timeout=120) as client:
-            response = await client.post(
-                "https://api.lovable.dev/v1/projects",
-                headers={
-                    "Authorization": f"Bearer {settings.lovable_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "prompt": prompt,
-                    "title": business_name,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
+        with metrics.provider_call("lovable"):
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.post(
+                    url,
+                    headers={
+                        "Authorization": f"Bearer {settings.lovable_api_key}",
+                        "Content-Type": "application/json",
+                    },
+                    json=payload,
+                )
+                response.raise_for_status()
+                data = response.json()
+        costs.charge("lovable")
 
         return {
-            "preview_url": data.get("url", f"https://{slug}.{settings.preview_domain}"),
+            "preview_url": data.get("url"),
             "preview_prompt": prompt,
-            "preview_status": "ready",
+            "preview_status": _map_status(data.get("status")),
+            "preview_job_id": data.get("id"),
         }
 
     except Exception as e:
-        print(f"Preview generation failed for lead {lead_id}: {e}")
+        print(f"Preview submission failed for lead {lead_id}: {e}")
         return {
             "preview_url": None,
             "preview_prompt": prompt,
             "preview_status": "failed",
+            "preview_job_id": None,
         }
 
 
+async def _real_poll(job_id: str) -> dict:
+    """Fetch the build status of a Lovable project."""
+    import httpx
+
+    settings = get_settings()
+
+    try:
+        with metrics.provider_call("lovable"):
+            async with httpx.AsyncClient(timeout=15) as client:
+                response = await client.get(
+                    f"{settings.lovable_base_url}/projects/{job_id}",
+                    headers={"Authorization": f"Bearer {settings.lovable_api_key}"},
+                )
+                response.raise_for_status()
+                data = response.json()
+
+        return {"preview_status": _map_status(data.get("status")), "preview_url": data.get("url")}
+
+    except Exception as e:
+        # Transient poll errors keep the job generating; the timeout catches dead jobs
+        print(f"Preview status check failed for job {job_id}: {e}")
+        return {"preview_status": "generating", "preview_url": None}
+
+
+def _map_status(provider_status: str | None) -> str:
+    """Map Lovable project states onto our preview_status values."""
+    if provider_status in ("ready", "completed", "deployed"):
+        return "ready"
+    if provider_status in ("failed", "error"):
+        return "failed"
+    return "generating"
+
+
 def _mock_generate(lead_id: int, business_name: str, prompt: str) -> dict:
     """Return mock preview data for development."""
     settings = get_settings()
@@ -128,4 +296,5 @@ def _mock_generate(lead_id: int, business_name: str, prompt: str) -> dict:
         "preview_url": f"https://{slug}-{mock_id}.{settings.preview_domain}",
         "preview_prompt": prompt,
         "preview_status": "ready",
+        "preview_job_id": f"mock-{mock_id}",
     }
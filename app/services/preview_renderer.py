@@ -0,0 +1,115 @@
+"""
+Local static preview renderer.
+Renders a redesign preview per lead from niche Jinja templates and serves it
+from FastAPI under /p/{slug}. No external API, so previews are ready instantly.
+
+Each preview is written as index.html plus precompressed index.html.gz and
+(when the optional brotli package is installed) index.html.br.
+"""
+
+import gzip
+from datetime import datetime
+from pathlib import Path
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from app.config import get_settings
+from app.services.preview_generator import _generate_slug
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+PREVIEWS_DIR = Path(__file__).parent.parent / "static" / "previews"
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates" / "previews"
+
+_env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+)
+
+
+def preview_slug(lead_id: int, business_name: str) -> str:
+    """Per-lead slug; the id suffix keeps same-named businesses apart."""
+    return f"{_generate_slug(business_name) or 'lead'}-{lead_id}"
+
+
+def render_preview(
+    lead_id: int,
+    business_name: str,
+    business_type: str,
+    city: str,
+    phone: str | None,
+    issues: list[str] | None = None,
+) -> dict:
+    """
+    Render and store a preview site for one lead.
+    Returns dict with preview_url, preview_prompt, preview_status, preview_job_id.
+    """
+    settings = get_settings()
+    slug = preview_slug(lead_id, business_name)
+    template = _template_for(business_type)
+
+    try:
+        html = template.render(
+            business_name=business_name,
+            business_type_label=business_type.replace("_", " "),
+            city=city,
+            phone=phone,
+            issues=issues or [],
+            year=datetime.utcnow().year,
+        )
+        _write_site(slug, html.encode("utf-8"))
+    except Exception as e:
+        print(f"Local preview render failed for lead {lead_id}: {e}")
+        return {
+            "preview_url": None,
+            "preview_prompt": None,
+            "preview_status": "failed",
+            "preview_job_id": None,
+        }
+
+    return {
+        "preview_url": f"{settings.app_base_url.rstrip('/')}/p/{slug}",
+        "preview_prompt": f"local:{template.name}",
+        "preview_status": "ready",
+        "preview_job_id": None,
+    }
+
+
+def render_previews(leads: list) -> dict[int, dict]:
+    """Bulk-render previews for many leads. Returns results keyed by lead id."""
+    results = {}
+    for lead in leads:
+        issues = _issues_of(lead)
+        results[lead.id] = render_preview(
+            lead.id, lead.business_name, lead.business_type, lead.city, lead.phone, issues,
+        )
+    return results
+
+
+def site_dir(slug: str) -> Path | None:
+    """Directory of a rendered preview, or None if the slug is unknown."""
+    if not slug or not all(c.isalnum() or c == "-" for c in slug):
+        return None
+    path = PREVIEWS_DIR / slug
+    return path if (path / "index.html").exists() else None
+
+
+def _template_for(business_type: str):
+    """Niche template for the business type, falling back to generic.html."""
+    return _env.select_template([f"{business_type.strip().lower()}.html", "generic.html"])
+
+
+def _write_site(slug: str, html: bytes):
+    path = PREVIEWS_DIR / slug
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "index.html").write_bytes(html)
+    (path / "index.html.gz").write_bytes(gzip.compress(html, compresslevel=9, mtime=0))
+    if brotli is not None:
+        (path / "index.html.br").write_bytes(brotli.compress(html))
+
+
+def _issues_of(lead) -> list[str]:
+    issues = lead.site_issues or []
+    return issues if isinstance(issues, list) else []
@@ -0,0 +1,52 @@
+"""
+Lead priority: which leads get API budget first.
+Computed when a lead is ingested (scraped or imported) and stored on
+Lead.priority; the queue claims, and batch send sends, highest first.
+Higher is better. Roughly 0-100:
+  need        40  no website at all (the strongest reason to buy one)
+  reputation  25  Google rating out of 5
+  reach       25  review count, log-scaled (1000+ reviews = full)
+then times the niche's value (NICHE_VALUES, default 1.0), plus up to 10 for
+a business that keeps turning up in new scrapes and lists.
+"""
+
+import json
+import math
+from functools import lru_cache
+from app.config import get_settings
+
+NEED = 40
+REPUTATION = 25
+REACH = 25
+FULL_REACH_REVIEWS = 1000
+SEEN_BONUS = 5  # per repeat sighting
+MAX_SEEN_BONUS = 10
+
+
+def score(
+    rating: float | None,
+    reviews_count: int | None,
+    website_url: str | None,
+    business_type: str | None,
+    seen: int = 1,
+) -> int:
+    """Priority of one business; `seen` counts how often ingestion has met it."""
+    need = NEED if not (website_url or "").strip() else 0
+    reputation = REPUTATION * min(max(rating or 0.0, 0.0), 5.0) / 5
+    reach = REACH * min(1.0, math.log10(1 + max(reviews_count or 0, 0)) / math.log10(1 + FULL_REACH_REVIEWS))
+    base = (need + reputation + reach) * niche_value(business_type)
+    return round(base + seen_bonus(seen))
+
+
+def seen_bonus(seen: int) -> int:
+    return min(MAX_SEEN_BONUS, SEEN_BONUS * max(seen - 1, 0))
+
+
+def niche_value(business_type: str | None) -> float:
+    """Multiplier from NICHE_VALUES for this niche (1.0 when not listed)."""
+    return _niche_values(get_settings().niche_values).get((business_type or "").strip().lower(), 1.0)
+
+
+@lru_cache
+def _niche_values(raw: str) -> dict[str, float]:
+    return {niche.strip().lower(): float(value) for niche, value in (json.loads(raw) if raw else {}).items()}
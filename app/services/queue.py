@@ -0,0 +1,149 @@
+"""
+Database-backed lease queue for pipeline workers.
+Leads are claimed per stage by stamping lease_owner / lease_expires_at in a
+single UPDATE ... RETURNING. On Postgres the candidate rows are picked with
+SELECT ... FOR UPDATE SKIP LOCKED, so concurrent claimers never block or
+double-claim; on SQLite the one UPDATE statement runs under the database
+write lock, which gives the same exclusivity. A held lease is extended by
+heartbeats; when a worker dies its leases expire and the leads are claimable
+again.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_settings
+from app.models.campaign import Campaign
+from app.models.lead import LEAD_DETAILS, Lead
+from app.services import budgets
+
+# Which leads each stage works on
+STAGES = {
+    "process": Lead.status.in_(("scraped", "interrupted")),  # interrupted: resumed after a drain
+    "poll": (Lead.preview_status == "generating") & Lead.preview_job_id.isnot(None),
+}
+
+# New work only comes from active campaigns (paused ones, e.g. over budget, still finish their previews)
+ACTIVE_CAMPAIGN = or_(
+    Lead.campaign_id.is_(None),
+    Lead.campaign_id.in_(select(Campaign.id).where(Campaign.status == "active")),
+)
+
+
+async def claim(
+    db: AsyncSession,
+    owner: str,
+    stage: str,
+    limit: int,
+    campaign_id: int | None = None,
+    lease_seconds: int | None = None,
+) -> list[Lead]:
+    """
+    Lease up to `limit` unleased (or expired) leads of `stage` to `owner`,
+    highest priority first (oldest first among equals). No new leads are
+    processed once the daily spend budget is used up.
+    """
+    if stage == "process" and await budgets.daily_exhausted(db):
+        return []
+    now = datetime.utcnow()
+    lease_seconds = lease_seconds or get_settings().worker_lease_seconds
+    free = or_(Lead.lease_owner.is_(None), Lead.lease_expires_at < now)
+
+    candidates = select(Lead.id).where(STAGES[stage], free)
+    if stage == "process":
+        candidates = candidates.where(ACTIVE_CAMPAIGN)
+    if campaign_id is not None:
+        candidates = candidates.where(Lead.campaign_id == campaign_id)
+    candidates = candidates.order_by(Lead.priority.desc(), Lead.id).limit(limit)
+    if db.bind.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    ids = (await db.execute(
+        update(Lead)
+        .where(Lead.id.in_(candidates.scalar_subquery()), free)
+        # Keep updated_at: it dates the last pipeline change (preview timeout uses it)
+        .values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=Lead.updated_at)
+        .returning(Lead.id)
+        .execution_options(synchronize_session=False)
+    )).scalars().all()
+    await db.commit()
+
+    if not ids:
+        return []
+    # populate_existing: leads already in the session may hold stale values.
+    # Claimed leads are processed, so their side-table details come along.
+    leads = await db.scalars(
+        select(Lead).where(Lead.id.in_(ids)).order_by(Lead.priority.desc(), Lead.id)
+        .options(*LEAD_DETAILS).execution_options(populate_existing=True)
+    )
+    return leads.all()
+
+
+async def heartbeat(db: AsyncSession, owner: str, lead_ids: list[int], lease_seconds: int | None = None) -> int:
+    """Extend the owner's leases. Returns how many are still held."""
+    if not lead_ids:
+        return 0
+    lease_seconds = lease_seconds or get_settings().worker_lease_seconds
+    held = (await db.execute(
+        update(Lead)
+        .where(Lead.id.in_(lead_ids), Lead.lease_owner == owner)
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds), updated_at=Lead.updated_at)
+        .execution_options(synchronize_session=False)
+    )).rowcount
+    await db.commit()
+    return held
+
+
+async def release(db: AsyncSession, owner: str, lead_ids: list[int]):
+    """Give up the owner's leases on these leads."""
+    if not lead_ids:
+        return
+    await db.execute(
+        update(Lead)
+        .where(Lead.id.in_(lead_ids), Lead.lease_owner == owner)
+        .values(lease_owner=None, lease_expires_at=None, updated_at=Lead.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+class Lease:
+    """
+    Leads held by one owner. Use as an async context manager: a heartbeat task
+    keeps the leases alive while the block runs and anything still held is
+    released on exit. Call done() as each lead finishes to release it early.
+    """
+
+    def __init__(self, db: AsyncSession, owner: str, leads: list[Lead], lease_seconds: int | None = None):
+        self.db = db
+        self.owner = owner
+        self.lead_ids = [lead.id for lead in leads]
+        self.lease_seconds = lease_seconds or get_settings().worker_lease_seconds
+        self._task = None
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._beat())
+        return self
+
+    async def __aexit__(self, exc_type, *exc):
+        self._task.cancel()
+        if exc_type is asyncio.CancelledError:
+            # Cancelled mid-statement (drain deadline): release from a clean transaction
+            await self.db.rollback()
+        await release(self.db, self.owner, self.lead_ids)
+        self.lead_ids = []
+        return False
+
+    async def done(self, lead_id: int):
+        await release(self.db, self.owner, [lead_id])
+        self.lead_ids.remove(lead_id)
+
+    async def _beat(self):
+        # Own session: the block's session may be mid-transaction when this runs
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            async with AsyncSession(bind=self.db.bind) as db:
+                held = await heartbeat(db, self.owner, self.lead_ids, self.lease_seconds)
+            if held < len(self.lead_ids):
+                print(f"Lease owner {self.owner} lost {len(self.lead_ids) - held} lease(s)")
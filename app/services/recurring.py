@@ -0,0 +1,118 @@
+"""
+Recurring campaigns: a niche re-scraped in a set of locations on a cron
+schedule (RecurringCampaign). Each run creates one campaign per location and
+only does new work:
+  - businesses already stored are skipped at ingestion (lead_io dedup), so
+    only new ones go through the pipeline;
+  - of the known businesses the scrape found again, those whose website
+    changed since it was last fetched (conditional GET on the stored ETag /
+    Last-Modified, else the content hash) are moved into the run's campaign
+    and processed again.
+The scheduler (app/scheduler.py) fires each definition at its cron time plus
+stagger(), so definitions sharing a schedule spread their provider load.
+"""
+
+import asyncio
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import drain
+from app.config import get_settings
+from app.models.campaign import Campaign, RecurringCampaign
+from app.models.lead import Lead
+from app.services import pipeline, prefilter
+
+# Leads that may be processed again when their site changed; sent ones are
+# in conversation, and scraped ones are still queued
+REFRESHABLE = ("analyzed", "preview_ready", "email_drafted", "error")
+
+# Golden-ratio spacing: any number of definitions spread evenly over the window
+_GOLDEN = 0.6180339887
+
+
+def stagger(definition_id: int, interval: float | None = None) -> float:
+    """
+    Seconds after its cron time that a definition's runs start: its slot in
+    the stagger window, shrunk to half the cron `interval` when that is shorter.
+    """
+    window = get_settings().recurring_stagger_hours * 3600
+    if interval:
+        window = min(window, interval / 2)
+    return (definition_id * _GOLDEN) % 1.0 * window
+
+
+def validate_cron(cron: str) -> str:
+    """The crontab expression, normalized; ValueError if APScheduler can't parse it."""
+    from apscheduler.triggers.cron import CronTrigger
+
+    cron = " ".join(cron.split())
+    CronTrigger.from_crontab(cron)
+    return cron
+
+
+async def run(db: AsyncSession, definition: RecurringCampaign) -> list[dict]:
+    """Run a recurring campaign once, location by location. Returns each campaign's stats."""
+    results = []
+    for location in definition.location_list:
+        if drain.requested():
+            return results
+        known: list[str] = []
+        name = f"{definition.name} — {location} {datetime.utcnow():%d %b %Y}"
+        campaign = await pipeline.ingest(
+            db, definition.niche, location, definition.lead_limit, name,
+            recurring_id=definition.id, known=known,
+        )
+        new = campaign.total_scraped
+        refreshed = await refresh_changed(db, campaign, known)
+        stats = await pipeline.process_campaign(db, campaign)
+        stats["refreshed"] = refreshed
+        results.append(stats)
+        print(f"Recurring {definition.name} / {location}: {new} new, {refreshed} changed sites")
+
+    definition.last_run_at = datetime.utcnow()
+    await db.commit()
+    return results
+
+
+async def refresh_changed(db: AsyncSession, campaign: Campaign, keys: list[str]) -> int:
+    """
+    Check the websites of the known businesses (by dedup key) for changes and
+    queue the changed ones again as "scraped" leads of `campaign`.
+    Returns how many were queued.
+    """
+    if not keys:
+        return 0
+    leads = []
+    for start in range(0, len(keys), 500):
+        leads += (await db.scalars(
+            select(Lead).where(
+                Lead.dedup_key.in_(keys[start:start + 500]),
+                Lead.status.in_(REFRESHABLE),
+                Lead.website_url.isnot(None),
+                Lead.lease_owner.is_(None),
+            )
+        )).all()
+    if not leads:
+        return 0
+
+    semaphore = asyncio.Semaphore(get_settings().prefilter_concurrency)
+
+    async def check(lead: Lead):
+        known = {"etag": lead.site_etag, "last_modified": lead.site_last_modified, "hash": lead.site_hash}
+        async with semaphore:
+            return await prefilter.site_changed(lead.website_url, known)
+
+    results = await asyncio.gather(*(check(lead) for lead in leads))
+
+    refreshed = 0
+    for lead, (changed, fingerprint) in zip(leads, results):
+        pipeline.store_fingerprint(lead, fingerprint)
+        lead.site_checked_at = datetime.utcnow()
+        if changed:
+            lead.campaign_id = campaign.id
+            lead.status = "scraped"
+            lead.email_status = "pending"  # the unsent draft pitches the old site
+            refreshed += 1
+    campaign.total_scraped = (campaign.total_scraped or 0) + refreshed
+    await db.commit()
+    return refreshed
@@ -0,0 +1,113 @@
+"""
+Runtime configuration: settings changed on /settings without a restart.
+Each save stores the overrides (RUNTIME_FIELDS that differ from the
+environment) as a new version in the runtime_config table. Processes pick up
+the newest version with refresh(): workers and inline pipeline runs check
+before every lead, the web process on startup and every
+RUNTIME_CONFIG_SYNC_SECONDS. A lead runs start to end on the settings that
+were current when it started (config.pinned_settings).
+"""
+
+import json
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import config
+from app.models.runtime_config import RuntimeConfig
+from app.services import claude
+
+# Never rendered on the settings page; a blank form field keeps the current value
+SECRET_FIELDS = tuple(name for name in config.RUNTIME_FIELDS if name.endswith("_key"))
+
+# Key changes also need a new API client; other clients read the key per call
+_CLIENT_FIELDS = ("anthropic_api_key",)
+
+_applied_version = 0  # newest version applied in this process
+
+
+def applied_version() -> int:
+    return _applied_version
+
+
+async def refresh(db: AsyncSession) -> bool:
+    """Apply the newest saved version if this process hasn't yet. Returns whether it changed."""
+    global _applied_version
+    version = await db.scalar(select(func.max(RuntimeConfig.version)))
+    if not version or version == _applied_version:
+        return False
+    row = await db.get(RuntimeConfig, version)
+    # Settings saved by an older release that are no longer runtime ones are ignored
+    values = json.loads(row.values)
+    _apply({name: value for name, value in values.items() if name in config.RUNTIME_FIELDS})
+    _applied_version = version
+    print(f"Runtime config version {version} applied")
+    return True
+
+
+async def save(db: AsyncSession, values: dict) -> int:
+    """
+    Validate `values` (RUNTIME_FIELDS only), store them as a new version and
+    apply it in this process. Returns the new version; raises ValueError or
+    pydantic.ValidationError (nothing is stored then).
+    """
+    global _applied_version
+    unknown = set(values) - set(config.RUNTIME_FIELDS)
+    if unknown:
+        raise ValueError(f"Not changeable at runtime: {', '.join(sorted(unknown))}")
+    base = config.env_settings()
+    # Validated on a throwaway Settings first, so a bad value changes nothing
+    validated = config.Settings.model_validate({**base.model_dump(), **_overrides(), **values})
+    overrides = {
+        name: getattr(validated, name) for name in config.RUNTIME_FIELDS
+        if getattr(validated, name) != getattr(base, name)
+    }
+
+    row = RuntimeConfig(values=json.dumps(overrides))
+    db.add(row)
+    await db.commit()
+    _apply(overrides)
+    _applied_version = row.version
+    return row.version
+
+
+async def history(db: AsyncSession, limit: int = 10) -> list[RuntimeConfig]:
+    """The newest saved versions, newest first."""
+    return (await db.scalars(
+        select(RuntimeConfig).order_by(RuntimeConfig.version.desc()).limit(limit)
+    )).all()
+
+
+def form_fields() -> list[dict]:
+    """The runtime settings as form fields: name, input kind, current value and whether it is overridden."""
+    base, current = config.env_settings(), config.get_settings()
+    fields = []
+    for name in config.RUNTIME_FIELDS:
+        annotation = config.Settings.model_fields[name].annotation
+        value = getattr(current, name)
+        if name in SECRET_FIELDS:
+            kind, value = "secret", bool(value)
+        else:
+            kind = {bool: "bool", int: "int", float: "float"}.get(annotation, "text")
+        fields.append({
+            "name": name,
+            "label": name.replace("_", " ").capitalize(),
+            "kind": kind,
+            "value": value,
+            "overridden": getattr(current, name) != getattr(base, name),
+        })
+    return fields
+
+
+def _overrides() -> dict:
+    """Runtime fields of the current settings that differ from the environment."""
+    base, current = config.env_settings(), config.get_settings()
+    return {
+        name: getattr(current, name) for name in config.RUNTIME_FIELDS
+        if getattr(current, name) != getattr(base, name)
+    }
+
+
+def _apply(overrides: dict):
+    previous = config.get_settings()
+    settings = config.apply_overrides(overrides)
+    if any(getattr(settings, name) != getattr(previous, name) for name in _CLIENT_FIELDS):
+        claude.get_client.cache_clear()
@@ -0,0 +1,34 @@
+"""
+Pydantic schemas for structured Claude outputs.
+Responses are validated against these before anything is written to a lead.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class AnalysisResult(BaseModel):
+    """Website analysis returned by the analyzer."""
+
+    score: int = Field(ge=1, le=100)
+    issues: list[str]
+    summary: str
+    redesign_priorities: list[str] = []
+
+
+class EmailDraft(BaseModel):
+    """Cold email returned by the email writer."""
+
+    subject: str = Field(min_length=1)
+    body: str = Field(min_length=1)
+
+
+class EmailOpener(BaseModel):
+    """Personalized opening sentence slotted into a niche email template."""
+
+    opener: str = Field(min_length=1, max_length=500)
+
+
+class FusedResult(AnalysisResult):
+    """Analysis plus email draft produced by a single Claude call."""
+
+    email: EmailDraft
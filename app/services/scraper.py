@@ -8,8 +8,9 @@ Mock mode: Returns realistic fake data for development.
 
 import json
 import random
-import httpx
+from app import metrics
 from app.config import get_settings
+from app.services import budgets, costs, simulator
 
 # Realistic Dutch business data for mock mode
 MOCK_BUSINESSES = [
@@ -40,29 +41,35 @@ async def scrape_businesses(
     """
     settings = get_settings()
 
-    if settings.mock_mode or not settings.outscraper_api_key:
-        return _mock_scrape(niche, location, limit)
+    async with budgets.spend("outscraper"):
+        if settings.mock_mode or not settings.outscraper_api_key:
+            await simulator.call("outscraper")
+            return _mock_scrape(niche, location, limit)
 
-    return await _real_scrape(niche, location, limit)
+        return await _real_scrape(niche, location, limit)
 
 
 async def _real_scrape(niche: str, location: str, limit: int) -> list[dict]:
     """Scrape via Outscraper API."""
+    import httpx
+
     settings = get_settings()
 
-    async with httpx.AsyncClient(timeout=60) as client:
-        response = await client.get(
-            "https://api.app.outscraper.com/maps/search-v3",
-            params={
-                "query": f"{niche} {location}",
-                "limit": limit,
-                "language": "nl",
-                "region": "NL",
-            },
-            headers={"X-API-KEY": settings.outscraper_api_key},
-        )
-        response.raise_for_status()
-        data = response.json()
+    with metrics.provider_call("outscraper"):
+        async with httpx.AsyncClient(timeout=60) as client:
+            response = await client.get(
+                f"{settings.outscraper_base_url}/maps/search-v3",
+                params={
+                    "query": f"{niche} {location}",
+                    "limit": limit,
+                    "language": "nl",
+                    "region": "NL",
+                },
+                headers={"X-API-KEY": settings.outscraper_api_key},
+            )
+            response.raise_for_status()
+            data = response.json()
+    costs.charge("outscraper")
 
     results = []
     for item in data.get("data", [[]])[0] if data.get("data") else []:
@@ -83,19 +90,30 @@ async def _real_scrape(niche: str, location: str, limit: int) -> list[dict]:
 
 
 def _mock_scrape(niche: str, location: str, limit: int) -> list[dict]:
-    """Return mock business data for development."""
+    """
+    Return mock business data for development.
+    Cycles through MOCK_BUSINESSES for large limits, numbering the repeats so
+    names and websites stay unique.
+    """
     city = location.split(",")[0].strip()
     results = []
 
-    for biz in MOCK_BUSINESSES[:limit]:
+    for i in range(limit):
+        biz = MOCK_BUSINESSES[i % len(MOCK_BUSINESSES)]
+        cycle = i // len(MOCK_BUSINESSES)
+        name, website = biz["name"], biz["website"]
+        if cycle:
+            name = f"{name} {cycle + 1}"
+            if website:
+                website = website.replace(".nl", f"-{cycle + 1}.nl")
         results.append({
-            "business_name": biz["name"],
+            "business_name": name,
             "business_type": biz["type"],
             "address": f"Voorbeeldstraat {random.randint(1, 200)}, {city}",
             "city": city,
             "phone": biz["phone"],
             "email": None,
-            "website_url": biz["website"],
+            "website_url": website,
             "google_maps_url": f"https://maps.google.com/?cid={random.randint(10**15, 10**16)}",
             "rating": biz["rating"],
             "reviews_count": biz["reviews"],
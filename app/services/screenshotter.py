@@ -6,11 +6,13 @@ Real mode: Uses ScreenshotOne API (GET https://api.screenshotone.com/take)
 Mock mode: Creates a placeholder screenshot image.
 """
 
+import io
 import os
+from functools import lru_cache
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
-import httpx
+from app import metrics
 from app.config import get_settings
+from app.services import budgets, costs, simulator
 
 SCREENSHOTS_DIR = Path(__file__).parent.parent / "static" / "screenshots"
 
@@ -23,34 +25,48 @@ async def capture_screenshot(lead_id: int, website_url: str) -> str | None:
     settings = get_settings()
     SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    if settings.mock_mode or not settings.screenshotone_access_key:
-        return _mock_screenshot(lead_id, website_url)
+    async with budgets.spend("screenshotone"):
+        if settings.mock_mode or not settings.screenshotone_access_key:
+            try:
+                await simulator.call("screenshotone")
+            except Exception as e:
+                print(f"Screenshot failed for lead {lead_id}: {e}")
+                return None
+            if settings.simulate:
+                # Like the real path: write bytes received from the provider
+                (SCREENSHOTS_DIR / f"{lead_id}.png").write_bytes(_simulated_png())
+                return f"/static/screenshots/{lead_id}.png"
+            return _mock_screenshot(lead_id, website_url)
 
-    return await _real_screenshot(lead_id, website_url)
+        return await _real_screenshot(lead_id, website_url)
 
 
 async def _real_screenshot(lead_id: int, website_url: str) -> str | None:
     """Capture via ScreenshotOne API."""
+    import httpx
+
     settings = get_settings()
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(
-                "https://api.screenshotone.com/take",
-                params={
-                    "access_key": settings.screenshotone_access_key,
-                    "url": website_url,
-                    "viewport_width": 1280,
-                    "viewport_height": 800,
-                    "format": "png",
-                    "full_page": "false",
-                    "delay": 3,
-                },
-            )
-            response.raise_for_status()
+        with metrics.provider_call("screenshotone"):
+            async with httpx.AsyncClient(timeout=30) as client:
+                response = await client.get(
+                    f"{settings.screenshotone_base_url}/take",
+                    params={
+                        "access_key": settings.screenshotone_access_key,
+                        "url": website_url,
+                        "viewport_width": 1280,
+                        "viewport_height": 800,
+                        "format": "png",
+                        "full_page": "false",
+                        "delay": 3,
+                    },
+                )
+                response.raise_for_status()
 
         filepath = SCREENSHOTS_DIR / f"{lead_id}.png"
         filepath.write_bytes(response.content)
+        costs.charge("screenshotone")
         return f"/static/screenshots/{lead_id}.png"
 
     except Exception as e:
@@ -60,6 +76,8 @@ async def _real_screenshot(lead_id: int, website_url: str) -> str | None:
 
 def _mock_screenshot(lead_id: int, website_url: str) -> str:
     """Create a placeholder screenshot image for development."""
+    from PIL import Image, ImageDraw, ImageFont
+
     img = Image.new("RGB", (1280, 800), color=(240, 240, 245))
     draw = ImageDraw.Draw(img)
 
@@ -89,3 +107,13 @@ def _mock_screenshot(lead_id: int, website_url: str) -> str:
     filepath = SCREENSHOTS_DIR / f"{lead_id}.png"
     img.save(filepath)
     return f"/static/screenshots/{lead_id}.png"
+
+
+@lru_cache
+def _simulated_png() -> bytes:
+    """One placeholder image shared by all simulated screenshots."""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1280, 800), color=(240, 240, 245)).save(buffer, format="PNG")
+    return buffer.getvalue()
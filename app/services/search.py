@@ -0,0 +1,105 @@
+"""
+Full-text search over leads: business name, address, city, analysis summary,
+site issues and email draft.
+The index (lead_search) is built by migration 0005 and kept in sync by
+database triggers: FTS5 on SQLite, a GIN-indexed tsvector on Postgres.
+Results come newest first, which both engines can read straight off the
+index with LIMIT instead of ranking every match, so common words stay fast
+on large databases.
+"""
+
+import re
+from dataclasses import dataclass
+from markupsafe import Markup, escape
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PAGE_SIZE = 25
+
+# Highlight markers: control characters that never occur in lead text, so
+# results can be HTML-escaped first and marked up afterwards (see mark())
+MARK_START, MARK_END = "\x02", "\x03"
+
+SQLITE_SEARCH = text("""
+    SELECT lead_search.rowid AS id,
+           highlight(lead_search, 0, :start, :end) AS business_name,
+           highlight(lead_search, 2, :start, :end) AS city,
+           snippet(lead_search, -1, :start, :end, '…', 16) AS snippet,
+           l.status, l.site_score
+    FROM lead_search JOIN leads l ON l.id = lead_search.rowid
+    WHERE lead_search MATCH :query
+    ORDER BY lead_search.rowid DESC
+    LIMIT :limit OFFSET :offset
+""")
+
+POSTGRES_SEARCH = text("""
+    SELECT l.id,
+           ts_headline('simple', l.business_name, q, :options) AS business_name,
+           ts_headline('simple', coalesce(l.city, ''), q, :options) AS city,
+           ts_headline('simple', concat_ws(' … ', a.summary, e.body), q, :options || ', MaxWords=24, MinWords=10')
+               AS snippet,
+           l.status, l.site_score
+    FROM (
+        SELECT s.lead_id FROM lead_search s
+        WHERE s.document @@ to_tsquery('simple', :query)
+        ORDER BY s.lead_id DESC
+        LIMIT :limit OFFSET :offset
+    ) hits
+    JOIN leads l ON l.id = hits.lead_id
+    LEFT JOIN lead_analysis a ON a.lead_id = l.id
+    LEFT JOIN lead_email e ON e.lead_id = l.id,
+    to_tsquery('simple', :query) q
+    ORDER BY l.id DESC
+""")
+
+
+@dataclass
+class SearchHit:
+    id: int
+    business_name: str
+    city: str
+    snippet: str
+    status: str | None
+    site_score: int | None
+
+
+def terms(query: str) -> list[str]:
+    """Words of a free-text query; everything else (operators, quotes) is dropped."""
+    return re.findall(r"\w+", query.lower())
+
+
+def match_query(words: list[str], dialect: str) -> str:
+    """All words must match, each as a prefix (so 'plumb' finds 'plumber')."""
+    if dialect == "postgresql":
+        return " & ".join(f"{w}:*" for w in words)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+async def search_leads(db: AsyncSession, query: str, page: int = 1, page_size: int = PAGE_SIZE) -> tuple[list[SearchHit], bool]:
+    """One page of matching leads, newest first, and whether another page follows."""
+    words = terms(query)
+    if not words:
+        return [], False
+
+    dialect = db.bind.dialect.name
+    params = {
+        "query": match_query(words, dialect),
+        "limit": page_size + 1,
+        "offset": (page - 1) * page_size,
+    }
+    if dialect == "postgresql":
+        statement = POSTGRES_SEARCH
+        params["options"] = f"StartSel={MARK_START}, StopSel={MARK_END}, HighlightAll=false"
+    else:
+        statement = SQLITE_SEARCH
+        params.update(start=MARK_START, end=MARK_END)
+
+    rows = (await db.execute(statement, params)).all()
+    hits = [SearchHit(**row._mapping) for row in rows[:page_size]]
+    return hits, len(rows) > page_size
+
+
+def mark(value: str | None) -> Markup:
+    """HTML-escape a highlighted result and turn its markers into <mark> tags."""
+    escaped = escape(value or "")
+    return Markup(escaped.replace(MARK_START, Markup("<mark>")).replace(MARK_END, Markup("</mark>")))
@@ -0,0 +1,90 @@
+"""
+Seeded provider simulator for load testing in mock mode.
+With SIMULATE=true every mock provider call first waits a latency drawn from a
+per-provider lognormal distribution and may fail with a 5xx or a 429, so mock
+runs get a realistic timing and failure mix. The same seed and lead order
+reproduce the same run.
+
+Mock mode only — real API calls are never simulated.
+"""
+
+import asyncio
+import json
+import math
+import random
+from functools import lru_cache
+from app import metrics
+from app.config import get_settings
+
+# median latency, lognormal sigma, and the chance of a 5xx / 429 per call.
+# A failed scrape aborts the whole run, so outscraper failures are opt-in.
+PROFILES = {
+    "outscraper": {"latency_ms": 4000, "jitter": 0.4, "error_rate": 0.0, "rate_limit_rate": 0.0},
+    "prefilter": {"latency_ms": 400, "jitter": 0.8, "error_rate": 0.05, "rate_limit_rate": 0.0},
+    "screenshotone": {"latency_ms": 4500, "jitter": 0.3, "error_rate": 0.02, "rate_limit_rate": 0.01},
+    "anthropic": {"latency_ms": 3000, "jitter": 0.5, "error_rate": 0.01, "rate_limit_rate": 0.03},
+    "lovable": {"latency_ms": 800, "jitter": 0.4, "error_rate": 0.02, "rate_limit_rate": 0.01},
+    "instantly": {"latency_ms": 300, "jitter": 0.3, "error_rate": 0.01, "rate_limit_rate": 0.02},
+}
+
+_rng = random.Random(get_settings().simulate_seed)
+
+
+def seed(value: int | None = None):
+    """Reseed the simulator and the module-level random used by the mocks."""
+    if value is None:
+        value = get_settings().simulate_seed
+    _rng.seed(value)
+    random.seed(value)
+
+
+def profile(provider: str) -> dict:
+    """Effective profile of a provider (defaults merged with SIMULATE_PROFILES)."""
+    return {**PROFILES[provider], **_overrides(get_settings().simulate_profiles).get(provider, {})}
+
+
+@lru_cache
+def _overrides(raw: str) -> dict:
+    return json.loads(raw) if raw else {}
+
+
+def rng(*key) -> random.Random:
+    """A generator seeded by the simulator seed plus `key`, independent of call order."""
+    return random.Random(":".join(str(k) for k in (get_settings().simulate_seed, *key)))
+
+
+def draw(provider: str, key: str | None = None) -> tuple[float, int | None]:
+    """
+    Draw one call outcome: (latency in seconds, HTTP error status or None).
+    Keyed draws (e.g. by URL) don't depend on the order concurrent calls run in.
+    """
+    p = profile(provider)
+    source = rng(provider, key) if key is not None else _rng
+    latency = source.lognormvariate(math.log(p["latency_ms"] / 1000), p["jitter"])
+    roll = source.random()
+    if roll < p["rate_limit_rate"]:
+        return latency, 429
+    if roll < p["rate_limit_rate"] + p["error_rate"]:
+        return latency, 503
+    return latency, None
+
+
+async def call(provider: str, key: str | None = None):
+    """
+    Simulate one API call to `provider` when SIMULATE is on (no-op otherwise).
+    Concurrent callers should pass a `key` to stay reproducible.
+    Raises httpx.HTTPStatusError for injected failures, like a real call would.
+    """
+    settings = get_settings()
+    if not settings.simulate:
+        return
+
+    latency, status = draw(provider, key)
+    with metrics.provider_call(provider):
+        await asyncio.sleep(latency * settings.simulate_time_scale)
+        if status is not None:
+            import httpx
+
+            request = httpx.Request("POST", f"https://simulated.invalid/{provider}")
+            response = httpx.Response(status, request=request)
+            raise httpx.HTTPStatusError(f"Simulated {status} from {provider}", request=request, response=response)
@@ -0,0 +1,129 @@
+"""
+Website change sweep: keeps analyses from going stale.
+Periodically re-checks the sites of analyzed leads whose last check is older
+than SITE_RECHECK_DAYS, stalest first, with a conditional GET on the stored
+ETag / Last-Modified (a 304 costs no body) and otherwise a comparison of the
+page's content hash (prefilter.site_changed). Changed sites go back to
+"scraped", so the pipeline screenshots and analyzes them again, and their
+unsent draft is parked until it is written again; the others only get their
+fingerprint and check time updated.
+Sites are checked in batches of BATCH_SIZE by SITE_SWEEP_CONCURRENCY
+workers with an HTTP client each (one shared connection pool slows down as
+it grows), and each batch is written back with two executemany UPDATEs (and
+one for the re-queued), so a sweep keeps up with 100k+ sites an hour.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import drain
+from app.config import get_settings
+from app.models.lead import Lead
+from app.services import prefilter
+from app.services.recurring import REFRESHABLE
+
+BATCH_SIZE = 1000
+
+_table = Lead.__table__
+# Fingerprint writes keep updated_at: it dates the last pipeline change
+_REFRESH = _table.update().where(_table.c.id == bindparam("lead_id")).values(
+    site_etag=bindparam("etag"), site_last_modified=bindparam("last_modified"), site_hash=bindparam("hash"),
+    site_checked_at=bindparam("checked_at"), updated_at=_table.c.updated_at,
+)
+_CHECKED = _table.update().where(_table.c.id == bindparam("lead_id")).values(
+    site_checked_at=bindparam("checked_at"), updated_at=_table.c.updated_at,
+)
+
+
+def _due(now: datetime):
+    """Analyzed leads with a website whose last check is older than SITE_RECHECK_DAYS."""
+    cutoff = now - timedelta(days=get_settings().site_recheck_days)
+    return (
+        Lead.status.in_(REFRESHABLE),
+        Lead.website_url.isnot(None),
+        Lead.lease_owner.is_(None),
+        or_(Lead.preview_status.is_(None), Lead.preview_status != "generating"),
+        or_(Lead.site_checked_at.is_(None), Lead.site_checked_at < cutoff),
+    )
+
+
+async def sweep(db: AsyncSession, limit: int | None = None) -> dict:
+    """
+    Check up to `limit` due sites (default SITE_SWEEP_LIMIT), stalest first.
+    Returns counts of checked, changed (re-queued) and failed sites.
+    """
+    settings = get_settings()
+    limit = limit or settings.site_sweep_limit
+    counts = {"checked": 0, "changed": 0, "failed": 0}
+    now = datetime.utcnow()
+
+    clients = [None] * settings.site_sweep_concurrency
+    if not settings.mock_mode:
+        import httpx
+
+        # Loading the CA bundle is the slow part of creating a client: do it once
+        ssl_context = httpx.create_ssl_context()
+        clients = [
+            httpx.AsyncClient(timeout=settings.prefilter_timeout, follow_redirects=True, verify=ssl_context)
+            for _ in clients
+        ]
+    try:
+        # A drain stops the sweep between batches; the rest are due again next sweep
+        while counts["checked"] < limit and not drain.requested():
+            # Never-checked leads first (by id), then the stalest checks
+            query = (
+                select(Lead.id, Lead.website_url, Lead.site_etag, Lead.site_last_modified, Lead.site_hash)
+                .where(*_due(now))
+                .order_by(Lead.site_checked_at.isnot(None), Lead.site_checked_at, Lead.id)
+                .limit(min(BATCH_SIZE, limit - counts["checked"]))
+            )
+            batch = (await db.execute(query)).all()
+            if not batch:
+                break
+            await _check_batch(db, batch, clients, counts)
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients if client is not None))
+    return counts
+
+
+async def _check_batch(db: AsyncSession, batch, clients: list, counts: dict):
+    results = [None] * len(batch)
+    todo = iter(enumerate(batch))
+
+    async def work(client):
+        for i, row in todo:
+            known = {"etag": row.site_etag, "last_modified": row.site_last_modified, "hash": row.site_hash}
+            results[i] = await prefilter.site_changed(row.website_url, known, client, quiet=True)
+
+    await asyncio.gather(*(work(client) for client in clients))
+
+    checked_at = datetime.utcnow()
+    requeue, refresh, checked = [], [], []
+    for row, (changed, fingerprint) in zip(batch, results):
+        if fingerprint is None:
+            # 304 (unchanged) or unreachable: only the check time moves on
+            checked.append({"lead_id": row.id, "checked_at": checked_at})
+            counts["failed"] += changed is None
+            continue
+        refresh.append({"lead_id": row.id, "checked_at": checked_at, **fingerprint})
+        if changed:
+            requeue.append(row.id)
+
+    # Every row gets a new check time, so the next batch query moves on
+    for statement, params in ((_REFRESH, refresh), (_CHECKED, checked)):
+        if params:
+            await db.execute(statement, params)
+    requeued = 0
+    if requeue:
+        # Only if nothing else picked the lead up meanwhile; the unsent draft
+        # pitches the old site, so it is parked ("pending" is never sent)
+        requeued = (await db.execute(
+            update(Lead)
+            .where(Lead.id.in_(requeue), Lead.status.in_(REFRESHABLE), Lead.lease_owner.is_(None))
+            .values(status="scraped", email_status="pending", updated_at=checked_at)
+            .execution_options(synchronize_session=False)
+        )).rowcount
+    await db.commit()
+    counts["checked"] += len(batch)
+    counts["changed"] += requeued
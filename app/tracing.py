@@ -0,0 +1,209 @@
+"""
+Lightweight tracing spans with OpenTelemetry-compatible export.
+
+A root span per lead (opened by the pipeline) and child spans for every stage
+and external API call (opened by app.metrics). Children inherit the lead and
+campaign ids of their root. Sampling is decided once per root span, so an
+unsampled lead costs one random() call plus a contextvar lookup per span.
+
+Exporters (TRACE_EXPORTER):
+  none    — tracing disabled
+  console — one line per finished span on stdout
+  file    — one OTLP/JSON ExportTraceServiceRequest per trace, appended to
+            TRACE_FILE (readable by the OpenTelemetry collector's otlpjsonfile
+            receiver and by scripts/trace_report.py)
+"""
+
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from app.config import get_settings
+
+INHERITED_ATTRIBUTES = ("lead.id", "campaign.id")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error", "finished")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+        self.finished = []  # root span only: every finished span of the trace
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_UNSAMPLED = object()
+_current: ContextVar = ContextVar("current_span", default=None)
+_root: ContextVar = ContextVar("root_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Open a span. Keyword attributes use "_" for "." (lead_id -> lead.id).
+    Yields the Span, or None when tracing is off or the trace is unsampled.
+    """
+    parent = _current.get()
+    if parent is _UNSAMPLED:
+        yield None
+        return
+
+    settings = get_settings()
+    if parent is None:
+        if settings.trace_exporter == "none" or random.random() >= settings.trace_sample_rate:
+            token = _current.set(_UNSAMPLED)
+            try:
+                yield None
+            finally:
+                _current.reset(token)
+            return
+        trace_id = os.urandom(16).hex()
+        inherited = {}
+    else:
+        trace_id = parent.trace_id
+        inherited = {k: parent.attributes[k] for k in INHERITED_ATTRIBUTES if k in parent.attributes}
+
+    attrs = {**inherited, **{k.replace("_", "."): v for k, v in attributes.items() if v is not None}}
+    current = Span(name, trace_id, parent.span_id if parent else None, attrs)
+    token = _current.set(current)
+    root_token = _root.set(current) if parent is None else None
+
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        root = current if parent is None else _root.get()
+        if root_token is not None:
+            _root.reset(root_token)
+        if root is not None:
+            root.finished.append(current)
+        if settings.trace_exporter == "console":
+            _print_span(current)
+        if parent is None:
+            _export(current, settings)
+
+
+def _export(root: Span, settings):
+    if settings.trace_exporter != "file":
+        return
+    request = {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", settings.app_name)]},
+            "scopeSpans": [{
+                "scope": {"name": "leadpilot"},
+                "spans": [s.to_otlp() for s in root.finished],
+            }],
+        }]
+    }
+    with open(settings.trace_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+
+def _print_span(s: Span):
+    duration_ms = (s.end_ns - s.start_ns) / 1e6
+    attrs = " ".join(f"{k}={v}" for k, v in s.attributes.items())
+    status = f" ERROR {s.error}" if s.error else ""
+    print(f"[trace {s.trace_id[:8]}] {s.name} {duration_ms:.1f}ms {attrs}{status}")
+
+
+def _otlp_attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def read_traces(path: str) -> list[list[dict]]:
+    """Load traces from an OTLP/JSON lines file. Returns one span list per line."""
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            spans = []
+            for resource in request.get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    spans.extend(scope.get("spans", []))
+            traces.append(spans)
+    return traces
+
+
+def attribute(span_dict: dict, key: str):
+    """Read a typed attribute value from an OTLP/JSON span."""
+    for attr in span_dict.get("attributes", []):
+        if attr["key"] == key:
+            value = next(iter(attr["value"].values()))
+            return int(value) if "intValue" in attr["value"] else value
+    return None
+
+
+def slowest_leads(traces: list[list[dict]], n: int = 10) -> list[list[dict]]:
+    """The n traces with the longest root "lead" span, slowest first."""
+    leads = [t for t in traces if any(s["name"] == "lead" and "parentSpanId" not in s for s in t)]
+    return sorted(leads, key=lambda t: -_duration_ns(_root_of(t)))[:n]
+
+
+def waterfall(spans: list[dict], width: int = 40) -> list[str]:
+    """Render one trace as text rows: indented span name, duration and a timeline bar."""
+    root = _root_of(spans)
+    start = int(root["startTimeUnixNano"])
+    total = max(_duration_ns(root), 1)
+    children = {}
+    for s in spans:
+        children.setdefault(s.get("parentSpanId"), []).append(s)
+
+    lines = []
+
+    def _walk(s: dict, depth: int):
+        offset = (int(s["startTimeUnixNano"]) - start) * width // total
+        length = max(1, _duration_ns(s) * width // total)
+        bar = " " * offset + "█" * min(length, width - offset)
+        error = " !" if s.get("status", {}).get("code") == 2 else ""
+        label = ("  " * depth + s["name"])[:28]
+        lines.append(f"{label:<28} {_duration_ns(s) / 1e6:9.1f}ms |{bar:<{width}}|{error}")
+        for child in sorted(children.get(s["spanId"], []), key=lambda c: int(c["startTimeUnixNano"])):
+            _walk(child, depth + 1)
+
+    _walk(root, 0)
+    return lines
+
+
+def _root_of(spans: list[dict]) -> dict:
+    return next(s for s in spans if "parentSpanId" not in s)
+
+
+def _duration_ns(s: dict) -> int:
+    return int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])
@@ -0,0 +1,30 @@
+"""
+APScheduler triggers. Imported by the scheduler when it starts, so importing
+the app doesn't load APScheduler.
+"""
+
+from datetime import timedelta
+from apscheduler.triggers.base import BaseTrigger
+
+
+class OffsetTrigger(BaseTrigger):
+    """
+    Fires `offset` seconds after each fire time of `trigger`. The scheduler
+    owns the delay: a job added again after a restart inside the offset still
+    fires for the cron time it was waiting on, and nothing sleeps in a job slot.
+    """
+
+    def __init__(self, trigger: BaseTrigger, offset: float):
+        self.trigger = trigger
+        self.offset = timedelta(seconds=round(offset))
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        previous = previous_fire_time - self.offset if previous_fire_time else None
+        fire_time = self.trigger.get_next_fire_time(previous, now - self.offset)
+        return fire_time + self.offset if fire_time else None
+
+    def __str__(self):
+        return f"{self.trigger} + {self.offset.total_seconds():.0f}s"
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} ({self.trigger!r}, offset={self.offset.total_seconds():.0f}s)>"
@@ -0,0 +1,109 @@
+"""
+Scale-out pipeline worker.
+Claims leased batches of leads per stage from the shared database, processes
+them and releases them (see services/queue.py). Run several with
+scripts/worker.py, on one host or many sharing DATABASE_URL.
+
+Stages:
+  process — "scraped" leads: pre-filter the batch, then run each lead's pipeline;
+            "interrupted" ones resume after their analysis, without a pre-filter
+  poll    — leads whose preview is generating, checked every PREVIEW_POLL_INTERVAL
+
+On a drain (app/drain.py) a worker claims nothing more, finishes the lead in
+progress and releases the rest of its batch, then returns.
+"""
+
+import asyncio
+import os
+import socket
+import time
+from app import drain, metrics
+from app.config import get_settings
+from app.database import AsyncSessionLocal
+from app.services import pipeline, prefilter, queue, runtime_config
+
+STAGES = ("poll", "process")
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+async def run_worker(
+    owner: str | None = None,
+    stages: tuple[str, ...] = STAGES,
+    batch_size: int | None = None,
+    stop_when_idle: bool = False,
+    session_factory=AsyncSessionLocal,
+) -> dict:
+    """
+    Claim and process batches until stopped or drained. With stop_when_idle,
+    returns once a round finds nothing to process and no preview finished.
+    Returns the pipeline stats of the leads this worker handled.
+    Settings are read every round, so a new runtime config version (picked
+    up here and before every lead) applies without a restart.
+    """
+    owner = owner or default_owner()
+    stats = {**pipeline.new_stats(), "previews_failed": 0}
+    next_poll = 0.0
+
+    async with session_factory() as db:
+        while not drain.requested():
+            await runtime_config.refresh(db)
+            settings = get_settings()
+            size = batch_size or settings.worker_batch_size
+            progress = 0
+            if "poll" in stages and time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + settings.preview_poll_interval
+                progress += await _poll_batch(db, owner, size, stats)
+            if "process" in stages:
+                progress += await _process_batch(db, owner, size, stats)
+
+            if not progress:
+                if stop_when_idle:
+                    return stats
+                await _idle(settings.worker_idle_sleep)
+    return stats
+
+
+async def _idle(seconds: float):
+    """Sleep between empty claims, waking early for a drain."""
+    until = time.monotonic() + seconds
+    while not drain.requested() and time.monotonic() < until:
+        await asyncio.sleep(min(0.5, until - time.monotonic()))
+
+
+async def _process_batch(db, owner: str, batch_size: int, stats: dict) -> int:
+    leads = await queue.claim(db, owner, "process", batch_size)
+    if not leads:
+        return 0
+
+    async with queue.Lease(db, owner, leads) as lease:
+        prechecks = {}
+        # Interrupted leads passed the pre-filter already and resume after their analysis
+        urls = [lead.website_url for lead in leads if lead.status != "interrupted"]
+        if get_settings().prefilter_enabled and urls:
+            with metrics.stage("prefilter"):
+                prechecks = await prefilter.check_sites(urls)
+
+        for lead in leads:
+            if drain.requested():
+                break
+            await pipeline.process_claimed_lead(db, lead, prechecks.get(lead.website_url), stats)
+            await lease.done(lead.id)
+
+    return len(leads)
+
+
+async def _poll_batch(db, owner: str, batch_size: int, stats: dict) -> int:
+    """Poll one batch of generating previews; returns how many finished."""
+    leads = await queue.claim(db, owner, "poll", batch_size)
+    if not leads:
+        return 0
+
+    async with queue.Lease(db, owner, leads):
+        counts = await pipeline.poll_previews(db, leads)
+
+    stats["previews_generated"] += counts["ready"]
+    stats["previews_failed"] += counts["failed"]
+    return counts["ready"] + counts["failed"]
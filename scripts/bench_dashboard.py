@@ -0,0 +1,125 @@
+"""
+Dashboard query benchmark on a synthetic database.
+Seeds --leads drafted leads (with realistic analysis, email and preview text)
+into a fresh SQLite file and times the dashboard's lead list, stat counts and
+full-text search (first and a deep page, rare and common words), then reports the file size and, where SQLite has dbstat, the size per table.
+
+Usage: python -m scripts.bench_dashboard [--leads 200000] [--path /tmp/leadpilot-bench.db]
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import init_db, make_engine
+from app.models.campaign import Campaign
+from app.models.lead import Lead, LeadAnalysis, LeadEmail, LeadPreview
+from app.services import search
+
+BODY = "Beste eigenaar,\n\nIk zag uw website en er vielen me een paar dingen op. " * 12
+SUMMARY = "The site uses a dated table layout, has no mobile viewport and loads slowly. " * 4
+ISSUES = ["No mobile-responsive layout", "Outdated design", "No SSL", "Slow load", "No call to action"]
+PROMPT = "Build a modern single-page site for a plumber in Amsterdam with hero, services and reviews. " * 6
+CHUNK = 5000
+
+
+async def seed(engine, n: int):
+    async with engine.begin() as conn:
+        await conn.execute(insert(Campaign).values(id=1, name="Bench", niche="plumber", location="Amsterdam"))
+        for start in range(0, n, CHUNK):
+            ids = range(start + 1, min(n, start + CHUNK) + 1)
+            await conn.execute(insert(Lead), [
+                dict(
+                    id=i, campaign_id=1, business_name=f"Biz {i}", business_type="plumber", city="Amsterdam",
+                    website_url=f"http://biz{i}.nl", site_score=i % 100,
+                    status=("email_drafted", "analyzed", "scraped")[i % 3],
+                    preview_status="ready", email_status="draft",
+                )
+                for i in ids
+            ])
+            await conn.execute(insert(LeadAnalysis), [dict(lead_id=i, issues=ISSUES, summary=SUMMARY) for i in ids])
+            await conn.execute(insert(LeadEmail), [dict(lead_id=i, subject="Uw website", body=BODY) for i in ids])
+            await conn.execute(insert(LeadPreview), [dict(lead_id=i, prompt=PROMPT) for i in ids])
+
+
+async def time_queries(engine, rounds: int = 3) -> list[tuple[float, float]]:
+    """(lead list, stat counts) seconds per round, as the dashboard runs them."""
+    timings = []
+    async with async_sessionmaker(bind=engine)() as db:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            (await db.scalars(select(Lead).order_by(Lead.created_at.desc()))).all()
+            listed = time.perf_counter() - start
+            db.expunge_all()
+
+            start = time.perf_counter()
+            count = select(func.count(Lead.id))
+            for condition in (
+                Lead.site_score.isnot(None), Lead.preview_status == "ready", Lead.email_status == "sent",
+                Lead.email_status == "replied", Lead.status == "closed",
+            ):
+                await db.scalar(count.where(condition))
+            timings.append((listed, time.perf_counter() - start))
+    return timings
+
+
+async def time_search(engine, n: int) -> dict[str, float]:
+    """Milliseconds per search, for a word in one lead and words in every lead."""
+    timings = {}
+    async with async_sessionmaker(bind=engine)() as db:
+        for query, page in ((f"biz {n // 2}", 1), ("amsterdam", 1), ("ssl", 1), ("eigen", 1), ("ssl", 40)):
+            await search.search_leads(db, query, page)  # warm the page cache
+            start = time.perf_counter()
+            hits, _ = await search.search_leads(db, query, page)
+            timings[f"{query!r} page {page}"] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def table_sizes(path: str) -> dict[str, float]:
+    """MB per table and index, or {} when SQLite was built without dbstat."""
+    try:
+        with sqlite3.connect(path) as conn:
+            rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {name: size / 1e6 for name, size in rows}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Time dashboard queries on a synthetic database")
+    parser.add_argument("--leads", type=int, default=200_000, help="Leads to seed")
+    parser.add_argument("--path", default="/tmp/leadpilot-bench.db", help="SQLite file to (re)create")
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.path + suffix):
+            os.remove(args.path + suffix)
+
+    engine = make_engine(f"sqlite:///{args.path}")
+    try:
+        await init_db(engine)
+        start = time.perf_counter()
+        await seed(engine, args.leads)
+        print(f"Seeded {args.leads} leads in {time.perf_counter() - start:.1f}s")
+
+        for listed, counted in await time_queries(engine):
+            print(f"  lead list {listed * 1000:8.0f} ms   stat counts {counted * 1000:6.0f} ms")
+        for label, ms in (await time_search(engine, args.leads)).items():
+            print(f"  search {label:<22} {ms:6.1f} ms")
+    finally:
+        await engine.dispose()
+
+    print(f"  file {os.path.getsize(args.path) / 1e6:.1f} MB")
+    for name, size in table_sizes(args.path).items():
+        print(f"    {name:<20} {size:8.1f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
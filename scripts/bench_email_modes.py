@@ -0,0 +1,137 @@
+"""
+Email drafting benchmark: full drafts (EMAIL_MODE=full) against hybrid
+drafts (a cached niche template plus a Claude-written opener).
+Drafts --emails synthetic leads of --niches business types in each mode,
+through the real Anthropic SDK path against the in-process fake providers
+(Claude replies stream at a fixed output speed, so shorter replies finish
+sooner). Reports per-draft latency p50/p95 and output tokens per draft;
+hybrid includes the one-off template calls, spread over its drafts.
+Latencies are measured at --time-scale, so compare runs of the same scale.
+
+Usage: python -m scripts.bench_email_modes [--emails 200] [--niches 4] [--concurrency 10] [--time-scale 0.1]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.config import get_settings
+from app.database import init_db, make_engine
+from app.fake_providers import create_app, serve_in_thread, use_fake_providers
+from app.services import email_writer, simulator
+
+NICHES = ["plumber", "bakery", "dentist", "hair salon", "electrician", "florist", "restaurant", "garage"]
+CITIES = ["Amsterdam", "Rotterdam", "Utrecht", "Delft"]
+
+
+def leads(n: int, niches: int) -> list[dict]:
+    return [
+        {
+            "business_name": f"Bedrijf {i}",
+            "business_type": NICHES[i % niches],
+            "city": CITIES[i % len(CITIES)],
+            "website_url": f"http://bedrijf{i}.nl",
+            "site_score": 30,
+            "issues": ["Not mobile responsive", "Slow loading"],
+            "preview_url": f"https://bedrijf{i}.preview.nl",
+        }
+        for i in range(n)
+    ]
+
+
+async def draft_all(mode: str, batch: list[dict], db, concurrency: int) -> dict:
+    """Draft every lead in `mode`; returns latencies (s) and output tokens per draft."""
+    semaphore = asyncio.Semaphore(concurrency)
+    templates, template_tokens = {}, 0
+    if mode == "hybrid":
+        for business_type in sorted({lead["business_type"] for lead in batch}):
+            templates[business_type], usage = await email_writer.email_template(db, business_type)
+            template_tokens += (usage or {}).get("output_tokens", 0)
+
+    async def draft(lead: dict) -> tuple[float, int]:
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "hybrid":
+                email = await email_writer.write_hybrid_email(templates[lead["business_type"]], **lead)
+            else:
+                email = await email_writer.write_email(**lead)
+            return time.perf_counter() - start, (email.get("usage") or {}).get("output_tokens", 0)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(draft(lead) for lead in batch))
+    return {
+        "seconds": time.perf_counter() - start,
+        "latencies": sorted(latency for latency, _ in results),
+        "output_tokens": sum(tokens for _, tokens in results) + template_tokens,
+    }
+
+
+async def run_mode(mode: str, batch: list[dict], workdir: Path, concurrency: int) -> dict:
+    engine = make_engine(f"sqlite:///{workdir / f'bench-{mode}.db'}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        await init_db(engine)
+    simulator.seed()
+    try:
+        async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+            result = await draft_all(mode, batch, db, concurrency)
+    finally:
+        await engine.dispose()
+    latencies = result["latencies"]
+    return {
+        "mode": mode,
+        "emails": len(batch),
+        "seconds": round(result["seconds"], 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+        "output_tokens_per_email": round(result["output_tokens"] / len(batch), 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare full and hybrid email drafting")
+    parser.add_argument("--emails", type=int, default=200, help="Drafts per mode")
+    parser.add_argument("--niches", type=int, default=4, choices=range(1, len(NICHES) + 1), metavar="1-8",
+                        help="Business types among the leads (one template each in hybrid mode)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Drafts in flight at once")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Multiplier for simulated latencies")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    base_url, stop = serve_in_thread(create_app(time_scale=args.time_scale, inject_failures=False))
+    use_fake_providers(base_url)
+    print(f"Email drafting benchmark — {args.emails} drafts, {args.niches} niches, "
+          f"seed {settings.simulate_seed}, latency scale {args.time_scale}\n")
+
+    batch = leads(args.emails, args.niches)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="leadpilot-bench-") as tmp:
+            for mode in ("full", "hybrid"):
+                result = await run_mode(mode, batch, Path(tmp), args.concurrency)
+                results.append(result)
+                print(
+                    f"  {mode:<7} {result['seconds']:>7.2f}s  p50={result['p50_ms']:>8.1f}ms  "
+                    f"p95={result['p95_ms']:>8.1f}ms  output tokens/email={result['output_tokens_per_email']:>6.1f}"
+                )
+    finally:
+        stop()
+
+    full, hybrid = results
+    print(
+        f"\nHybrid vs full: {full['p50_ms'] / hybrid['p50_ms']:.1f}x lower p50 latency, "
+        f"{full['output_tokens_per_email'] / hybrid['output_tokens_per_email']:.1f}x fewer output tokens"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
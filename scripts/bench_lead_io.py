@@ -0,0 +1,115 @@
+"""
+Bulk import / export benchmark on a fresh SQLite file.
+Writes a CSV of --rows synthetic businesses (with --dup-rate repeats), imports
+it, imports it again (all duplicates), then exports all leads as CSV and,
+with pyarrow installed, Parquet. Reports rows/s and the peak resident memory
+of each phase, which should stay flat as --rows grows.
+
+Usage: python -m scripts.bench_lead_io [--rows 1000000] [--dir /tmp/leadpilot-io]
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import random
+import shutil
+import sys
+import time
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.database import init_db, make_engine
+from app.services import lead_io
+from scripts.export_leads import export
+
+CITIES = ["Amsterdam", "Rotterdam", "Utrecht", "Den Haag", "Eindhoven", "Groningen", "Tilburg", "Almere"]
+TYPES = ["plumber", "electrician", "bakery", "hair salon", "dentist", "restaurant"]
+
+
+def write_source(path: str, rows: int, dup_rate: float):
+    """Synthetic lead list; about dup_rate of the rows repeat an earlier business."""
+    rng = random.Random(42)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(lead_io.IMPORT_FIELDS)
+        for i in range(rows):
+            n = rng.randrange(i) if i and rng.random() < dup_rate else i
+            city = CITIES[n % len(CITIES)]
+            writer.writerow([
+                f"Bedrijf {n}", TYPES[n % len(TYPES)], f"Dorpsstraat {n % 300}, {city}", city,
+                f"+31 6 {n:08d}", None, f"https://www.bedrijf{n}.nl" if n % 5 else None, "",
+                round(3 + (n % 20) / 10, 1), n % 400,
+            ])
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+@asynccontextmanager
+async def phase(label: str, results: dict):
+    """Time a phase and sample its peak RSS every 20 ms."""
+    peak = [rss_mb()]
+
+    async def sample():
+        while True:
+            peak[0] = max(peak[0], rss_mb())
+            await asyncio.sleep(0.02)
+
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        sampler.cancel()
+        results[label] = (time.perf_counter() - start, max(peak[0], rss_mb()))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk lead import and export")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the source file")
+    parser.add_argument("--dup-rate", type=float, default=0.05, help="Share of rows repeating a business")
+    parser.add_argument("--dir", default="/tmp/leadpilot-io", help="Scratch directory (recreated)")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.dir, ignore_errors=True)
+    os.makedirs(args.dir)
+    source = os.path.join(args.dir, "source.csv")
+    start = time.perf_counter()
+    write_source(source, args.rows, args.dup_rate)
+    print(f"Wrote {args.rows} rows ({os.path.getsize(source) / 1e6:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+    engine = make_engine(f"sqlite:///{os.path.join(args.dir, 'bench.db')}")
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    results, counts = {}, {}
+    try:
+        await init_db(engine)
+        for label in ("import", "re-import"):
+            async with phase(label, results), sessions() as db:
+                with open(source, "rb") as f:
+                    _, counts[label] = await lead_io.import_file(db, f, "csv", label)
+        formats = ["csv"]
+        try:
+            lead_io.parquet_schema()
+            formats.append("parquet")
+        except RuntimeError as e:
+            print(f"Skipping Parquet: {e}")
+        for fmt in formats:
+            path = os.path.join(args.dir, f"export.{fmt}")
+            async with phase(f"export {fmt}", results):
+                counts[f"export {fmt}"] = {"rows": await export(path, fmt, session_factory=sessions)}
+            counts[f"export {fmt}"]["MB"] = round(os.path.getsize(path) / 1e6, 1)
+    finally:
+        await engine.dispose()
+
+    print(f"\n  {'phase':<16} {'seconds':>8} {'rows/s':>10} {'peak RSS':>9}")
+    for label, (seconds, peak) in results.items():
+        print(f"  {label:<16} {seconds:8.1f} {args.rows / seconds:10.0f} {peak:7.0f}MB   {counts[label]}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
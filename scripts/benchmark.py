@@ -0,0 +1,176 @@
+"""
+End-to-end pipeline benchmark on the seeded provider simulator.
+Each size runs one campaign against a fresh SQLite database (or --database-url)
+and reports leads/min, p50/p95 per stage and provider, and DB commit time.
+Simulated latencies are multiplied by --time-scale, so compare runs made with
+the same scale and seed.
+
+With --fake-providers the run uses the real API code paths against the
+in-process fake provider server instead of the mock functions.
+
+Usage: python -m scripts.benchmark [--sizes 100 1000 10000] [--time-scale 0.01] [--seed 1234]
+                                   [--fake-providers] [--json baseline.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app import metrics
+from app.config import get_settings
+from app.database import init_db, make_engine
+from app.services import screenshotter, simulator
+from app.services.pipeline import run_pipeline, poll_previews
+
+
+async def run_size(size: int, workdir: Path, database_url: str | None = None, quiet: bool = True) -> dict:
+    """Run the pipeline for `size` simulated leads and collect its timings."""
+    settings = get_settings()
+    workdir.mkdir(parents=True, exist_ok=True)
+    database_url = database_url or f"sqlite:///{workdir / f'bench-{size}.db'}"
+    engine = make_engine(database_url)
+    await init_db(engine)
+    db = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)()
+
+    # Keep simulated screenshots and rendered previews out of app/static
+    from app.services import preview_renderer
+    saved_dirs = screenshotter.SCREENSHOTS_DIR, preview_renderer.PREVIEWS_DIR
+    screenshotter.SCREENSHOTS_DIR = workdir / "screenshots"
+    preview_renderer.PREVIEWS_DIR = workdir / "previews"
+    screenshotter.SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    metrics.reset()
+    simulator.seed()
+
+    output = open(os.devnull, "w") if quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            start = time.perf_counter()
+            stats = await run_pipeline(
+                db, settings.default_niche, settings.default_location, size, f"Benchmark {size}",
+            )
+            pending = stats["previews_pending"]
+            while pending:
+                await asyncio.sleep(max(0.05, settings.preview_poll_interval * settings.simulate_time_scale))
+                counts = await poll_previews(db)
+                stats["emails_drafted"] += counts["ready"] + counts["failed"]
+                pending = counts["pending"]
+            elapsed = time.perf_counter() - start
+    finally:
+        screenshotter.SCREENSHOTS_DIR, preview_renderer.PREVIEWS_DIR = saved_dirs
+        await db.close()
+        await engine.dispose()
+        if quiet:
+            output.close()
+
+    return {
+        "leads": size,
+        "seconds": round(elapsed, 3),
+        "leads_per_min": round(size / elapsed * 60, 1) if elapsed else None,
+        "analyzed": stats["analyzed"],
+        "emails_drafted": stats["emails_drafted"],
+        "errors": len(stats["errors"]),
+        "stages": _quantiles(metrics.STAGE_SECONDS, metrics.STAGE_ERRORS, "stage"),
+        "providers": _quantiles(metrics.PROVIDER_SECONDS, metrics.PROVIDER_ERRORS, "provider"),
+        "db_commit": {
+            "n": metrics.DB_COMMIT_SECONDS.count(),
+            "p50_ms": _ms(metrics.DB_COMMIT_SECONDS.quantile(0.5)),
+            "p95_ms": _ms(metrics.DB_COMMIT_SECONDS.quantile(0.95)),
+            "total_s": round(metrics.DB_COMMIT_SECONDS.series[()][-1], 3) if metrics.DB_COMMIT_SECONDS.series else 0,
+        },
+    }
+
+
+def _quantiles(hist: metrics.Histogram, errors: metrics.Counter, label: str) -> dict:
+    return {
+        name: {
+            "n": hist.count(**{label: name}),
+            "errors": int(errors.get(**{label: name})),
+            "p50_ms": _ms(hist.quantile(0.5, **{label: name})),
+            "p95_ms": _ms(hist.quantile(0.95, **{label: name})),
+        }
+        for (name,) in sorted(hist.series)
+    }
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def _print_result(result: dict):
+    print(
+        f"{result['leads']} leads in {result['seconds']:.1f}s — {result['leads_per_min']} leads/min "
+        f"({result['analyzed']} analyzed, {result['emails_drafted']} drafts, {result['errors']} errors)"
+    )
+    for title, key in (("stage", "stages"), ("provider", "providers")):
+        for name, q in result[key].items():
+            print(f"  {title:<8} {name:<14} n={q['n']:<6} p50={q['p50_ms']:>9.2f}ms p95={q['p95_ms']:>9.2f}ms errors={q['errors']}")
+    commit = result["db_commit"]
+    if commit["n"]:
+        print(
+            f"  db       commit         n={commit['n']:<6} p50={commit['p50_ms']:>9.2f}ms "
+            f"p95={commit['p95_ms']:>9.2f}ms total={commit['total_s']:.2f}s"
+        )
+    print()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on simulated providers")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Lead counts to run")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Multiplier for simulated latencies")
+    parser.add_argument("--seed", type=int, default=None, help="Simulator seed (default: SIMULATE_SEED)")
+    parser.add_argument("--database-url", default=None, help="Benchmark against this database instead of temp SQLite")
+    parser.add_argument("--fake-providers", action="store_true", help="Exercise the real API paths against local fakes")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.mock_mode = True
+    settings.simulate = True
+    settings.simulate_time_scale = args.time_scale
+    if args.seed is not None:
+        settings.simulate_seed = args.seed
+
+    stop = None
+    if args.fake_providers:
+        from app.fake_providers import serve_in_thread, use_fake_providers
+
+        base_url, stop = serve_in_thread()
+        use_fake_providers(base_url)
+
+    mode = "fake providers (real API paths)" if args.fake_providers else "mock providers"
+    print(f"LeadPilot benchmark — {mode}, seed {settings.simulate_seed}, latency scale {args.time_scale}")
+    print(f"  Fused: {settings.fused_analysis_email}  Previews: {settings.preview_provider}\n")
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="leadpilot-bench-") as tmp:
+            for size in args.sizes:
+                result = await run_size(size, Path(tmp), args.database_url)
+                _print_result(result)
+                results.append(result)
+    finally:
+        if stop:
+            stop()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "seed": settings.simulate_seed,
+            "time_scale": args.time_scale,
+            "fake_providers": args.fake_providers,
+            "results": results,
+        }, indent=2))
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
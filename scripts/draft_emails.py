@@ -0,0 +1,40 @@
+"""
+Draft emails for a whole campaign in hybrid mode: one template per niche, then
+a short personalized opener per lead (see app/services/email_writer.py).
+Usage: python -m scripts.draft_emails --campaign-id 3 [--redraft]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, engine, AsyncSessionLocal
+from app.services.pipeline import draft_campaign
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Draft hybrid emails for a campaign")
+    parser.add_argument("--campaign-id", type=int, required=True, help="Campaign to draft emails for")
+    parser.add_argument("--redraft", action="store_true", help="Also rewrite existing unsent drafts")
+    args = parser.parse_args()
+
+    try:
+        await init_db()
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            counts = await draft_campaign(db, args.campaign_id, redraft=args.redraft)
+        seconds = time.perf_counter() - start
+        per_email = seconds / counts["drafted"] if counts["drafted"] else 0
+        print(f"Drafted {counts['drafted']} emails in {seconds:.1f}s ({per_email:.2f}s each)")
+        if counts["over_budget"]:
+            print(f"{counts['over_budget']} leads left undrafted: campaign or daily budget exhausted")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
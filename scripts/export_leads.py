@@ -0,0 +1,58 @@
+"""
+Export leads to CSV or Parquet, streamed in chunks (constant memory).
+Usage: python -m scripts.export_leads leads.csv
+       python -m scripts.export_leads leads.parquet --campaign 3   # format from the suffix
+       python -m scripts.export_leads - > leads.csv                 # CSV to stdout
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine, AsyncSessionLocal
+from app.services import lead_io
+
+
+async def export(path: str, fmt: str, campaign_id: int | None = None, session_factory=AsyncSessionLocal) -> int:
+    """Write the export to `path` ("-" for stdout); returns the number of leads."""
+    count = 0
+
+    async def counted(batches):
+        nonlocal count
+        async for rows in batches:
+            count += len(rows)
+            yield rows
+
+    out = sys.stdout.buffer if path == "-" else open(path, "wb")
+    try:
+        async with session_factory() as db:
+            async for chunk in lead_io.encode(counted(lead_io.export_batches(db, campaign_id)), fmt):
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return count
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Export LeadPilot leads")
+    parser.add_argument("output", help="Output file (.csv or .parquet), or - for CSV on stdout")
+    parser.add_argument("--format", choices=lead_io.FORMATS, default=None, help="Override the format")
+    parser.add_argument("--campaign", type=int, default=None, help="Only this campaign's leads")
+    args = parser.parse_args()
+
+    fmt = args.format or lead_io.format_for(args.output)
+    start = time.perf_counter()
+    try:
+        count = await export(args.output, fmt, args.campaign)
+    finally:
+        await engine.dispose()
+    print(f"Exported {count} leads as {fmt} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
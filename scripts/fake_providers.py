@@ -0,0 +1,35 @@
+"""
+Run the local fake provider server for offline load tests of the real API paths.
+Usage: python -m scripts.fake_providers [--port 8787] [--time-scale 1.0] [--no-failures]
+Then start the app or pipeline with the printed settings.
+"""
+
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from app.fake_providers import create_app, fake_provider_settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake Outscraper/ScreenshotOne/Anthropic/Lovable/Instantly APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--time-scale", type=float, default=None, help="Latency multiplier (default: SIMULATE_TIME_SCALE)")
+    parser.add_argument("--no-failures", action="store_true", help="Disable injected 5xx/429 responses")
+    args = parser.parse_args()
+
+    base_url = f"http://{args.host}:{args.port}"
+    print("Point LeadPilot at the fake providers with:")
+    for key, value in fake_provider_settings(base_url).items():
+        print(f"  {key.upper()}={value}")
+    print()
+
+    uvicorn.run(create_app(args.time_scale, not args.no_failures), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
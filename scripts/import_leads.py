@@ -0,0 +1,56 @@
+"""
+Import a lead list (CSV or Parquet) into a new campaign.
+Known businesses (same website or name in the same city) are skipped; the
+new leads are "scraped" and get processed by run_pipeline or the workers.
+Usage: python -m scripts.import_leads leads.csv --niche plumber --location "Utrecht, Netherlands"
+
+Columns are the export's (business_name, business_type, address, city, phone,
+email, website_url, google_maps_url, rating, reviews_count); only
+business_name is required, other columns are ignored.
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.database import init_db, engine, AsyncSessionLocal
+from app.services import lead_io
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Import leads into LeadPilot")
+    parser.add_argument("path", help="CSV or Parquet file")
+    parser.add_argument("--format", choices=lead_io.FORMATS, default=None, help="Override the format")
+    parser.add_argument("--name", default=None, help="Campaign name (default: Import <file name>)")
+    parser.add_argument("--niche", default="import", help="Business type for rows without one")
+    parser.add_argument("--location", default="", help="Campaign location")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Rows per transaction")
+    args = parser.parse_args()
+
+    if args.chunk_size:
+        get_settings().import_chunk_size = args.chunk_size
+    fmt = args.format or lead_io.format_for(args.path)
+
+    await init_db()
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            with open(args.path, "rb") as f:
+                campaign, counts = await lead_io.import_file(
+                    db, f, fmt, args.name or f"Import {os.path.basename(args.path)}", args.niche, args.location,
+                )
+    finally:
+        await engine.dispose()
+
+    print(f"Campaign {campaign.id} ({campaign.name}): {counts['inserted']} imported, "
+          f"{counts['duplicates']} duplicates skipped, {counts['invalid']} rows without a name "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
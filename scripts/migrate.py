@@ -0,0 +1,54 @@
+"""
+Apply or list schema migrations (app/migrations).
+Usage: python -m scripts.migrate                # apply all pending migrations
+       python -m scripts.migrate --status       # list applied and pending versions
+       python -m scripts.migrate --target 3     # stop after version 3
+       python -m scripts.migrate --vacuum       # also VACUUM SQLite to reclaim dropped space
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import migrations
+from app.config import get_settings
+from app.database import engine
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run LeadPilot schema migrations")
+    parser.add_argument("--status", action="store_true", help="Only list applied and pending migrations")
+    parser.add_argument("--target", type=int, default=None, help="Highest version to apply")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per backfill transaction")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM SQLite afterwards (locks the database)")
+    args = parser.parse_args()
+
+    if args.batch_size:
+        get_settings().migration_batch_size = args.batch_size
+
+    try:
+        if args.status:
+            done = await migrations.applied_versions(engine)
+            for migration in migrations.discover():
+                state = "applied" if migration.version in done else "pending"
+                print(f"  {migration.version:04d} {migration.name:<16} {state:<8} {migration.description}")
+            return
+
+        applied = await migrations.upgrade(engine, args.target)
+        print(f"Applied {len(applied)} migration(s)." if applied else "Database is up to date.")
+
+        if args.vacuum and engine.dialect.name == "sqlite":
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text("VACUUM"))
+            print("Vacuumed.")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
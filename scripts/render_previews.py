@@ -0,0 +1,54 @@
+"""
+Bulk-render local preview sites for leads.
+Usage: python -m scripts.render_previews [--campaign-id 3] [--force]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from app.database import init_db, engine, AsyncSessionLocal
+from app.models.lead import LEAD_DETAILS, Lead
+from app.services.preview_renderer import render_previews
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Pre-render local preview sites")
+    parser.add_argument("--campaign-id", type=int, default=None, help="Only leads of this campaign")
+    parser.add_argument("--force", action="store_true", help="Re-render leads that already have a preview")
+    args = parser.parse_args()
+
+    await init_db()
+
+    async with AsyncSessionLocal() as db:
+        query = select(Lead).where(Lead.site_score.isnot(None))
+        if args.campaign_id:
+            query = query.where(Lead.campaign_id == args.campaign_id)
+        if not args.force:
+            query = query.where(Lead.preview_status != "ready")
+        leads = (await db.scalars(query.options(*LEAD_DETAILS))).all()
+
+        start = time.perf_counter()
+        results = render_previews(leads)
+        elapsed = time.perf_counter() - start
+
+        for lead in leads:
+            result = results[lead.id]
+            lead.preview_url = result["preview_url"]
+            lead.preview_prompt = result["preview_prompt"]
+            lead.preview_status = result["preview_status"]
+            lead.preview_job_id = None
+        await db.commit()
+
+        ready = sum(1 for r in results.values() if r["preview_status"] == "ready")
+        print(f"Rendered {ready}/{len(leads)} previews in {elapsed * 1000:.0f} ms")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
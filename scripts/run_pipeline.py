@@ -1,6 +1,7 @@
 """
 CLI runner for the LeadPilot pipeline.
 Usage: python -m scripts.run_pipeline --niche "plumber" --city "Amsterdam"
+       python -m scripts.run_pipeline --enqueue-only   # scrape only; scripts/worker.py processes
 """
 
 import argparse
@@ -11,8 +12,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import get_settings
-from app.database import init_db, SessionLocal
-from app.services.pipeline import run_pipeline
+from app.database import init_db, engine, AsyncSessionLocal
+from app.models.campaign import Campaign
+from app import metrics
+from app.services import simulator
+from app.services.claude import parse_failure_rate
+from app.services.pipeline import run_pipeline, poll_previews, ingest
 
 
 async def main():
@@ -20,6 +25,7 @@ async def main():
     parser.add_argument("--niche", default=None, help="Business niche (e.g. plumber)")
     parser.add_argument("--city", default=None, help="City/location (e.g. Amsterdam)")
     parser.add_argument("--limit", type=int, default=20, help="Number of leads to scrape")
+    parser.add_argument("--enqueue-only", action="store_true", help="Only scrape; leave processing to workers")
     args = parser.parse_args()
 
     settings = get_settings()
@@ -31,24 +37,55 @@ async def main():
     print(f"  Location: {location}")
     print(f"  Limit:    {args.limit}")
     print(f"  Mock:     {settings.mock_mode}")
+    if settings.mock_mode and settings.simulate:
+        print(f"  Simulate: seed {settings.simulate_seed}, latency scale {settings.simulate_time_scale}")
+        simulator.seed()
     print()
 
-    init_db()
-    db = SessionLocal()
+    await init_db()
 
     try:
-        stats = await run_pipeline(db, niche, location, args.limit)
-        print(f"\nPipeline complete!")
-        print(f"  Scraped:  {stats['scraped']}")
-        print(f"  Analyzed: {stats['analyzed']}")
-        print(f"  Previews: {stats['previews_generated']}")
-        print(f"  Emails:   {stats['emails_drafted']}")
-        if stats["errors"]:
-            print(f"  Errors:   {len(stats['errors'])}")
-            for err in stats["errors"]:
-                print(f"    - {err}")
+        async with AsyncSessionLocal() as db:
+            if args.enqueue_only:
+                campaign = await ingest(db, niche, location, args.limit)
+                print(f"Queued {campaign.total_scraped} leads for campaign {campaign.id}.")
+                print("Process them with: python -m scripts.worker --processes 4")
+                return
+
+            stats = await run_pipeline(db, niche, location, args.limit)
+
+            # Wait for asynchronous preview builds and draft their emails
+            pending = stats["previews_pending"]
+            while pending:
+                print(f"  Waiting for {pending} preview(s)...")
+                await asyncio.sleep(settings.preview_poll_interval)
+                counts = await poll_previews(db)
+                stats["previews_generated"] += counts["ready"]
+                stats["emails_drafted"] += counts["ready"] + counts["failed"]
+                pending = counts["pending"]
+
+            print(f"\nPipeline complete!")
+            print(f"  Scraped:  {stats['scraped']}")
+            print(f"  Analyzed: {stats['analyzed']}")
+            print(f"  Previews: {stats['previews_generated']}")
+            print(f"  Emails:   {stats['emails_drafted']}")
+            campaign = await db.get(Campaign, stats["campaign_id"], populate_existing=True)
+            print(
+                f"  Tokens:   {campaign.input_tokens} input, {campaign.cached_input_tokens} cached input, "
+                f"{campaign.cache_write_tokens} cache write, {campaign.output_tokens} output"
+            )
+            print(f"  Cost:     EUR {campaign.cost_eur or 0:.4f}")
+            if metrics.CLAUDE_PARSES.total():
+                print(f"  Parsing:  {parse_failure_rate():.1%} first-pass failures")
+            if stats["errors"]:
+                print(f"  Errors:   {len(stats['errors'])}")
+                for err in stats["errors"]:
+                    print(f"    - {err}")
+            print("\nMetrics:")
+            for line in metrics.summary():
+                print(f"  {line}")
     finally:
-        db.close()
+        await engine.dispose()
 
 
 if __name__ == "__main__":
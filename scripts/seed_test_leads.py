@@ -10,16 +10,15 @@ import os
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import init_db, SessionLocal
+from app.database import init_db, engine, AsyncSessionLocal
 from app.services.pipeline import run_pipeline
 
 
 async def main():
     print("Initializing database...")
-    init_db()
+    await init_db()
 
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         print("Running mock pipeline to seed test leads...")
         stats = await run_pipeline(
             db,
@@ -37,8 +36,7 @@ async def main():
             print(f"  Errors:   {len(stats['errors'])}")
             for err in stats["errors"]:
                 print(f"    - {err}")
-    finally:
-        db.close()
+    await engine.dispose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+"""
+Check analyzed leads' websites for changes once and re-queue the changed ones
+(the web process's scheduler does this every SITE_SWEEP_MINUTES).
+Usage: python -m scripts.sweep_sites [--limit 100000]
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, engine, AsyncSessionLocal
+from app.services.site_sweep import sweep
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Sweep lead websites for changes")
+    parser.add_argument("--limit", type=int, default=None, help="Most sites to check (default SITE_SWEEP_LIMIT)")
+    args = parser.parse_args()
+
+    try:
+        await init_db()
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            counts = await sweep(db, args.limit)
+        seconds = time.perf_counter() - start
+        rate = counts["checked"] / seconds * 3600 if seconds else 0
+        print(
+            f"Checked {counts['checked']} sites in {seconds:.1f}s ({rate:,.0f}/hour): "
+            f"{counts['changed']} changed and re-queued, {counts['failed']} unreachable"
+        )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""
+Print the slowest leads' trace waterfalls from a trace file.
+Run the pipeline with TRACE_EXPORTER=file first.
+Usage: python -m scripts.trace_report [--file traces.jsonl] [--top 10]
+"""
+
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import get_settings
+from app.tracing import read_traces, slowest_leads, waterfall, attribute
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the slowest lead traces")
+    parser.add_argument("--file", default=None, help="OTLP/JSON lines trace file (default: TRACE_FILE)")
+    parser.add_argument("--top", type=int, default=10, help="Number of leads to show")
+    parser.add_argument("--campaign-id", type=int, default=None, help="Only leads of this campaign")
+    args = parser.parse_args()
+
+    path = args.file or get_settings().trace_file
+    if not os.path.exists(path):
+        print(f"No trace file at {path} — run the pipeline with TRACE_EXPORTER=file")
+        return
+
+    traces = read_traces(path)
+    if args.campaign_id:
+        traces = [t for t in traces if attribute(t[0], "campaign.id") == args.campaign_id]
+
+    slowest = slowest_leads(traces, args.top)
+    print(f"{len(slowest)} slowest of {len(traces)} traces in {path}\n")
+
+    for spans in slowest:
+        root = next(s for s in spans if "parentSpanId" not in s)
+        print(
+            f"Lead {attribute(root, 'lead.id')} "
+            f"(campaign {attribute(root, 'campaign.id')}, status {attribute(root, 'lead.status')})"
+        )
+        for line in waterfall(spans):
+            print(f"  {line}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Run pipeline workers that share the lead queue in the database.
+Start as many as you like, on one host or several pointing at the same DATABASE_URL.
+Usage: python -m scripts.worker [--processes 4] [--stages process poll] [--batch-size 10] [--drain]
+
+SIGTERM or Ctrl-C drains the workers (see app/drain.py): they finish the lead
+in progress, up to DRAIN_TIMEOUT, and exit; a second signal stops them at once.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.drain import install_signal_handlers
+from app.database import engine, init_db
+from app.worker import STAGES, default_owner, run_worker
+
+
+async def _run(owner: str, stages: tuple[str, ...], batch_size: int | None, drain: bool) -> dict:
+    install_signal_handlers()
+    return await run_worker(owner, stages, batch_size, stop_when_idle=drain)
+
+
+def _worker_main(index: int, stages: tuple[str, ...], batch_size: int | None, drain: bool):
+    owner = f"{default_owner()}-w{index}"
+    print(f"Worker {owner} started (stages: {', '.join(stages)})")
+    try:
+        stats = asyncio.run(_run(owner, stages, batch_size, drain))
+    except asyncio.CancelledError:
+        print(f"Worker {owner} stopped at the drain deadline; its unfinished leads will resume")
+        return
+    print(
+        f"Worker {owner} done: {stats['analyzed']} analyzed, {stats['previews_generated']} previews, "
+        f"{stats['emails_drafted']} drafts, {len(stats['errors'])} errors"
+    )
+
+
+async def _create_tables():
+    await init_db()
+    # Pooled connections belong to this event loop; workers start their own
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run LeadPilot pipeline workers")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Stages to work on")
+    parser.add_argument("--batch-size", type=int, default=None, help="Leads claimed per batch (default: WORKER_BATCH_SIZE)")
+    parser.add_argument("--drain", action="store_true", help="Exit once there is nothing left to process")
+    args = parser.parse_args()
+
+    asyncio.run(_create_tables())
+    stages = tuple(args.stages)
+
+    if args.processes == 1:
+        _worker_main(0, stages, args.batch_size, args.drain)
+        return
+
+    # spawn: children open their own database connections
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_worker_main, args=(i, stages, args.batch_size, args.drain))
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    # Pass a SIGTERM on to the workers (Ctrl-C reaches them directly) and wait for them to drain
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
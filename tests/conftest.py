@@ -0,0 +1,103 @@
+"""Shared test fixtures."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from app.services import claude
+
+
+class FakeStream:
+    """Stands in for anthropic's AsyncMessageStream, yielding text in small chunks."""
+
+    def __init__(self, text, usage):
+        self.text = text
+        self.current_message_snapshot = SimpleNamespace(usage=SimpleNamespace(**usage))
+        self.consumed = ""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for i in range(0, len(self.text), 7):
+            chunk = self.text[i:i + 7]
+            self.consumed += chunk
+            yield chunk
+
+
+class FakeMessages:
+    """Fake `client.messages` replying with the queued texts in order."""
+
+    def __init__(self, replies, usage):
+        self.replies = list(replies)
+        self.usage = usage
+        self.calls = []
+        self.streams = []
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        stream = FakeStream(self.replies.pop(0), self.usage)
+        self.streams.append(stream)
+        return stream
+
+
+@pytest.fixture
+def fake_claude(monkeypatch):
+    """Install a fake Claude client: fake_claude("reply 1", "reply 2", ...)."""
+    usage = {
+        "input_tokens": 40,
+        "cache_read_input_tokens": 900,
+        "cache_creation_input_tokens": 0,
+        "output_tokens": 1,
+    }
+
+    def install(*replies):
+        messages = FakeMessages(replies, usage)
+        monkeypatch.setattr(claude, "get_client", lambda: SimpleNamespace(messages=messages))
+        return messages
+
+    return install
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def database_url(request, tmp_path):
+    """A fresh SQLite file, and a local Postgres when TEST_POSTGRES_URL is set."""
+    if request.param == "sqlite":
+        return f"sqlite:///{tmp_path / 'test.db'}"
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    return url
+
+
+@pytest_asyncio.fixture
+async def session_factory(database_url):
+    """Async sessions on an empty, fully migrated database."""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app import migrations
+    from app.database import Base, init_db, make_engine
+    from app.models import lead, campaign, preview_template, email_template, runtime_config  # noqa: F401
+
+    engine = make_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS lead_search"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(migrations.metadata.drop_all)
+    await init_db(engine)
+    yield async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(session_factory):
+    async with session_factory() as db:
+        yield db
@@ -0,0 +1,164 @@
+"""Tests for campaign and daily spend budgets."""
+
+import asyncio
+
+import httpx
+import pytest
+from sqlalchemy import select
+from app import main
+from app.config import get_settings
+from app.database import get_db
+from app.models.campaign import Campaign, DailySpend
+from app.models.lead import Lead
+from app.services import analyzer, budgets, costs, pipeline, queue, screenshotter
+
+
+@pytest.fixture(autouse=True)
+def screenshots_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path / "screenshots")
+
+
+async def _campaign(db, budget_eur=None):
+    campaign = Campaign(name="Test", niche="plumber", location="Amsterdam", budget_eur=budget_eur)
+    db.add(campaign)
+    await db.commit()
+    return campaign
+
+
+async def _paid_call(bind, campaign_id, amount):
+    with budgets.scope(bind, campaign_id):
+        async with budgets.spend("anthropic"):
+            costs.charge("anthropic", amount)
+
+
+async def _totals(db, campaign_id):
+    db.expire_all()
+    campaign = await db.get(Campaign, campaign_id)
+    day = await db.get(DailySpend, budgets.today())
+    return round(campaign.cost_eur, 6), campaign.status, round(day.cost_eur, 6) if day else None
+
+
+@pytest.mark.asyncio
+async def test_spend_settles_to_the_actual_charge(db_session):
+    campaign = await _campaign(db_session, budget_eur=1.0)
+
+    await _paid_call(db_session.bind, campaign.id, 0.012)
+    await _paid_call(db_session.bind, campaign.id, 0.0)  # reserved, then refunded
+
+    assert await _totals(db_session, campaign.id) == (0.012, "active", 0.012)
+
+
+@pytest.mark.asyncio
+async def test_zero_budget_is_unlimited_and_still_accounted(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "daily_budget_eur", 1.0)
+    campaign = await _campaign(db_session, budget_eur=0.0)
+
+    await _paid_call(db_session.bind, campaign.id, 0.012)
+
+    assert await _totals(db_session, campaign.id) == (0.012, "active", 0.012)
+
+
+@pytest.mark.asyncio
+async def test_budget_route_normalizes_and_validates(session_factory):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    async with session_factory() as db:
+        campaign = await _campaign(db, budget_eur=5.0)
+    main.app.dependency_overrides[get_db] = override_db
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            url = f"/api/campaigns/{campaign.id}/budget"
+            for bad in ("nan", "inf", "-1", "abc"):
+                assert (await client.post(url, data={"budget_eur": bad})).status_code == 400
+            assert (await client.post(url, data={"budget_eur": "0"})).status_code == 303
+    finally:
+        main.app.dependency_overrides.clear()
+
+    async with session_factory() as db:
+        assert (await db.get(Campaign, campaign.id)).budget_eur is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_never_overshoot_the_budget(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "price_claude_call_estimate", 0.01)
+    async with session_factory() as db:
+        campaign = await _campaign(db, budget_eur=0.05)
+
+    results = await asyncio.gather(
+        *(_paid_call(db.bind, campaign.id, 0.01) for _ in range(12)), return_exceptions=True,
+    )
+
+    assert sum(r is None for r in results) == 5
+    assert all(isinstance(r, budgets.BudgetExceeded) for r in results if r is not None)
+    async with session_factory() as db:
+        assert await _totals(db, campaign.id) == (0.05, "paused", 0.05)
+
+
+@pytest.mark.asyncio
+async def test_daily_budget_stops_claims(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "daily_budget_eur", 0.1)
+    campaign = await _campaign(db_session)
+    db_session.add(Lead(campaign_id=campaign.id, business_name="Biz", business_type="plumber", status="scraped"))
+    await db_session.commit()
+
+    await _paid_call(db_session.bind, campaign.id, 0.08)
+    with pytest.raises(budgets.BudgetExceeded):
+        await _paid_call(db_session.bind, campaign.id, 0.03)
+
+    assert await _totals(db_session, campaign.id) == (0.08, "active", 0.08)
+    assert await queue.claim(db_session, "a", "process", 10) == []
+
+
+@pytest.mark.asyncio
+async def test_pipeline_pauses_campaign_over_budget(db_session, monkeypatch):
+    # Room for the screenshots, not for a Claude call
+    monkeypatch.setattr(get_settings(), "campaign_budget_eur", 0.02)
+    monkeypatch.setattr(get_settings(), "price_outscraper_call", 0.0)
+
+    stats = await pipeline.run_pipeline(db_session, "plumber", "Amsterdam, Netherlands", 5)
+
+    campaign = await db_session.get(Campaign, stats["campaign_id"], populate_existing=True)
+    assert (campaign.budget_eur, campaign.status) == (0.02, "paused")
+    leads = (await db_session.scalars(
+        select(Lead).where(Lead.campaign_id == campaign.id).execution_options(populate_existing=True)
+    )).all()
+    # Resumable: from the start, or after an analysis that was already paid for
+    stopped = [lead for lead in leads if lead.status in ("scraped", "interrupted")]
+    assert stats["over_budget"] == len(stopped) > 0
+    assert all(lead.lease_owner is None for lead in leads)
+
+
+@pytest.mark.asyncio
+async def test_lead_stopped_after_its_analysis_resumes_without_paying_again(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "prefilter_enabled", False)
+    monkeypatch.setattr(get_settings(), "min_score_threshold", 101)  # every site gets a preview
+    monkeypatch.setattr(get_settings(), "price_lovable_preview", 5.0)  # the preview doesn't fit
+    campaign = await _campaign(db_session, budget_eur=1.0)
+    db_session.add(Lead(campaign_id=campaign.id, business_name="Biz", business_type="plumber",
+                        website_url="http://biz.nl", status="scraped"))
+    await db_session.commit()
+    analyses = []
+    real_analyze = analyzer.analyze_website
+
+    async def analyze(*args, **kwargs):
+        analyses.append(args[0])
+        return await real_analyze(*args, **kwargs)
+
+    monkeypatch.setattr(analyzer, "analyze_website", analyze)
+
+    stats = await pipeline.process_campaign(db_session, campaign)
+    lead = await db_session.scalar(select(Lead).execution_options(populate_existing=True))
+    assert stats["over_budget"] == 1
+    assert (lead.status, lead.lease_owner) == ("interrupted", None) and lead.site_score is not None
+
+    monkeypatch.setattr(get_settings(), "price_lovable_preview", 0.5)
+    await db_session.refresh(campaign)
+    assert campaign.status == "paused"
+    campaign.status = "active"
+    await db_session.commit()
+    await pipeline.process_campaign(db_session, campaign)
+    lead = await db_session.scalar(select(Lead).execution_options(populate_existing=True))
+    assert lead.status == "email_drafted"
+    assert len(analyses) == 1
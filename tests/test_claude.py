@@ -0,0 +1,84 @@
+"""Tests for the shared Claude helpers, prompt caching and structured output parsing."""
+
+import json
+
+import pytest
+from app import metrics
+from app.services import analyzer, claude, email_writer
+from app.services.schemas import AnalysisResult, EmailDraft
+
+ANALYSIS = {"score": 30, "issues": ["a"], "summary": "s", "redesign_priorities": ["p"]}
+
+
+def test_cached_system_marks_block_ephemeral():
+    blocks = claude.cached_system("instructions")
+    assert blocks == [{"type": "text", "text": "instructions", "cache_control": {"type": "ephemeral"}}]
+
+
+def test_extract_json_tolerates_fences_and_prose():
+    text = 'Sure! Here it is:\n```json\n{"subject": "Hoi {naam}", "body": "x \\"}\\" y"}\n```\nHope this helps.'
+    assert claude.extract_json(text) == {"subject": "Hoi {naam}", "body": 'x "}" y'}
+
+
+def test_extract_json_rejects_missing_object():
+    with pytest.raises(ValueError):
+        claude.extract_json("no json here")
+    with pytest.raises(ValueError):
+        claude.extract_json('{"subject": "cut off')
+
+
+def test_scanner_detects_object_close_across_chunks():
+    scanner = claude.JsonObjectScanner()
+    assert not scanner.feed('```json\n{"a": {"b"')
+    assert not scanner.feed(': "}"}')
+    assert scanner.feed("}\ntrailing")
+
+
+@pytest.mark.asyncio
+async def test_complete_json_stops_stream_after_object(fake_claude):
+    messages = fake_claude(json.dumps(ANALYSIS) + "\n\nLet me know if you need anything else! " * 20)
+    data, usage = await claude.complete_json(system=[], content="x", schema=AnalysisResult)
+    assert data["score"] == 30
+    stream = messages.streams[0]
+    assert len(stream.consumed) < len(stream.text)  # trailing prose never read
+    assert len(messages.calls) == 1
+    assert usage["cached_input_tokens"] == 900
+
+
+@pytest.mark.asyncio
+async def test_complete_json_repairs_invalid_reply(fake_claude):
+    metrics.reset()
+    messages = fake_claude('{"subject": ""}', '{"subject": "Hoi", "body": "Tekst"}')
+    data, usage = await claude.complete_json(system=[], content="x", schema=EmailDraft)
+
+    assert data == {"subject": "Hoi", "body": "Tekst"}
+    assert len(messages.calls) == 2
+    assert messages.calls[1]["messages"][1]["role"] == "assistant"
+    assert usage["input_tokens"] == 80  # both calls accounted
+    assert metrics.CLAUDE_PARSES.get(result="repaired") == 1
+    assert metrics.RETRIES.get(provider="anthropic") == 1
+    assert claude.parse_failure_rate() == 1.0
+
+
+@pytest.mark.asyncio
+async def test_real_analyze_sends_cached_system_and_reports_usage(fake_claude):
+    messages = fake_claude("```json\n" + json.dumps(ANALYSIS) + "\n```")
+    result = await analyzer._real_analyze(1, "Bakkerij Korst", "bakery", "Delft", None)
+
+    call = messages.calls[0]
+    assert call["system"] is analyzer.ANALYSIS_SYSTEM_BLOCKS
+    assert "Bakkerij Korst" in call["messages"][0]["content"][-1]["text"]
+    assert "Bakkerij Korst" not in analyzer.ANALYSIS_SYSTEM
+    assert result["score"] == 30
+    assert result["usage"]["input_tokens"] == 40
+    assert result["usage"]["cached_input_tokens"] == 900
+
+
+@pytest.mark.asyncio
+async def test_real_email_keeps_usage_when_repair_fails(fake_claude):
+    fake_claude("not json", "still not json")
+    result = await email_writer._real_email(
+        "Bakkerij Korst", "bakery", "Delft", None, 30, ["a"], "https://x.nl",
+    )
+    assert "failed" in result["body"]
+    assert result["usage"]["cached_input_tokens"] == 1800
@@ -0,0 +1,201 @@
+"""Tests for graceful drain on shutdown."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy import select
+from app import drain, main
+from app.config import get_settings
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.services import analyzer, pipeline, prefilter, preview_generator, screenshotter
+from app.worker import run_worker
+
+
+@pytest.fixture(autouse=True)
+def undrained(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path / "screenshots")
+    monkeypatch.setattr(get_settings(), "prefilter_enabled", False)
+    drain.reset()
+    yield
+    drain.reset()
+
+
+async def _add_leads(session_factory, n):
+    async with session_factory() as db:
+        campaign = Campaign(name="Test", niche="plumber", location="Amsterdam")
+        db.add(campaign)
+        await db.commit()
+        db.add_all([
+            Lead(campaign_id=campaign.id, business_name=f"Biz {i}", business_type="plumber",
+                 website_url=f"http://biz{i}.nl", status="scraped")
+            for i in range(n)
+        ])
+        await db.commit()
+
+
+async def _leads(session_factory) -> list[Lead]:
+    async with session_factory() as db:
+        return (await db.scalars(select(Lead).order_by(Lead.id))).all()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_lead_resumes_after_its_analysis(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "min_score_threshold", 101)  # every site gets a preview
+    await _add_leads(session_factory, 1)
+
+    analyses = []
+    real_analyze, real_preview = analyzer.analyze_website, preview_generator.generate_preview
+
+    async def analyze(*args, **kwargs):
+        analyses.append(args[0])
+        return await real_analyze(*args, **kwargs)
+
+    submitting = asyncio.Event()
+
+    async def hanging_preview(*args, **kwargs):
+        submitting.set()
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(analyzer, "analyze_website", analyze)
+    monkeypatch.setattr(preview_generator, "generate_preview", hanging_preview)
+    worker = asyncio.create_task(run_worker("a", ("process",), session_factory=session_factory))
+    await submitting.wait()
+    worker.cancel()  # the drain deadline passes mid-preview
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+
+    [lead] = await _leads(session_factory)
+    assert (lead.status, lead.lease_owner) == ("interrupted", None)
+    assert lead.site_score is not None and lead.screenshot_url
+
+    monkeypatch.setattr(preview_generator, "generate_preview", real_preview)
+    await run_worker("b", ("process",), stop_when_idle=True, session_factory=session_factory)
+
+    [lead] = await _leads(session_factory)
+    assert lead.status == "email_drafted"
+    assert len(analyses) == 1  # the paid analysis wasn't repeated
+
+
+@pytest.mark.asyncio
+async def test_resumed_leads_skip_the_prefilter(session_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "prefilter_enabled", True)
+    monkeypatch.setattr(get_settings(), "min_score_threshold", 101)
+    await _add_leads(session_factory, 2)
+    async with session_factory() as db:
+        lead = await db.get(Lead, 1)
+        lead.status, lead.site_score, lead.preview_status = "interrupted", 30, "failed"
+        await db.commit()
+
+    checked = []
+    real_check = prefilter.check_sites
+
+    async def check_sites(urls):
+        checked.extend(urls)
+        return await real_check(urls)
+
+    monkeypatch.setattr(prefilter, "check_sites", check_sites)
+    await run_worker("a", ("process",), stop_when_idle=True, session_factory=session_factory)
+
+    assert checked == ["http://biz1.nl"]
+    leads = await _leads(session_factory)
+    assert leads[0].status == "email_drafted"
+
+
+@pytest.mark.asyncio
+async def test_worker_stops_between_leads_and_releases_the_rest(session_factory, monkeypatch):
+    await _add_leads(session_factory, 3)
+    real_process = pipeline.process_claimed_lead
+
+    async def process_then_drain(*args):
+        await real_process(*args)
+        drain.request()
+
+    monkeypatch.setattr(pipeline, "process_claimed_lead", process_then_drain)
+    await asyncio.wait_for(run_worker("a", ("process",), session_factory=session_factory), 10)
+
+    leads = await _leads(session_factory)
+    assert leads[0].status != "scraped"
+    assert [lead.status for lead in leads[1:]] == ["scraped", "scraped"]
+    assert all(lead.lease_owner is None for lead in leads)
+
+
+@pytest.mark.asyncio
+async def test_wait_cancels_jobs_past_the_deadline():
+    finished = []
+
+    @drain.tracked
+    async def job(seconds):
+        await asyncio.sleep(seconds)
+        finished.append(seconds)
+
+    jobs = [asyncio.create_task(job(0.01)), asyncio.create_task(job(60))]
+    await asyncio.sleep(0)
+    drain.request(timeout=0.1)
+
+    assert await drain.wait() == 1
+    assert finished == [0.01] and jobs[1].cancelled()
+    assert await job(0) is None and finished == [0.01]  # nothing starts while draining
+
+
+class Lifespan:
+    """Drives an ASGI app's lifespan protocol, as the server does at startup and shutdown."""
+
+    def __init__(self, app):
+        self.app = app
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+
+    async def _send(self, message):
+        await self.outbox.put(message)
+
+    async def start(self):
+        self.task = asyncio.create_task(self.app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}},
+                                                 self.inbox.get, self._send))
+        await self.inbox.put({"type": "lifespan.startup"})
+        assert (await self.outbox.get())["type"] == "lifespan.startup.complete"
+
+    async def shutdown(self):
+        await self.inbox.put({"type": "lifespan.shutdown"})
+        assert (await self.outbox.get())["type"] == "lifespan.shutdown.complete"
+        await self.task
+
+
+@pytest.mark.asyncio
+async def test_app_shutdown_drains_a_dashboard_run(session_factory, monkeypatch):
+    async def nothing():
+        pass
+
+    monkeypatch.setattr(main, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(main, "init_db", nothing)
+    monkeypatch.setattr(main, "_load_runtime_config", nothing)
+    monkeypatch.setattr(main, "init_scheduler", lambda: None)
+    monkeypatch.setattr(get_settings(), "batch_size", 2)
+
+    started = asyncio.Event()
+    real_process = pipeline._process_lead
+
+    async def slow_process(*args, **kwargs):
+        started.set()
+        await asyncio.sleep(0.2)
+        return await real_process(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "_process_lead", slow_process)
+    lifespan = Lifespan(main.app)
+    await lifespan.start()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        response = await client.post("/api/pipeline/run", data={"niche": "plumber", "limit": "10"})
+    assert response.status_code == 303  # the run carries on in the background
+    await asyncio.wait_for(started.wait(), 5)
+
+    start = time.perf_counter()
+    await lifespan.shutdown()
+
+    assert time.perf_counter() - start < 2  # the lead in progress, not the whole campaign
+    assert not main.pipeline_runs
+    leads = await _leads(session_factory)
+    assert len(leads) == 10
+    assert 1 <= sum(lead.status != "scraped" for lead in leads) <= 2
+    assert all(lead.lease_owner is None for lead in leads)
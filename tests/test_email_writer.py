@@ -1,6 +1,14 @@
 """Tests for the email writer service."""
 
+import json
+
 import pytest
+from sqlalchemy import func, select
+from app.config import get_settings
+from app.models.campaign import Campaign
+from app.models.email_template import EmailTemplate
+from app.models.lead import LEAD_DETAILS, Lead
+from app.services import email_writer, pipeline
 from app.services.email_writer import _mock_email
 
 
@@ -25,3 +33,95 @@ def test_mock_email_includes_preview_url():
     preview = "https://test-bedrijf.jouwdomein.nl"
     result = _mock_email("Test Bedrijf", "plumber", "Amsterdam", preview)
     assert preview in result["body"]
+
+
+@pytest.fixture
+def real_claude(fake_claude, monkeypatch):
+    monkeypatch.setattr(get_settings(), "mock_mode", False)
+    monkeypatch.setattr(get_settings(), "anthropic_api_key", "test-key")
+    return fake_claude
+
+
+TEMPLATE = {
+    "subject": "Een nieuwe site voor {business_name}?",
+    "body": "Hoi {business_name},\n\n{opener}\n\nKijk eens: {preview_url}",
+}
+
+
+@pytest.mark.asyncio
+async def test_hybrid_writes_the_niche_template_once(db_session, real_claude):
+    messages = real_claude(
+        json.dumps(TEMPLATE),
+        json.dumps({"opener": "Jullie reviews zijn top, maar de site laadt traag."}),
+        json.dumps({"opener": "Mooie foto's, alleen is het telefoonnummer lastig te vinden."}),
+    )
+
+    emails = []
+    for name in ("Loodgieter Jan", "Loodgieter Piet"):
+        template, _ = await email_writer.email_template(db_session, " Plumber")
+        emails.append(await email_writer.write_hybrid_email(
+            template, name, "plumber", "Delft", "https://example.nl", 30, ["Traag"], "https://preview.nl",
+        ))
+
+    assert len(messages.calls) == 3  # one template, two openers
+    assert [call["max_tokens"] for call in messages.calls[1:]] == [get_settings().email_opener_max_tokens] * 2
+    assert emails[0]["subject"] == "Een nieuwe site voor Loodgieter Jan?"
+    assert emails[1]["body"] == (
+        "Hoi Loodgieter Piet,\n\nMooie foto's, alleen is het telefoonnummer lastig te vinden.\n\n"
+        "Kijk eens: https://preview.nl"
+    )
+    assert emails[1]["usage"]["input_tokens"] == 40
+
+
+@pytest.mark.asyncio
+async def test_hybrid_falls_back_without_placeholders_or_opener(db_session, real_claude):
+    real_claude(json.dumps({"subject": "Hoi", "body": "Geen plek voor een opener"}), "geen json", "nog steeds niet")
+
+    template, _ = await email_writer.email_template(db_session, "florist")
+    email = await email_writer.write_hybrid_email(
+        template, "Bloemen Bep", "florist", "Delft", None, None, None, "https://preview.nl",
+    )
+
+    assert template.body == email_writer.DEFAULT_TEMPLATE["body"]
+    assert "Ik kwam de website van Bloemen Bep tegen" in email["body"]
+    assert "https://preview.nl" in email["body"]
+    assert await db_session.scalar(select(func.count(EmailTemplate.id))) == 0
+
+
+@pytest.mark.asyncio
+async def test_hybrid_without_a_preview_writes_a_full_draft(db_session, real_claude):
+    messages = real_claude(
+        json.dumps(TEMPLATE), json.dumps({"subject": "Hoi", "body": "Jullie site kan beter, zullen we bellen?"}),
+    )
+
+    template, _ = await email_writer.email_template(db_session, "florist")
+    email = await email_writer.write_hybrid_email(
+        template, "Bloemen Bep", "florist", "Delft", None, None, None, None,
+    )
+
+    assert email["body"] == "Jullie site kan beter, zullen we bellen?"
+    assert messages.calls[-1]["system"] == email_writer.EMAIL_SYSTEM_BLOCKS
+
+
+@pytest.mark.asyncio
+async def test_draft_campaign_drafts_settled_leads(db_session):
+    campaign = Campaign(name="Test", niche="plumber", location="Delft")
+    db_session.add(campaign)
+    await db_session.commit()
+    for i, preview_status in enumerate(("ready", "failed", "generating", None)):
+        db_session.add(Lead(
+            campaign_id=campaign.id, business_name=f"Biz {i}", business_type="plumber", city="Delft",
+            status="analyzed", preview_status=preview_status, preview_url=f"https://preview.nl/{i}",
+        ))
+    await db_session.commit()
+
+    counts = await pipeline.draft_campaign(db_session, campaign.id)
+
+    assert counts == {"drafted": 2, "over_budget": 0}
+    leads = (await db_session.scalars(
+        select(Lead).options(*LEAD_DETAILS).order_by(Lead.id).execution_options(populate_existing=True)
+    )).all()
+    assert [lead.status for lead in leads] == ["email_drafted", "email_drafted", "analyzed", "analyzed"]
+    assert "https://preview.nl/0" in leads[0].email_body
+    assert "https://preview.nl/1" not in leads[1].email_body  # its preview failed: a full draft
+    assert await db_session.scalar(select(func.count(EmailTemplate.id))) == 1
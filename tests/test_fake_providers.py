@@ -0,0 +1,105 @@
+"""Tests for the fake provider server, driving the real-mode service code."""
+
+import pytest
+from app.config import get_settings
+from app.fake_providers import create_app, serve_in_thread, fake_provider_settings
+from app.services import (
+    claude, scraper, prefilter, screenshotter, analyzer, preview_generator, email_sender, email_writer,
+)
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    base_url, stop = serve_in_thread(create_app(time_scale=0.0, inject_failures=False))
+    yield base_url
+    stop()
+
+
+@pytest.fixture
+def real_mode(fake_server, monkeypatch):
+    settings = get_settings()
+    for key, value in fake_provider_settings(fake_server).items():
+        monkeypatch.setattr(settings, key, value)
+    claude.get_client.cache_clear()
+    yield fake_server
+    claude.get_client.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_scrape_and_prefilter_hit_fake_sites(real_mode):
+    businesses = await scraper.scrape_businesses("plumber", "Amsterdam, Netherlands", 6)
+
+    assert len(businesses) == 6
+    sites = [b["website_url"] for b in businesses if b["website_url"]]
+    assert sites and all(s.startswith(real_mode) for s in sites)
+
+    checks = await prefilter.check_sites(sites)
+    assert all(c["score"] is not None for c in checks.values())
+    assert all("no_https" in c["signals"] for c in checks.values())
+
+
+@pytest.mark.asyncio
+async def test_screenshot_written(real_mode, tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path)
+
+    path = await screenshotter.capture_screenshot(3, "http://example.nl")
+
+    assert path == "/static/screenshots/3.png"
+    assert (tmp_path / "3.png").read_bytes().startswith(b"\x89PNG")
+
+
+@pytest.mark.asyncio
+async def test_claude_stream_through_sdk(real_mode):
+    first = await analyzer.analyze_website(1, "Bakkerij Test", "bakery", "Utrecht", None)
+    second = await analyzer.analyze_website(2, "Bakkerij Twee", "bakery", "Utrecht", None)
+
+    assert 1 <= first["score"] <= 100
+    assert first["issues"]
+    assert first["usage"]["cache_write_tokens"] > 0
+    assert second["usage"]["cached_input_tokens"] > 0
+
+
+@pytest.mark.asyncio
+async def test_claude_replies_fit_the_email_request(real_mode):
+    lead = ("Bakkerij Test", "bakery", "Utrecht", "http://bakkerij.nl", 30, ["Traag"])
+    full = await email_writer.write_email(*lead, "https://preview.nl")
+    opener, usage = await email_writer.write_opener(*lead)
+
+    assert "https://preview.nl" in full["body"]
+    assert opener and len(opener) < 200
+    assert usage["output_tokens"] * 2 < full["usage"]["output_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_lovable_submit_then_poll(real_mode):
+    submitted = await preview_generator.generate_preview(
+        1, "Bakkerij Test", "bakery", "Utrecht", None, ["Outdated design"],
+    )
+    assert submitted["preview_status"] == "generating"
+
+    polled = await preview_generator.check_preview(submitted["preview_job_id"])
+    assert polled["preview_status"] == "ready"
+    assert polled["preview_url"].startswith("https://proj_")
+
+
+@pytest.mark.asyncio
+async def test_instantly_send(real_mode):
+    result = await email_sender.send_email("info@example.nl", "Hallo", "Body", 1)
+    assert result["status"] == "sent"
+    assert result["email_id"]
+
+
+@pytest.mark.asyncio
+async def test_injected_rate_limit(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "simulate_profiles", '{"instantly": {"rate_limit_rate": 1.0}}')
+    base_url, stop = serve_in_thread(create_app(time_scale=0.0))
+    try:
+        for key, value in fake_provider_settings(base_url).items():
+            monkeypatch.setattr(settings, key, value)
+        result = await email_sender.send_email("info@example.nl", "Hallo", "Body", 1)
+    finally:
+        stop()
+
+    assert result["status"] == "failed"
+    assert "429" in result["error"]
@@ -0,0 +1,79 @@
+"""Tests for the single-call analysis + email writer."""
+
+import json
+
+import httpx
+import pytest
+from app import main
+from app.database import get_db
+from app.models.lead import Lead
+from app.services import email_sender, fused_writer
+from app.services.fused_writer import PREVIEW_PLACEHOLDER, _mock_analyze_and_write, fill_preview_url
+
+
+def test_mock_returns_analysis_and_placeholder_email():
+    result = _mock_analyze_and_write("Test Bedrijf", "plumber", "Amsterdam")
+    assert 1 <= result["score"] <= 100
+    assert PREVIEW_PLACEHOLDER in result["email"]["body"]
+
+
+def test_fill_preview_url_replaces_placeholder():
+    email = {"subject": "Hoi", "body": f"Kijk hier: {PREVIEW_PLACEHOLDER}"}
+    filled = fill_preview_url(email, "https://preview.example.com")
+    assert filled["body"] == "Kijk hier: https://preview.example.com"
+
+
+@pytest.mark.asyncio
+async def test_real_call_validates_schema(fake_claude):
+    fake_claude(json.dumps({
+        "score": 40,
+        "issues": ["Geen HTTPS"],
+        "summary": "Verouderd",
+        "redesign_priorities": ["mobile-first layout"],
+        "email": {"subject": "Hoi", "body": f"Bekijk {PREVIEW_PLACEHOLDER}"},
+    }))
+    result = await fused_writer._real_analyze_and_write(1, "X", "plumber", "Delft", None, None)
+    assert result["score"] == 40
+    assert result["email"]["subject"] == "Hoi"
+    assert result["usage"]["input_tokens"] == 40
+
+
+@pytest.mark.asyncio
+async def test_real_call_invalid_schema_signals_fallback(fake_claude):
+    fake_claude(json.dumps({"score": 400, "issues": []}), "no json either")
+    result = await fused_writer._real_analyze_and_write(1, "X", "plumber", "Delft", None, None)
+    assert "email" not in result
+    assert result["usage"]["input_tokens"] == 80  # original call + repair
+
+
+@pytest.mark.asyncio
+async def test_send_refuses_a_pending_fused_draft(session_factory, monkeypatch):
+    async with session_factory() as db:
+        pending = Lead(business_name="Wacht", business_type="plumber", status="analyzed",
+                       preview_status="generating", email_status="pending",
+                       email_subject="Hoi", email_body=f"Bekijk {PREVIEW_PLACEHOLDER}")
+        ready = Lead(business_name="Klaar", business_type="plumber", status="email_drafted",
+                     preview_status="ready", email_status="draft",
+                     email_subject="Hoi", email_body="Bekijk https://klaar.preview.nl")
+        db.add_all([pending, ready])
+        await db.commit()
+
+    sent = []
+
+    async def send_email(to_email, subject, body, lead_id):
+        sent.append(body)
+        return {"status": "sent"}
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(email_sender, "send_email", send_email)
+    main.app.dependency_overrides[get_db] = override_db
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            assert (await client.post(f"/api/leads/{pending.id}/send")).status_code == 400
+            assert (await client.post(f"/api/leads/{ready.id}/send")).status_code == 303
+    finally:
+        main.app.dependency_overrides.clear()
+    assert sent == ["Bekijk https://klaar.preview.nl"]
@@ -0,0 +1,72 @@
+"""Tests for the cached lead detail page and its conditional responses."""
+
+import httpx
+import pytest
+import pytest_asyncio
+from app import main, metrics
+from app.database import get_db
+from app.models.lead import Lead
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    main.app.dependency_overrides[get_db] = override_db
+    main.detail_cache.clear()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    main.app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def lead_id(session_factory):
+    async with session_factory() as db:
+        lead = Lead(business_name="Bakkerij Jansen", business_type="bakery", status="email_drafted")
+        lead.site_issues = ["No SSL"]
+        lead.email_subject = "Hello"
+        lead.email_body = "First draft"
+        db.add(lead)
+        await db.commit()
+        return lead.id
+
+
+def _hits():
+    return metrics.CACHE_HITS.values.get(("lead_detail",), 0)
+
+
+@pytest.mark.asyncio
+async def test_repeat_views_are_served_from_cache_and_revalidated(client, lead_id):
+    first = await client.get(f"/leads/{lead_id}")
+    assert first.status_code == 200
+    assert "No SSL" in first.text
+    hits = _hits()
+
+    second = await client.get(f"/leads/{lead_id}")
+    assert second.text == first.text
+    assert _hits() == hits + 1
+
+    etag = first.headers["etag"]
+    assert (await client.get(f"/leads/{lead_id}", headers={"If-None-Match": etag})).status_code == 304
+    since = first.headers["last-modified"]
+    assert (await client.get(f"/leads/{lead_id}", headers={"If-Modified-Since": since})).status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_editing_the_draft_changes_the_version(client, lead_id):
+    first = await client.get(f"/leads/{lead_id}")
+
+    await client.post(f"/api/leads/{lead_id}/update-email", data={"subject": "Hello", "body": "Second draft"})
+
+    response = await client.get(f"/leads/{lead_id}", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert "Second draft" in response.text
+
+
+@pytest.mark.asyncio
+async def test_missing_lead_is_404(client):
+    assert (await client.get("/leads/999")).status_code == 404
@@ -0,0 +1,48 @@
+"""Tests for the lead side tables (analysis, email draft, preview prompt)."""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import InvalidRequestError
+from app.models.lead import LEAD_DETAILS, Lead, LeadAnalysis, LeadEmail
+from app.services import pipeline, screenshotter
+
+
+@pytest.fixture(autouse=True)
+def screenshots_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path / "screenshots")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_writes_side_tables(db_session):
+    stats = await pipeline.run_pipeline(db_session, "plumber", "Amsterdam, Netherlands", 5)
+    assert stats["emails_drafted"]
+
+    analyses = (await db_session.scalars(select(LeadAnalysis))).all()
+    assert len(analyses) == 5
+    assert all(isinstance(a.issues, list) for a in analyses)
+    drafts = (await db_session.scalars(select(LeadEmail).where(LeadEmail.body.isnot(None)))).all()
+    assert len(drafts) == stats["emails_drafted"]
+
+
+@pytest.mark.asyncio
+async def test_details_are_never_lazy_loaded(db_session):
+    await pipeline.run_pipeline(db_session, "plumber", "Amsterdam, Netherlands", 2)
+    db_session.expunge_all()
+
+    lead = (await db_session.scalars(select(Lead).limit(1))).one()
+    with pytest.raises(InvalidRequestError):
+        lead.email_body
+
+    lead = await db_session.get(Lead, lead.id, options=LEAD_DETAILS, populate_existing=True)
+    assert lead.analysis_summary
+
+
+@pytest.mark.asyncio
+async def test_reprocess_updates_existing_details(db_session):
+    await pipeline.run_pipeline(db_session, "plumber", "Amsterdam, Netherlands", 1)
+    lead_id = await db_session.scalar(select(Lead.id))
+
+    result = await pipeline.process_single_lead(db_session, lead_id)
+
+    assert result["status"] == "ok"
+    assert await db_session.scalar(select(func.count()).select_from(LeadAnalysis)) == 1
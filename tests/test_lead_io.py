@@ -0,0 +1,117 @@
+"""Tests for bulk lead import/export and ingestion dedup."""
+
+import io
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from app import main
+from app.config import get_settings
+from app.database import get_db
+from app.models.lead import LEAD_DETAILS, Lead
+from app.services import lead_io, pipeline, priority
+
+CSV = (
+    "business_name,city,website_url,rating,extra\n"
+    "Loodgieter Jansen,Utrecht,https://www.jansen.nl/contact,4.5,x\n"
+    "Jansen Loodgieters,Utrecht,http://jansen.nl,,x\n"  # same website and city
+    "Jansen Loodgieters,Amersfoort,jansen.nl,,x\n"  # another branch
+    "Bakker Bart,Delft,,not a number,x\n"
+    ",Delft,,,x\n"
+)
+
+
+def test_dedup_key_normalizes_website_or_name():
+    key = lead_io.dedup_key("Jansen", "Utrecht", "https://www.Jansen.nl/contact")
+    assert key == lead_io.dedup_key("Other name", " utrecht ", "jansen.nl") == "web:jansen.nl|utrecht"
+    assert lead_io.dedup_key("Bakker  Bart!", "Delft") == "name:bakker bart|delft"
+    assert lead_io.dedup_key("", "Delft") is None
+
+
+def test_non_finite_numbers_import_as_missing():
+    row = lead_io.lead_row({"business_name": "X", "rating": "NaN", "reviews_count": "inf"}, 1)
+    assert row["rating"] is None and row["reviews_count"] is None
+    assert lead_io.lead_row({"business_name": "X", "rating": float("-inf"), "reviews_count": 10**400}, 1)["rating"] is None
+    assert priority.score(row["rating"], row["reviews_count"], None, "x") == 40
+
+
+@pytest.mark.asyncio
+async def test_import_skips_known_businesses_in_chunks(db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "import_chunk_size", 2)
+    _, counts = await lead_io.import_file(db_session, io.BytesIO(CSV.encode()), "csv", "List", "plumber")
+    assert counts == {"inserted": 3, "duplicates": 1, "invalid": 1}
+
+    campaign, counts = await lead_io.import_file(db_session, io.BytesIO(CSV.encode()), "csv", "Again")
+    assert counts == {"inserted": 0, "duplicates": 4, "invalid": 1}
+    assert campaign.total_scraped == 0
+
+    bart = await db_session.scalar(select(Lead).where(Lead.business_name == "Bakker Bart"))
+    assert (bart.status, bart.business_type, bart.rating) == ("scraped", "plumber", None)
+
+
+@pytest.mark.asyncio
+async def test_rescraping_a_location_adds_no_duplicates(db_session):
+    await pipeline.ingest(db_session, "plumber", "Amsterdam, Netherlands", 5)
+    campaign = await pipeline.ingest(db_session, "plumber", "Amsterdam, Netherlands", 8)
+
+    assert campaign.total_scraped == 3
+    assert await db_session.scalar(select(func.count(Lead.id))) == 8
+
+
+async def _export(db, fmt, chunk_size):
+    chunks = [c async for c in lead_io.encode(lead_io.export_batches(db, chunk_size=chunk_size), fmt)]
+    return b"".join(chunks), len(chunks)
+
+
+@pytest.mark.asyncio
+async def test_csv_export_streams_in_chunks(db_session):
+    await lead_io.import_file(db_session, io.BytesIO(CSV.encode()), "csv", "List")
+    lead = await db_session.scalar(select(Lead).where(Lead.city == "Delft").options(*LEAD_DETAILS))
+    lead.site_issues = ["No SSL", "Slow"]
+    await db_session.commit()
+
+    data, chunks = await _export(db_session, "csv", chunk_size=2)
+
+    assert chunks == 2
+    rows = list(lead_io.read_records(io.BytesIO(data), "csv"))
+    assert [r["business_name"] for r in rows] == ["Loodgieter Jansen", "Jansen Loodgieters", "Bakker Bart"]
+    assert rows[2]["site_issues"] == "No SSL; Slow"
+
+
+@pytest.mark.asyncio
+async def test_parquet_round_trip(db_session):
+    pytest.importorskip("pyarrow")
+    await lead_io.import_file(db_session, io.BytesIO(CSV.encode()), "csv", "List")
+
+    data, chunks = await _export(db_session, "parquet", chunk_size=2)
+    rows = list(lead_io.read_records(io.BytesIO(data), "parquet"))
+
+    assert chunks == 3  # two row groups and the footer
+    assert [r["business_name"] for r in rows] == ["Loodgieter Jansen", "Jansen Loodgieters", "Bakker Bart"]
+    assert rows[0]["rating"] == 4.5
+
+
+@pytest_asyncio.fixture
+async def client(session_factory, monkeypatch):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    main.app.dependency_overrides[get_db] = override_db
+    monkeypatch.setattr(main, "AsyncSessionLocal", session_factory)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    main.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_import_and_export_endpoints(client):
+    response = await client.post("/api/leads/import", files={"file": ("list.csv", CSV.encode(), "text/csv")})
+    assert response.status_code == 303
+
+    response = await client.get("/api/leads/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    assert response.text.count("\n") == 4  # header and three leads
@@ -0,0 +1,59 @@
+"""Tests for the metrics layer."""
+
+import time
+
+import pytest
+from app import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_stage_records_latency_and_errors():
+    with metrics.stage("screenshot"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.stage("screenshot"):
+            raise RuntimeError("boom")
+
+    assert metrics.STAGE_SECONDS.count(stage="screenshot") == 2
+    assert metrics.STAGE_ERRORS.get(stage="screenshot") == 1
+
+
+def test_quantile_from_buckets():
+    for _ in range(90):
+        metrics.PROVIDER_SECONDS.observe(0.02, provider="lovable")
+    for _ in range(10):
+        metrics.PROVIDER_SECONDS.observe(3.0, provider="lovable")
+
+    assert 0.01 <= metrics.PROVIDER_SECONDS.quantile(0.5, provider="lovable") <= 0.025
+    assert 2.5 <= metrics.PROVIDER_SECONDS.quantile(0.95, provider="lovable") <= 5
+
+
+def test_render_prometheus_format():
+    metrics.PROVIDER_CALLS.inc(provider="anthropic")
+    metrics.PROVIDER_SECONDS.observe(0.3, provider="anthropic")
+    text = metrics.render()
+
+    assert '# TYPE leadpilot_provider_calls_total counter' in text
+    assert 'leadpilot_provider_calls_total{provider="anthropic"} 1' in text
+    assert 'leadpilot_provider_seconds_bucket{provider="anthropic",le="0.5"} 1' in text
+    assert 'leadpilot_provider_seconds_bucket{provider="anthropic",le="+Inf"} 1' in text
+    assert 'leadpilot_provider_seconds_count{provider="anthropic"} 1' in text
+
+
+def test_hot_path_overhead_is_negligible():
+    n = 20_000
+    start = time.perf_counter()
+    for _ in range(n):
+        with metrics.stage("bench"):
+            pass
+        metrics.PROVIDER_CALLS.inc(provider="bench")
+    per_op = (time.perf_counter() - start) / n
+
+    # A single Claude or ScreenshotOne call is 100ms+; a few µs is noise
+    assert per_op < 20e-6, f"{per_op * 1e6:.1f} µs per stage + counter"
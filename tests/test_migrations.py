@@ -0,0 +1,129 @@
+"""Tests for the schema migration runner and its migrations."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app import migrations
+from app.config import get_settings
+from app.database import Base, make_engine
+from app.migrations.helpers import backfill
+from app.models.lead import LEAD_DETAILS, Lead
+from app.models.campaign import Campaign
+
+# The schema as create_all built it before migrations existed
+LEGACY_SCHEMA = [
+    """CREATE TABLE campaigns (
+        id INTEGER PRIMARY KEY, name VARCHAR NOT NULL, niche VARCHAR NOT NULL, location VARCHAR NOT NULL,
+        total_scraped INTEGER, total_qualified INTEGER, total_emailed INTEGER, total_replied INTEGER,
+        total_closed INTEGER, status VARCHAR, created_at TIMESTAMP)""",
+    """CREATE TABLE leads (
+        id INTEGER PRIMARY KEY, campaign_id INTEGER REFERENCES campaigns (id),
+        business_name VARCHAR NOT NULL, business_type VARCHAR NOT NULL, address VARCHAR, city VARCHAR,
+        phone VARCHAR, email VARCHAR, website_url VARCHAR, google_maps_url VARCHAR, rating FLOAT,
+        reviews_count INTEGER, screenshot_url VARCHAR, site_score INTEGER, site_issues TEXT,
+        analysis_summary TEXT, preview_url VARCHAR, preview_prompt TEXT, preview_status VARCHAR,
+        email_subject VARCHAR, email_body TEXT, email_status VARCHAR, email_sent_at TIMESTAMP,
+        status VARCHAR, created_at TIMESTAMP, updated_at TIMESTAMP)""",
+    "CREATE INDEX ix_campaigns_id ON campaigns (id)",
+    "CREATE INDEX ix_leads_id ON leads (id)",
+]
+
+
+@pytest_asyncio.fixture
+async def engine(database_url):
+    from app.models import lead, campaign, preview_template, email_template, runtime_config  # noqa: F401
+
+    engine = make_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS lead_search"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(migrations.metadata.drop_all)
+    yield engine
+    await engine.dispose()
+
+
+def _schema(sync_conn) -> dict[str, set[str]]:
+    inspector = inspect(sync_conn)
+    return {
+        table: {c["name"] for c in inspector.get_columns(table)}
+        | {f"index:{i['name']}" for i in inspector.get_indexes(table)}
+        for table in Base.metadata.tables
+    }
+
+
+def test_versions_are_unique_and_ordered():
+    versions = [m.version for m in migrations.discover()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+@pytest.mark.asyncio
+async def test_fresh_database_is_fully_migrated_once(engine):
+    applied = await migrations.upgrade(engine)
+
+    assert [m.version for m in applied] == [m.version for m in migrations.discover()]
+    assert await migrations.upgrade(engine) == []
+    assert await migrations.pending(engine) == []
+
+
+@pytest.mark.asyncio
+async def test_legacy_database_matches_fresh_schema(engine, tmp_path, monkeypatch):
+    async with engine.begin() as conn:
+        for ddl in LEGACY_SCHEMA:
+            await conn.execute(text(ddl))
+        await conn.execute(text("INSERT INTO campaigns (id, name, niche, location) VALUES (1, 'Old', 'plumber', 'Delft')"))
+        for i in range(1, 8):
+            await conn.execute(text(
+                "INSERT INTO leads (id, campaign_id, business_name, business_type, status, site_issues, "
+                "analysis_summary, email_subject, email_body, preview_prompt) VALUES "
+                f"({i}, 1, 'Biz {i}', 'plumber', 'email_drafted', '[\"No SSL\"]', 'Old site', 'Hi', 'Body {i}', "
+                f"{'NULL' if i % 2 else repr('prompt')})"
+            ))
+
+    monkeypatch.setattr(get_settings(), "migration_batch_size", 3)  # several backfill batches
+    await migrations.upgrade(engine)
+
+    async with async_sessionmaker(bind=engine)() as db:
+        lead = await db.get(Lead, 6, options=LEAD_DETAILS)
+        assert lead.site_issues == ["No SSL"]
+        assert (lead.email_subject, lead.email_body, lead.preview_prompt) == ("Hi", "Body 6", "prompt")
+        assert lead.cost_eur == 0
+        assert (await db.get(Lead, 5, options=LEAD_DETAILS)).preview is None
+        assert (await db.get(Campaign, 1)).input_tokens == 0
+        assert await db.scalar(text("SELECT count(*) FROM lead_search")) == 7
+
+    # Same tables, columns and indexes as a database created by the migrations from scratch
+    fresh = make_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    await migrations.upgrade(fresh)
+    async with fresh.connect() as conn:
+        expected = await conn.run_sync(_schema)
+    await fresh.dispose()
+    async with engine.connect() as conn:
+        assert await conn.run_sync(_schema) == expected
+
+
+@pytest.mark.asyncio
+async def test_upgrade_stops_at_target(engine):
+    applied = await migrations.upgrade(engine, target=2)
+
+    assert [m.version for m in applied] == [1, 2]
+    assert [m.version for m in await migrations.pending(engine)][0] == 3
+
+
+@pytest.mark.asyncio
+async def test_backfill_covers_sparse_ids_in_batches(engine):
+    await migrations.upgrade(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO campaigns (id, name, niche, location) VALUES (1, 'C', 'plumber', 'Delft')"))
+        for i in (1, 2, 5, 9, 10, 23):
+            await conn.execute(text(
+                f"INSERT INTO leads (id, campaign_id, business_name, business_type, city) VALUES ({i}, 1, 'B', 'p', '')"
+            ))
+
+    changed = await backfill(
+        engine, "UPDATE leads SET city = 'Delft' WHERE city = '' AND id >= :lo AND id < :hi", batch_size=4,
+    )
+
+    assert changed == 6
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("SELECT count(*) FROM leads WHERE city = 'Delft'"))).scalar() == 6
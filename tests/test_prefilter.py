@@ -0,0 +1,118 @@
+"""Tests for the pre-filter service."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from app.config import get_settings
+from app.services.prefilter import _mock_check, _real_check, clearly_modern, score_html, site_changed
+
+MODERN_PAGE = b"""<html><head>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+</head><body><a href="tel:+31201234567">Bel ons</a>
+<footer>&copy; 2099 Modern BV</footer></body></html>"""
+
+OLD_PAGE = b"""<html><head><title>Welkom</title></head>
+<body><table><tr><td>Bel 020-1234567</td></tr></table>
+<font size=1>Copyright 2009-2011 Oud BV</font></body></html>"""
+
+PAGES = {"/modern": MODERN_PAGE, "/old": OLD_PAGE}
+ETAG = '"v2"'
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_real_check_modern_site(fixture_server):
+    async with httpx.AsyncClient() as client:
+        result = await _real_check(client, f"{fixture_server}/modern")
+    # Fixture server is plain HTTP, so only the HTTPS signal fires
+    assert result["signals"] == ["no_https"]
+    assert result["score"] == 65
+
+
+@pytest.mark.asyncio
+async def test_real_check_old_site(fixture_server):
+    async with httpx.AsyncClient() as client:
+        result = await _real_check(client, f"{fixture_server}/old")
+    assert set(result["signals"]) == {"no_https", "no_viewport", "old_copyright", "no_tel_link"}
+    assert result["score"] < 50
+    assert len(result["issues"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_real_check_unreachable_returns_no_score(fixture_server):
+    async with httpx.AsyncClient() as client:
+        result = await _real_check(client, f"{fixture_server}/missing")
+    assert result["score"] is None
+
+
+def test_score_html_https_modern_scores_full():
+    result = score_html("https://example.nl/", MODERN_PAGE)
+    assert result["score"] == 100
+    assert result["signals"] == []
+
+
+def test_http_only_site_is_never_skipped():
+    result = score_html("http://example.nl/", MODERN_PAGE)
+    assert result["signals"] == ["no_https"]
+    assert result["score"] == 65
+    assert not clearly_modern(result, 50)
+    assert clearly_modern(score_html("https://example.nl/", MODERN_PAGE), 50)
+
+
+def test_one_major_signal_blocks_the_skip():
+    page = MODERN_PAGE.replace(b'<meta name="viewport" content="width=device-width, initial-scale=1">', b"")
+    result = score_html("https://example.nl/", page)
+    assert result["signals"] == ["no_viewport"]
+    assert not clearly_modern(result, 50)
+    assert not clearly_modern({"score": None, "signals": []}, 50)
+
+
+def test_mock_check_flags_plain_http():
+    result = _mock_check("http://example.nl")
+    assert "no_https" in result["signals"]
+    assert 0 <= result["score"] <= 65
+
+
+@pytest.mark.asyncio
+async def test_site_changed_uses_conditional_get_then_content_hash(fixture_server, monkeypatch):
+    monkeypatch.setattr(get_settings(), "mock_mode", False)
+    url = f"{fixture_server}/modern"
+
+    changed, fingerprint = await site_changed(url, None)
+    assert not changed and fingerprint["etag"] == ETAG
+
+    assert await site_changed(url, fingerprint) == (False, None)  # 304
+    assert (await site_changed(url, {**fingerprint, "etag": '"v1"'}))[0] is False  # same content
+    assert (await site_changed(url, {"etag": '"v1"', "hash": "old"}))[0] is True
@@ -0,0 +1,171 @@
+"""Tests for the preview generator service."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from app.config import get_settings
+from app.fake_providers import create_app, fake_provider_settings, serve_in_thread
+from app.models.lead import LEAD_DETAILS, Lead
+from app.models.preview_template import PreviewTemplate
+from app.services import claude, pipeline, preview_generator
+from app.services.preview_generator import (
+    _map_status, _mock_generate, find_template, remember_template, template_key, update_template,
+)
+
+
+def test_mock_generate_is_ready_with_job_id():
+    result = _mock_generate(1, "Test Bedrijf", "prompt")
+    assert result["preview_status"] == "ready"
+    assert result["preview_job_id"].startswith("mock-")
+    assert "test-bedrijf" in result["preview_url"]
+
+
+def test_template_key_ignores_priority_order_and_case():
+    a = template_key("plumber", ["Mobile-first layout", "prominent phone CTA"])
+    b = template_key("Plumber", ["prominent phone CTA", "mobile-first layout "])
+    assert a == b
+
+
+def test_template_key_differs_by_business_type():
+    assert template_key("plumber", ["x"]) != template_key("bakery", ["x"])
+
+
+def test_map_status():
+    assert _map_status("deployed") == "ready"
+    assert _map_status("error") == "failed"
+    assert _map_status("building") == "generating"
+    assert _map_status(None) == "generating"
+
+
+@pytest.mark.asyncio
+async def test_remember_template_keeps_the_first_live_project(session_factory):
+    async with session_factory() as a, session_factory() as b:
+        await remember_template(a, "plumber", ["CTA"], "proj_a", "generating")
+        await remember_template(b, "Plumber", ["cta"], "proj_b", "generating")  # a second worker, same key
+
+    async with session_factory() as db:
+        templates = (await db.scalars(select(PreviewTemplate))).all()
+    assert [t.project_id for t in templates] == ["proj_a"]
+
+
+@pytest.mark.asyncio
+async def test_remember_template_replaces_a_failed_one(db_session):
+    await remember_template(db_session, "plumber", ["cta"], "proj_a", "generating")
+    await update_template(db_session, "proj_a", "failed", None)
+
+    await remember_template(db_session, "plumber", ["cta"], "proj_b", "ready", "https://b.lovable.app")
+
+    db_session.expire_all()
+    template = await find_template(db_session, "plumber", ["cta"])
+    assert (template.project_id, template.preview_url) == ("proj_b", "https://b.lovable.app")
+
+
+# ── Polling and template reuse, against the fake providers ───────────
+
+@pytest.fixture(scope="module")
+def fake_server():
+    base_url, stop = serve_in_thread(create_app(time_scale=0.0, inject_failures=False))
+    yield base_url
+    stop()
+
+
+@pytest.fixture
+def real_mode(fake_server, monkeypatch):
+    settings = get_settings()
+    for key, value in fake_provider_settings(fake_server).items():
+        monkeypatch.setattr(settings, key, value)
+    monkeypatch.setattr(settings, "preview_provider", "lovable")
+    claude.get_client.cache_clear()
+    yield fake_server
+    claude.get_client.cache_clear()
+
+
+async def _analyzed_lead(db, name="Loodgieter Test", **fields) -> Lead:
+    lead = Lead(
+        business_name=name, business_type="plumber", city="Amsterdam", website_url="http://loodgieter.nl",
+        site_score=30, site_issues=["Outdated design"], status="analyzed", **fields,
+    )
+    db.add(lead)
+    await db.commit()
+    return await db.get(Lead, lead.id, options=LEAD_DETAILS, populate_existing=True)
+
+
+async def _reload(db, lead_id) -> Lead:
+    return await db.get(Lead, lead_id, options=LEAD_DETAILS, populate_existing=True)
+
+
+@pytest.mark.asyncio
+async def test_poll_moves_a_finished_preview_to_ready_and_drafts_the_email(real_mode, db_session):
+    lead = await _analyzed_lead(db_session)
+    await pipeline._preview_and_email(db_session, lead, ["phone CTA"])
+    assert (lead.preview_status, lead.status, lead.email_body) == ("generating", "analyzed", None)
+
+    counts = await pipeline.poll_previews(db_session)
+
+    lead = await _reload(db_session, lead.id)
+    assert counts == {"ready": 1, "failed": 0, "pending": 0}
+    assert (lead.preview_status, lead.status, lead.email_status) == ("ready", "email_drafted", "draft")
+    assert lead.preview_url.startswith("https://proj_")
+    assert lead.preview_url in lead.email_body
+    template = await find_template(db_session, "plumber", ["phone CTA"])
+    assert (template.project_id, template.preview_url) == (lead.preview_job_id, lead.preview_url)
+
+
+@pytest.mark.asyncio
+async def test_poll_marks_a_failed_build_failed_and_drafts_without_preview(real_mode, db_session):
+    # A template the provider no longer has: its remix build fails
+    await remember_template(db_session, "plumber", ["phone CTA"], "proj_gone", "ready", "https://gone.lovable.app")
+    lead = await _analyzed_lead(db_session)
+    await pipeline._preview_and_email(db_session, lead, ["phone CTA"])
+
+    counts = await pipeline.poll_previews(db_session)
+
+    lead = await _reload(db_session, lead.id)
+    assert counts == {"ready": 0, "failed": 1, "pending": 0}
+    assert (lead.preview_status, lead.preview_url, lead.status) == ("failed", None, "email_drafted")
+    assert lead.email_body and "lovable.app" not in lead.email_body
+
+
+@pytest.mark.asyncio
+async def test_poll_times_out_a_dead_job(real_mode, db_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "preview_timeout", 60)
+    await remember_template(db_session, "plumber", [], "proj_dead", "generating")
+    stale = await _analyzed_lead(
+        db_session, "Stale", preview_status="generating", preview_job_id="proj_dead",
+        updated_at=datetime.utcnow() - timedelta(minutes=5),
+    )
+    recent = await _analyzed_lead(db_session, "Recent", preview_status="generating", preview_job_id="proj_unknown")
+
+    counts = await pipeline.poll_previews(db_session)
+
+    assert counts == {"ready": 0, "failed": 1, "pending": 1}
+    stale, recent = await _reload(db_session, stale.id), await _reload(db_session, recent.id)
+    assert (stale.preview_status, stale.status) == ("failed", "email_drafted")
+    assert (recent.preview_status, recent.status) == ("generating", "analyzed")
+    assert await find_template(db_session, "plumber", []) is None  # the dead template is failed too
+
+
+@pytest.mark.asyncio
+async def test_similar_lead_remixes_the_cached_template(real_mode, db_session, monkeypatch):
+    submitted = []
+    real_generate = preview_generator.generate_preview
+
+    async def generate(*args, **kwargs):
+        submitted.append(kwargs.get("template_project_id"))
+        return await real_generate(*args, **kwargs)
+
+    monkeypatch.setattr(preview_generator, "generate_preview", generate)
+    first = await _analyzed_lead(db_session, "Eerste")
+    await pipeline._preview_and_email(db_session, first, ["phone CTA"])
+    await pipeline.poll_previews(db_session)
+
+    second = await _analyzed_lead(db_session, "Tweede")
+    await pipeline._preview_and_email(db_session, second, ["Phone CTA "])
+    await pipeline.poll_previews(db_session)
+
+    first, second = await _reload(db_session, first.id), await _reload(db_session, second.id)
+    assert submitted == [None, first.preview_job_id]
+    assert second.preview_status == "ready" and second.preview_url != first.preview_url
+    assert second.preview_url in second.email_body
+    assert len((await db_session.scalars(select(PreviewTemplate))).all()) == 1
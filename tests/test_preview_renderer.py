@@ -0,0 +1,80 @@
+"""Tests for the local preview renderer."""
+
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import preview_renderer
+
+
+@pytest.fixture(autouse=True)
+def previews_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(preview_renderer, "PREVIEWS_DIR", tmp_path)
+    return tmp_path
+
+
+def test_render_preview_writes_site(previews_dir):
+    result = preview_renderer.render_preview(
+        7, "Van der Berg Loodgieters", "plumber", "Amsterdam", "+31 20 123 4567",
+        ["No mobile-responsive layout"],
+    )
+    assert result["preview_status"] == "ready"
+    assert result["preview_url"].endswith("/p/van-der-berg-loodgieters-7")
+
+    site = previews_dir / "van-der-berg-loodgieters-7"
+    html = (site / "index.html").read_text()
+    assert "Van der Berg Loodgieters" in html
+    assert "Lekkages verhelpen" in html  # plumber niche template
+    assert 'href="tel:+31201234567"' in html
+    assert "No mobile-responsive layout" in html
+    assert gzip.decompress((site / "index.html.gz").read_bytes()) == html.encode()
+
+
+def test_unknown_niche_uses_generic_template():
+    result = preview_renderer.render_preview(8, "Studio X", "tattoo_shop", "Utrecht", None)
+    assert result["preview_prompt"] == "local:generic.html"
+
+
+def test_render_escapes_business_data(previews_dir):
+    result = preview_renderer.render_preview(9, "<script>x</script>", "bakery", "Delft", None)
+    slug = result["preview_url"].rsplit("/", 1)[-1]
+    html = (previews_dir / slug / "index.html").read_text()
+    assert "<script>x</script>" not in html
+
+
+def test_preview_route_serves_gzip_and_304():
+    preview_renderer.render_preview(10, "Bakkerij Korst", "bakery", "Amsterdam", None)
+    client = TestClient(app)
+
+    response = client.get("/p/bakkerij-korst-10", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Bakkerij Korst" in response.text
+    assert "max-age" in response.headers["cache-control"]
+
+    etag = response.headers["etag"]
+    cached = client.get("/p/bakkerij-korst-10", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_preview_route_rejects_unknown_slug():
+    client = TestClient(app)
+    assert client.get("/p/does-not-exist").status_code == 404
+    assert client.get("/p/..%2F..%2Fetc").status_code == 404
+
+
+def test_preview_route_honours_accept_encoding_q_values():
+    preview_renderer.render_preview(11, "Bakkerij Deeg", "bakery", "Amsterdam", None)
+    client = TestClient(app)
+
+    def encoding(accept):
+        response = client.get("/p/bakkerij-deeg-11", headers={"Accept-Encoding": accept})
+        assert "Bakkerij Deeg" in response.text
+        return response.headers.get("content-encoding")
+
+    assert encoding("gzip;q=0") is None
+    assert encoding("gzip; q=0.0, identity") is None
+    assert encoding("br;q=0, gzip;q=0.5") == "gzip"
+    assert encoding("*;q=1, br;q=0") == "gzip"
+    assert encoding("identity") is None
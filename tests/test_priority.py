@@ -0,0 +1,79 @@
+"""Tests for lead priority scoring."""
+
+import io
+
+import httpx
+import pytest
+from sqlalchemy import select
+from app import main
+from app.config import get_settings
+from app.database import get_db
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.services import email_sender, lead_io, priority
+
+
+def test_established_business_without_website_comes_first():
+    florist = priority.score(4.8, 120, None, "florist")
+    shop = priority.score(3.5, 3, "http://shop.nl", "shop")
+    unrated = priority.score(None, None, "http://new.nl", "shop")
+
+    assert florist > shop > unrated
+    assert florist <= 90
+
+
+def test_niche_values_and_repeat_sightings(monkeypatch):
+    monkeypatch.setattr(get_settings(), "niche_values", '{"Dentist": 1.5}')
+    plain = priority.score(4.0, 50, "http://x.nl", "plumber")
+
+    assert priority.score(4.0, 50, "http://x.nl", "dentist") == round(plain * 1.5)
+    assert priority.score(4.0, 50, "http://x.nl", "plumber", seen=2) == plain + priority.SEEN_BONUS
+    assert priority.score(4.0, 50, "http://x.nl", "plumber", seen=9) == plain + priority.MAX_SEEN_BONUS
+
+
+@pytest.mark.asyncio
+async def test_reingesting_a_business_raises_its_priority(db_session):
+    rows = "business_name,city,rating,reviews_count\nBloemen Anna,Delft,4.8,120\n"
+    for _ in range(4):
+        await lead_io.import_file(db_session, io.BytesIO(rows.encode()), "csv", "List", "florist")
+
+    lead = await db_session.scalar(select(Lead).execution_options(populate_existing=True))
+    assert lead.seen_count == 4
+    assert lead.priority == priority.score(4.8, 120, None, "florist", seen=4)
+
+
+@pytest.mark.asyncio
+async def test_batch_send_caps_each_active_campaign(session_factory, monkeypatch):
+    async with session_factory() as db:
+        campaigns = [Campaign(name=name, niche="plumber", location="Delft", status=status)
+                     for name, status in (("A", "active"), ("B", "active"), ("Paused", "paused"))]
+        db.add_all(campaigns)
+        await db.commit()
+        db.add_all([
+            Lead(campaign_id=campaign.id, business_name=f"{campaign.name} {p}", business_type="plumber",
+                 priority=p, status="email_drafted", email_status="draft", email_subject="Hi", email_body="...")
+            for campaign in campaigns for p in (10, 30, 20)
+        ])
+        await db.commit()
+
+    sent = []
+
+    async def send_email(to_email, subject, body, lead_id):
+        sent.append(lead_id)
+        return {"status": "sent"}
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(email_sender, "send_email", send_email)
+    main.app.dependency_overrides[get_db] = override_db
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            assert (await client.post("/api/batch/send", data={"per_campaign": "2"})).status_code == 303
+    finally:
+        main.app.dependency_overrides.clear()
+
+    async with session_factory() as db:
+        names = [(await db.get(Lead, lead_id)).business_name for lead_id in sent]
+    assert names == ["A 30", "B 30", "A 20", "B 20"]
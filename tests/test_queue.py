@@ -0,0 +1,141 @@
+"""Tests for the lease queue and the scale-out worker."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from app.models.campaign import Campaign
+from app.models.lead import Lead
+from app.services import queue, pipeline, screenshotter
+from app.worker import run_worker
+
+
+@pytest.fixture(autouse=True)
+def screenshots_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path / "screenshots")
+
+
+async def _add_leads(db, n, **fields):
+    campaign = Campaign(name="Test", niche="plumber", location="Amsterdam")
+    db.add(campaign)
+    await db.commit()
+    leads = [
+        Lead(
+            campaign_id=campaign.id, business_name=f"Biz {i}", business_type="plumber",
+            website_url=f"http://biz{i}.nl", status="scraped", **fields,
+        )
+        for i in range(n)
+    ]
+    db.add_all(leads)
+    await db.commit()
+    return campaign, [lead.id for lead in leads]
+
+
+@pytest.mark.asyncio
+async def test_claims_are_exclusive(db_session):
+    _, ids = await _add_leads(db_session, 5)
+
+    first = await queue.claim(db_session, "a", "process", 3)
+    second = await queue.claim(db_session, "b", "process", 3)
+
+    assert [lead.id for lead in first] == ids[:3]
+    assert [lead.id for lead in second] == ids[3:]
+    assert await queue.claim(db_session, "c", "process", 3) == []
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(db_session):
+    _, ids = await _add_leads(db_session, 1)
+    [lead] = await queue.claim(db_session, "crashed", "process", 1)
+    assert await queue.claim(db_session, "b", "process", 1) == []
+
+    lead.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    await db_session.commit()
+
+    [reclaimed] = await queue.claim(db_session, "b", "process", 1)
+    assert reclaimed.id == ids[0]
+    assert reclaimed.lease_owner == "b"
+    assert await queue.heartbeat(db_session, "crashed", ids) == 0
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_release_and_updated_at_untouched(db_session):
+    _, ids = await _add_leads(db_session, 2)
+    stamp = (await db_session.get(Lead, ids[0])).updated_at
+
+    leads = await queue.claim(db_session, "a", "process", 2, lease_seconds=5)
+    old_expiry = leads[0].lease_expires_at
+    assert await queue.heartbeat(db_session, "a", ids, lease_seconds=600) == 2
+    db_session.expire_all()
+    assert (await db_session.get(Lead, ids[0])).lease_expires_at > old_expiry
+
+    await queue.release(db_session, "a", ids)
+    db_session.expire_all()
+    lead = await db_session.get(Lead, ids[0])
+    assert lead.lease_owner is None and lead.lease_expires_at is None
+    assert lead.updated_at == stamp
+
+
+@pytest.mark.asyncio
+async def test_poll_stage_only_claims_generating_previews(db_session):
+    await _add_leads(db_session, 2)
+    await _add_leads(db_session, 1, preview_status="generating", preview_job_id="proj_1")
+
+    [lead] = await queue.claim(db_session, "a", "poll", 10)
+    assert lead.preview_job_id == "proj_1"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_process_each_lead_once(session_factory, monkeypatch):
+    async with session_factory() as db:
+        _, ids = await _add_leads(db, 12)
+
+    processed = []
+    original = pipeline._process_lead
+
+    async def counting(db, lead, precheck=None):
+        processed.append(lead.id)
+        await asyncio.sleep(0)
+        await original(db, lead, precheck)
+
+    monkeypatch.setattr(pipeline, "_process_lead", counting)
+
+    results = await asyncio.gather(*(
+        run_worker(f"w{i}", ("process",), batch_size=2, stop_when_idle=True, session_factory=session_factory)
+        for i in range(3)
+    ))
+
+    assert sorted(processed) == ids
+    assert sum(r["analyzed"] for r in results) == 12
+
+    async with session_factory() as db:
+        leads = (await db.scalars(select(Lead))).all()
+    assert all(lead.status != "scraped" for lead in leads)
+    assert all(lead.lease_owner is None for lead in leads)
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_leaves_no_leases(db_session):
+    stats = await pipeline.run_pipeline(db_session, "plumber", "Amsterdam, Netherlands", 5)
+
+    assert stats["scraped"] == 5
+    leads = (await db_session.scalars(
+        select(Lead).where(Lead.campaign_id == stats["campaign_id"]).execution_options(populate_existing=True)
+    )).all()
+    assert len(leads) == 5
+    assert all(lead.lease_owner is None and lead.status != "scraped" for lead in leads)
+
+
+@pytest.mark.asyncio
+async def test_claims_highest_priority_first_from_active_campaigns(db_session):
+    _, ids = await _add_leads(db_session, 3)
+    paused, _ = await _add_leads(db_session, 2, priority=90)
+    paused.status = "paused"
+    for lead_id, value in zip(ids, (10, 70, 40)):
+        (await db_session.get(Lead, lead_id)).priority = value
+    await db_session.commit()
+
+    leads = await queue.claim(db_session, "a", "process", 10)
+
+    assert [lead.id for lead in leads] == [ids[1], ids[2], ids[0]]
@@ -0,0 +1,110 @@
+"""Tests for recurring campaigns and their scheduling."""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+from app import scheduler
+from app.config import get_settings
+from app.models.campaign import Campaign, RecurringCampaign
+from app.models.lead import Lead
+from app.services import pipeline, prefilter, recurring, screenshotter
+
+
+@pytest.fixture(autouse=True)
+def screenshots_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path / "screenshots")
+
+
+def test_stagger_spreads_definitions_within_the_interval(monkeypatch):
+    monkeypatch.setattr(get_settings(), "recurring_stagger_hours", 6)
+    offsets = [recurring.stagger(i) for i in range(1, 9)]
+
+    assert all(0 <= offset < 6 * 3600 for offset in offsets)
+    assert min(b - a for a, b in zip(sorted(offsets), sorted(offsets)[1:])) > 1800
+    assert recurring.stagger(1, interval=3600) < 1800
+
+
+def test_trigger_fires_at_the_cron_time_plus_the_stagger():
+    from apscheduler.triggers.cron import CronTrigger
+    from app.triggers import OffsetTrigger
+
+    trigger = OffsetTrigger(CronTrigger.from_crontab("0 9 * * mon", timezone=timezone.utc), 3600)
+    monday = datetime(2026, 10, 19, 9, 30, tzinfo=timezone.utc)
+
+    # A scheduler (re)started inside the offset still fires for this morning's cron time
+    fire_time = trigger.get_next_fire_time(None, monday)
+    assert fire_time == datetime(2026, 10, 19, 10, tzinfo=timezone.utc)
+    assert trigger.get_next_fire_time(fire_time, fire_time) == datetime(2026, 10, 26, 10, tzinfo=timezone.utc)
+
+
+async def _definition(db, limit):
+    definition = RecurringCampaign(
+        name="Weekly", niche="plumber", locations="Amsterdam, Netherlands\n", cron="0 9 * * mon", lead_limit=limit,
+    )
+    db.add(definition)
+    await db.commit()
+    return definition
+
+
+@pytest.mark.asyncio
+async def test_reruns_process_only_new_and_changed_businesses(db_session, monkeypatch):
+    # Every site gets a draft, whatever the mock analysis scores
+    monkeypatch.setattr(get_settings(), "prefilter_enabled", False)
+    monkeypatch.setattr(get_settings(), "min_score_threshold", 101)
+    [first] = await recurring.run(db_session, await _definition(db_session, 5))
+    assert (first["scraped"], first["refreshed"]) == (5, 0)
+    drafted = await db_session.scalar(
+        select(Lead).where(Lead.status == "email_drafted", Lead.website_url.isnot(None))
+    )
+
+    # Mock sites never change, so the rerun only handles the three new businesses
+    definition = await _definition(db_session, 8)
+    [second] = await recurring.run(db_session, definition)
+    assert (second["scraped"], second["refreshed"]) == (3, 0)
+    assert definition.last_run_at is not None
+
+    async def changed(url, known):
+        return url == drafted.website_url, known
+    monkeypatch.setattr(prefilter, "site_changed", changed)
+    parked = []
+    real_process = pipeline.process_campaign
+
+    async def process(db, campaign):
+        parked.append(await db.scalar(select(Lead.email_status).where(Lead.id == drafted.id)))
+        return await real_process(db, campaign)
+
+    monkeypatch.setattr(pipeline, "process_campaign", process)
+
+    [third] = await recurring.run(db_session, definition)
+    assert (third["scraped"], third["refreshed"]) == (1, 1)
+    lead = await db_session.get(Lead, drafted.id, populate_existing=True)
+    assert lead.campaign_id == third["campaign_id"] and lead.status != "scraped"
+    assert parked == ["pending"]  # the old draft can't be sent while the lead is re-processed
+    assert lead.email_status == "draft"
+    campaign = await db_session.get(Campaign, third["campaign_id"])
+    assert campaign.recurring_id == definition.id
+
+
+@pytest.mark.asyncio
+async def test_sync_schedules_enabled_definitions(session_factory, monkeypatch):
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    monkeypatch.setattr(scheduler, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(scheduler, "scheduler", AsyncIOScheduler())
+    async with session_factory() as db:
+        weekly = await _definition(db, 5)
+        disabled = await _definition(db, 5)
+        disabled.enabled = False
+        await db.commit()
+
+    await scheduler.sync_recurring_job()
+    [job] = scheduler.scheduler.get_jobs()
+    assert job.id == f"recurring-{weekly.id}"
+    assert job.trigger.offset.total_seconds() == round(recurring.stagger(weekly.id))
+
+    async with session_factory() as db:
+        (await db.get(RecurringCampaign, weekly.id)).enabled = False
+        await db.commit()
+    await scheduler.sync_recurring_job()
+    assert scheduler.scheduler.get_jobs() == []
@@ -0,0 +1,85 @@
+"""Tests for the versioned runtime config."""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from app import config
+from app.config import get_settings, pinned_settings
+from app.models.lead import Lead
+from app.models.runtime_config import RuntimeConfig
+from app.services import pipeline, runtime_config, screenshotter
+
+
+@pytest.fixture(autouse=True)
+def env_settings_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path / "screenshots")
+    monkeypatch.setattr(runtime_config, "_applied_version", 0)
+    yield
+    config.apply_overrides({})
+
+
+@pytest.mark.asyncio
+async def test_saved_versions_reach_other_processes(db_session, monkeypatch):
+    version = await runtime_config.save(db_session, {"batch_size": "7", "default_niche": "dentist"})
+    assert (get_settings().batch_size, get_settings().default_niche) == (7, "dentist")
+
+    # Another process: still on the .env settings until it refreshes
+    config.apply_overrides({})
+    monkeypatch.setattr(runtime_config, "_applied_version", 0)
+    assert get_settings().batch_size == config.env_settings().batch_size
+    assert await runtime_config.refresh(db_session)
+    assert runtime_config.applied_version() == version
+    assert get_settings().batch_size == 7
+    assert not await runtime_config.refresh(db_session)
+
+    # Saving the .env value again drops the override
+    await runtime_config.save(db_session, {"batch_size": str(config.env_settings().batch_size)})
+    [latest, _] = await runtime_config.history(db_session)
+    assert latest.values == '{"default_niche": "dentist"}'
+
+
+@pytest.mark.asyncio
+async def test_invalid_values_change_nothing(db_session):
+    with pytest.raises(ValidationError):
+        await runtime_config.save(db_session, {"batch_size": "lots"})
+    with pytest.raises(ValueError):
+        await runtime_config.save(db_session, {"database_url": "sqlite://"})
+
+    assert get_settings() is config.env_settings()
+    assert await db_session.scalar(select(func.count(RuntimeConfig.version))) == 0
+
+
+@pytest.mark.asyncio
+async def test_a_lead_keeps_its_settings_while_a_new_version_applies(db_session):
+    seen = []
+
+    async def lead():
+        with pinned_settings():
+            seen.append(get_settings().min_score_threshold)
+            await asyncio.sleep(0.01)
+            seen.append(get_settings().min_score_threshold)
+
+    running = asyncio.create_task(lead())
+    await asyncio.sleep(0)
+    await runtime_config.save(db_session, {"min_score_threshold": "80"})
+    await running
+
+    assert seen == [config.env_settings().min_score_threshold] * 2
+    assert get_settings().min_score_threshold == 80
+
+
+@pytest.mark.asyncio
+async def test_pipeline_honors_min_score_threshold(db_session):
+    # Every analyzed site scores at least 1, so none of them gets a preview
+    await runtime_config.save(db_session, {"min_score_threshold": "1", "prefilter_enabled": "false"})
+
+    stats = await pipeline.run_pipeline(db_session, "plumber", "Amsterdam, Netherlands", 10)
+
+    leads = (await db_session.scalars(
+        select(Lead).where(Lead.campaign_id == stats["campaign_id"]).execution_options(populate_existing=True)
+    )).all()
+    with_site = [lead for lead in leads if lead.website_url]
+    assert with_site and all(lead.preview_status == "pending" for lead in with_site)
+    assert all(lead.preview_status != "pending" for lead in leads if not lead.website_url)
@@ -0,0 +1,101 @@
+"""Tests for full-text lead search and its index triggers."""
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete
+from app import main
+from app.database import get_db
+from app.models.lead import LEAD_DETAILS, Lead, LeadEmail
+from app.services import search
+from app.services.search import MARK_END, MARK_START
+
+
+def _lead(name, city="Delft", issues=None, body=None):
+    lead = Lead(business_name=name, business_type="plumber", city=city, status="email_drafted")
+    if issues is not None:
+        lead.site_issues = issues
+    if body is not None:
+        lead.email_subject = "Hallo"
+        lead.email_body = body
+    return lead
+
+
+async def _ids(db, query, **kwargs):
+    hits, _ = await search.search_leads(db, query, **kwargs)
+    return [hit.id for hit in hits]
+
+
+@pytest.mark.asyncio
+async def test_finds_leads_by_every_indexed_field(db_session):
+    jansen = _lead("Loodgieter Jansen", city="Utrecht", issues=["No SSL certificate"])
+    bakker = _lead("Bakker Bart", body="Uw website laadt traag op mobiel.")
+    db_session.add_all([jansen, bakker])
+    await db_session.commit()
+
+    assert await _ids(db_session, "jansen") == [jansen.id]
+    assert await _ids(db_session, "utrecht") == [jansen.id]
+    assert await _ids(db_session, "certif") == [jansen.id]  # prefix match
+    assert await _ids(db_session, "mobiel") == [bakker.id]
+    assert await _ids(db_session, "delft mobiel") == [bakker.id]
+    assert await _ids(db_session, '"mobiel" -* (') == [bakker.id]  # operators are ignored
+    assert await _ids(db_session, "   ") == []
+
+
+@pytest.mark.asyncio
+async def test_index_follows_edits_and_deletes(db_session):
+    lead = _lead("Schilder De Vries", body="Eerste versie")
+    db_session.add(lead)
+    await db_session.commit()
+
+    lead = await db_session.get(Lead, lead.id, options=LEAD_DETAILS)
+    lead.email_body = "Tweede versie"
+    await db_session.commit()
+    assert await _ids(db_session, "eerste") == []
+    assert await _ids(db_session, "tweede") == [lead.id]
+
+    await db_session.execute(delete(LeadEmail))
+    await db_session.execute(delete(Lead))
+    await db_session.commit()
+    assert await _ids(db_session, "vries") == []
+
+
+@pytest.mark.asyncio
+async def test_pages_newest_first(db_session):
+    leads = [_lead(f"Kapper {i}") for i in range(5)]
+    db_session.add_all(leads)
+    await db_session.commit()
+
+    first, more = await search.search_leads(db_session, "kapper", page_size=2)
+    assert [h.id for h in first] == [leads[4].id, leads[3].id] and more
+    last, more = await search.search_leads(db_session, "kapper", page=3, page_size=2)
+    assert [h.id for h in last] == [leads[0].id] and not more
+
+
+def test_mark_escapes_before_highlighting():
+    assert search.mark(f"<b>{MARK_START}Jansen{MARK_END}</b>") == "&lt;b&gt;<mark>Jansen</mark>&lt;/b&gt;"
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    main.app.dependency_overrides[get_db] = override_db
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    main.app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint_returns_highlighted_rows(client, db_session):
+    db_session.add(_lead("Garage <Pieters>"))
+    await db_session.commit()
+
+    response = await client.get("/leads/search", params={"q": "pieters"})
+
+    assert response.status_code == 200
+    assert "Garage &lt;<mark>Pieters</mark>&gt;" in response.text
+    assert "No leads match" in (await client.get("/leads/search", params={"q": "zzz"})).text
@@ -0,0 +1,81 @@
+"""Tests for the provider simulator and the benchmark runner."""
+
+import httpx
+import pytest
+from app import metrics
+from app.config import get_settings
+from app.services import simulator, analyzer, scraper
+from scripts.benchmark import run_size
+
+
+@pytest.fixture
+def simulate(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "mock_mode", True)
+    monkeypatch.setattr(settings, "simulate", True)
+    monkeypatch.setattr(settings, "simulate_time_scale", 0.0)
+    monkeypatch.setattr(settings, "simulate_profiles", "")
+    metrics.reset()
+    yield settings
+    metrics.reset()
+
+
+def test_draws_are_reproducible_for_a_seed(simulate):
+    simulator.seed(7)
+    first = [simulator.draw("anthropic") for _ in range(50)]
+    simulator.seed(7)
+    assert [simulator.draw("anthropic") for _ in range(50)] == first
+
+    assert simulator.draw("prefilter", "http://a.nl") == simulator.draw("prefilter", "http://a.nl")
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_injection(simulate, monkeypatch):
+    monkeypatch.setattr(simulate, "simulate_profiles", '{"lovable": {"rate_limit_rate": 1.0}}')
+
+    with pytest.raises(httpx.HTTPStatusError) as exc:
+        await simulator.call("lovable")
+
+    assert exc.value.response.status_code == 429
+    assert metrics.PROVIDER_ERRORS.get(provider="lovable") == 1
+
+
+@pytest.mark.asyncio
+async def test_simulated_failure_uses_service_fallback(simulate, monkeypatch):
+    monkeypatch.setattr(simulate, "simulate_profiles", '{"anthropic": {"error_rate": 1.0, "rate_limit_rate": 0.0}}')
+
+    result = await analyzer.analyze_website(1, "Bakkerij Test", "bakery", "Utrecht", None)
+
+    assert result["score"] is None
+    assert "503" in result["summary"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_simulator_is_a_no_op(simulate, monkeypatch):
+    monkeypatch.setattr(simulate, "simulate", False)
+    await simulator.call("anthropic")
+    assert metrics.PROVIDER_CALLS.total() == 0
+
+
+def test_mock_scrape_cycles_with_unique_businesses():
+    results = scraper._mock_scrape("plumber", "Amsterdam, Netherlands", 40)
+
+    assert len(results) == 40
+    names = [r["business_name"] for r in results]
+    websites = [r["website_url"] for r in results if r["website_url"]]
+    assert len(set(names)) == 40
+    assert len(set(websites)) == len(websites)
+
+
+@pytest.mark.asyncio
+async def test_benchmark_run_is_reproducible(simulate, tmp_path):
+    first = await run_size(30, tmp_path / "a")
+    second = await run_size(30, tmp_path / "b")
+
+    assert first["leads_per_min"] > 0
+    assert first["db_commit"]["n"] > 0
+    assert "screenshot" in first["stages"]
+    for key in ("analyzed", "emails_drafted"):
+        assert first[key] == second[key]
+    assert {p: q["errors"] for p, q in first["providers"].items()} == \
+        {p: q["errors"] for p, q in second["providers"].items()}
@@ -0,0 +1,176 @@
+"""Tests for the website change sweep."""
+
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from sqlalchemy import func, insert, select, update
+from app import main, scheduler
+from app.config import get_settings
+from app.database import get_db
+from app.models.lead import Lead
+from app.services import email_sender, prefilter, screenshotter, site_sweep
+
+SITES = 500
+VERSIONS: dict[str, int] = {}
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        version = VERSIONS.get(self.path, 1)
+        etag = f'"{self.path}-{version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = f"<html><body>{self.path} version {version}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def site_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_sweep_requeues_only_changed_sites(db_session, site_server, monkeypatch):
+    monkeypatch.setattr(get_settings(), "mock_mode", False)
+    VERSIONS.clear()
+    rows = [
+        {"business_name": f"Biz {i}", "business_type": "plumber", "website_url": f"{site_server}/site/{i}",
+         "status": "email_drafted", "preview_status": "ready"}
+        for i in range(SITES)
+    ]
+    rows[0]["status"] = "sent"
+    rows[1]["preview_status"] = "generating"
+    await db_session.execute(insert(Lead), rows)
+    await db_session.commit()
+
+    counts = await site_sweep.sweep(db_session)
+    assert counts == {"checked": SITES - 2, "changed": 0, "failed": 0}
+
+    # Nothing is due again until SITE_RECHECK_DAYS have passed
+    assert (await site_sweep.sweep(db_session))["checked"] == 0
+
+    for i in (5, 6, 7):
+        VERSIONS[f"/site/{i}"] = 2
+    await db_session.execute(update(Lead).values(site_checked_at=datetime.utcnow() - timedelta(days=8)))
+    await db_session.commit()
+
+    counts = await site_sweep.sweep(db_session)
+    assert counts == {"checked": SITES - 2, "changed": 3, "failed": 0}
+    requeued = (await db_session.scalars(select(Lead.id).where(Lead.status == "scraped").order_by(Lead.id))).all()
+    assert requeued == [6, 7, 8]
+    # Their drafts pitch the old sites: none of them is sent any more
+    assert (await db_session.scalars(
+        select(Lead.email_status).where(Lead.id.in_(requeued)).execution_options(populate_existing=True)
+    )).all() == ["pending"] * 3
+    assert await db_session.scalar(select(func.count(Lead.id)).where(Lead.site_hash.isnot(None))) == SITES - 2
+
+
+@pytest.mark.asyncio
+async def test_batch_send_skips_drafts_of_changed_sites(session_factory, monkeypatch):
+    async with session_factory() as db:
+        db.add_all([
+            Lead(business_name=f"Biz {i}", business_type="plumber", website_url=f"http://biz{i}.nl",
+                 status="email_drafted", preview_status="ready", email_status="draft",
+                 email_subject="Your site", email_body="Your outdated design ...")
+            for i in range(2)
+        ])
+        await db.commit()
+
+    async def changed(url, known, client=None, quiet=False):
+        return url == "http://biz0.nl", {"etag": None, "last_modified": None, "hash": url}
+
+    monkeypatch.setattr(prefilter, "site_changed", changed)
+    async with session_factory() as db:
+        assert (await site_sweep.sweep(db))["changed"] == 1
+
+    sent = []
+
+    async def send_email(to_email, subject, body, lead_id):
+        sent.append(lead_id)
+        return {"status": "sent"}
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    monkeypatch.setattr(email_sender, "send_email", send_email)
+    main.app.dependency_overrides[get_db] = override_db
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            assert (await client.post("/api/batch/send")).status_code == 303
+    finally:
+        main.app.dependency_overrides.clear()
+    assert sent == [2]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_reanalyzes_requeued_leads(session_factory, tmp_path, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "prefilter_enabled", False)
+    monkeypatch.setattr(settings, "min_score_threshold", 101)
+    monkeypatch.setattr(screenshotter, "SCREENSHOTS_DIR", tmp_path)
+    monkeypatch.setattr(scheduler, "AsyncSessionLocal", session_factory)
+    async with session_factory() as db:
+        db.add(Lead(business_name="Biz", business_type="plumber", website_url="http://biz.nl",
+                    status="email_drafted", preview_status="ready", email_status="draft",
+                    email_subject="Your site", email_body="Your outdated design ..."))
+        await db.commit()
+
+    async def changed(url, known, client=None, quiet=False):
+        return True, {"etag": None, "last_modified": None, "hash": "new"}
+
+    monkeypatch.setattr(prefilter, "site_changed", changed)
+    async with session_factory() as db:
+        assert (await site_sweep.sweep(db))["changed"] == 1
+
+    # No worker and no inline run: the web process's scheduler picks it up
+    await scheduler.process_queue_job()
+
+    async with session_factory() as db:
+        lead = await db.scalar(select(Lead))
+    assert (lead.status, lead.email_status, lead.lease_owner) == ("email_drafted", "draft", None)
+    assert lead.site_score is not None
+
+
+@pytest.mark.asyncio
+async def test_changed_counts_only_leads_actually_requeued(session_factory, monkeypatch):
+    async with session_factory() as db:
+        db.add_all([
+            Lead(business_name=f"Biz {i}", business_type="plumber", website_url=f"http://biz{i}.nl",
+                 status="email_drafted", preview_status="ready")
+            for i in range(2)
+        ])
+        await db.commit()
+
+    async def changed(url, known, client=None, quiet=False):
+        if url == "http://biz0.nl":
+            # A worker leases this lead while its site is being checked
+            async with session_factory() as other:
+                await other.execute(update(Lead).where(Lead.id == 1).values(lease_owner="worker"))
+                await other.commit()
+        return True, {"etag": None, "last_modified": None, "hash": url}
+
+    monkeypatch.setattr(prefilter, "site_changed", changed)
+    async with session_factory() as db:
+        assert await site_sweep.sweep(db) == {"checked": 2, "changed": 1, "failed": 0}
+        assert (await db.scalars(select(Lead.status).order_by(Lead.id))).all() == ["email_drafted", "scraped"]
@@ -0,0 +1,70 @@
+"""Tests for import time and deferred startup."""
+
+import asyncio
+import re
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from app import main
+
+# Heavy SDKs only the real provider paths need
+DEFERRED_MODULES = ("anthropic", "PIL", "httpx", "apscheduler")
+# Cumulative `import app.main` time; about half of this on a single slow core
+IMPORT_BUDGET_MS = 2000
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module, from python -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def test_app_import_defers_provider_sdks_and_fits_budget():
+    times = _import_times("app.main")
+
+    assert not [m for m in DEFERRED_MODULES if m in times]
+    assert times["app.main"] / 1000 < IMPORT_BUDGET_MS
+
+
+def test_cli_import_defers_provider_sdks():
+    times = _import_times("scripts.run_pipeline")
+
+    assert not [m for m in DEFERRED_MODULES if m in times]
+
+
+def test_server_responds_while_startup_is_still_running(monkeypatch):
+    async def slow_migrations():
+        await asyncio.sleep(1)
+
+    async def nothing():
+        pass
+
+    monkeypatch.setattr(main, "init_db", slow_migrations)
+    monkeypatch.setattr(main, "init_scheduler", lambda: None)
+    # Neither may touch the default database (it would create ./leadpilot.db)
+    monkeypatch.setattr(main, "_load_runtime_config", nothing)
+    monkeypatch.setattr(main, "drain_scheduler", nothing)
+    monkeypatch.setattr(main, "STARTUP_WAIT_SECONDS", 0.05)
+
+    with TestClient(main.app) as client:
+        start = time.perf_counter()
+        assert client.get("/").status_code == 200
+        assert time.perf_counter() - start < 0.5
+        assert client.get("/healthz").status_code == 503
+
+        response = client.get("/dashboard")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "5"
+
+        time.sleep(1)
+        assert client.get("/healthz").text == "ok"
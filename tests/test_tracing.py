@@ -0,0 +1,93 @@
+"""Tests for tracing spans and the trace report helpers."""
+
+import asyncio
+
+import pytest
+from app import metrics, tracing
+from app.config import get_settings
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    settings = get_settings()
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "trace_exporter", "file")
+    monkeypatch.setattr(settings, "trace_file", str(path))
+    monkeypatch.setattr(settings, "trace_sample_rate", 1.0)
+    return path
+
+
+def test_lead_trace_exports_otlp_with_inherited_attributes(trace_file):
+    with tracing.span("lead", lead_id=7, campaign_id=3):
+        with metrics.stage("screenshot"):
+            with metrics.provider_call("screenshotone"):
+                pass
+        with pytest.raises(RuntimeError):
+            with metrics.stage("analyze"):
+                raise RuntimeError("boom")
+
+    [spans] = tracing.read_traces(str(trace_file))
+    by_name = {s["name"]: s for s in spans}
+    assert set(by_name) == {"lead", "stage.screenshot", "call.screenshotone", "stage.analyze"}
+    assert len({s["traceId"] for s in spans}) == 1
+
+    call = by_name["call.screenshotone"]
+    assert call["parentSpanId"] == by_name["stage.screenshot"]["spanId"]
+    assert tracing.attribute(call, "lead.id") == 7
+    assert tracing.attribute(call, "campaign.id") == 3
+    assert tracing.attribute(call, "provider") == "screenshotone"
+    assert by_name["stage.analyze"]["status"] == {"code": 2, "message": "RuntimeError: boom"}
+    assert "parentSpanId" not in by_name["lead"]
+
+
+def test_concurrent_leads_get_separate_traces(trace_file):
+    async def lead(i):
+        with tracing.span("lead", lead_id=i):
+            with metrics.stage("analyze"):
+                await asyncio.sleep(0.001 * i)
+
+    async def run():
+        await asyncio.gather(*(lead(i) for i in range(1, 4)))
+
+    asyncio.run(run())
+
+    traces = tracing.read_traces(str(trace_file))
+    assert len(traces) == 3
+    for spans in traces:
+        assert len(spans) == 2
+        assert len({tracing.attribute(s, "lead.id") for s in spans}) == 1
+
+
+def test_unsampled_and_disabled_export_nothing(trace_file, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "trace_sample_rate", 0.0)
+    with tracing.span("lead", lead_id=1) as root:
+        with metrics.stage("analyze"):
+            with tracing.span("inner") as inner:
+                pass
+    assert root is None and inner is None
+
+    monkeypatch.setattr(settings, "trace_sample_rate", 1.0)
+    monkeypatch.setattr(settings, "trace_exporter", "none")
+    with tracing.span("lead", lead_id=2):
+        pass
+
+    assert not trace_file.exists()
+
+
+def test_slowest_leads_and_waterfall(trace_file):
+    for i, delay in ((1, 0.001), (2, 0.02), (3, 0.005)):
+        with tracing.span("lead", lead_id=i):
+            with metrics.stage("preview"):
+                asyncio.run(asyncio.sleep(delay))
+    with tracing.span("scrape", campaign_id=1):
+        pass
+
+    slowest = tracing.slowest_leads(tracing.read_traces(str(trace_file)), n=2)
+    roots = [next(s for s in t if s["name"] == "lead") for t in slowest]
+    assert [tracing.attribute(r, "lead.id") for r in roots] == [2, 3]
+
+    lines = tracing.waterfall(slowest[0], width=20)
+    assert lines[0].startswith("lead")
+    assert lines[1].lstrip().startswith("stage.preview")
+    assert "█" in lines[1]